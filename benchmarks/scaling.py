@@ -0,0 +1,163 @@
+"""
+Measures how PipelinePlanner scales with the size of generated pipelines and
+the number of CPU cores, and compares the results with a baseline to catch
+performance regressions.
+
+Every case runs in a fresh process, so that its peak memory is its own. The
+results are written as JSON with --output; given a --baseline (e.g. the
+results of an earlier run), the cases slower, bigger or with a worse makespan
+than in the baseline beyond the tolerance are reported and the exit code is 1.
+
+The solve time of a case stopped by the time limit only measures the limit, so
+it is compared only between runs that proved the plan optimal, and a case no
+longer proved optimal is a regression. The default cases are solved to
+optimality by a single worker well within the time limit, so the baseline
+compares the search rather than the limit.
+
+Usage: python -m benchmarks.scaling [--tasks 20 50] [--cpu_cores 2 4 8] [--output results.json]
+                                    [--baseline benchmarks/baseline.json]
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import platform
+import sys
+import time
+from importlib.metadata import version
+from pipeline_planner.pipeline_generator import generate_pipeline, DURATION_DISTRIBUTIONS
+from pipeline_planner.pipeline_planner import PipelinePlanner
+from pipeline_planner.plan_profile import PlanProfile
+
+
+CASE_KEY = ['tasks', 'depth', 'fan_in', 'groups', 'durations', 'seed', 'cpu_cores', 'cumulative_cores']
+# Times below this many seconds are too noisy to compare
+MIN_COMPARED_TIME = 0.05
+
+
+def run_case(case: dict, time_limit: float, num_workers: int) -> dict:
+    tasks = generate_pipeline(
+        case['tasks'],
+        depth=case['depth'],
+        max_fan_in=case['fan_in'],
+        group_count=case['groups'],
+        duration_distribution=case['durations'],
+        seed=case['seed']
+    )
+
+    profile = PlanProfile()
+    planner = PipelinePlanner(tasks, profile=profile)
+    result = planner.solve(
+        case['cpu_cores'], case['cumulative_cores'], time_limit, num_workers=num_workers, profile=profile
+    )
+    profile.record_peak_memory()
+
+    return case | {
+        'validate_time': profile.phases['validate'],
+        'build_time': profile.phases['model build'],
+        'solve_time': profile.phases['solve'],
+        'status': result.status,
+        'makespan': result.makespan,
+        'lower_bound': result.lower_bound,
+        'variables': profile.model['variables'],
+        'constraints': profile.model['constraints'],
+        'peak_memory_bytes': profile.peak_memory_bytes
+    }
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Returns a description of every regression of ``results`` compared with ``baseline``."""
+    baseline_cases = {tuple(case[key] for key in CASE_KEY): case for case in baseline}
+
+    regressions = []
+    for case in results:
+        base = baseline_cases.get(tuple(case[key] for key in CASE_KEY))
+        if base is None:
+            continue
+
+        name = ', '.join(f'{key}={case[key]}' for key in CASE_KEY)
+        if base['status'] == 'OPTIMAL' and case['status'] != 'OPTIMAL':
+            regressions.append(f'{name}: status {base["status"]} -> {case["status"]}')
+
+        time_metrics = ['validate_time', 'build_time']
+        if base['status'] == case['status'] == 'OPTIMAL':
+            time_metrics.append('solve_time')
+        for metric in time_metrics:
+            if case[metric] > max(MIN_COMPARED_TIME, base[metric] * (1 + tolerance)):
+                regressions.append(f'{name}: {metric} {base[metric]:.3f}s -> {case[metric]:.3f}s')
+        for metric in ['peak_memory_bytes', 'variables', 'constraints']:
+            if base[metric] is not None and case[metric] is not None and case[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f'{name}: {metric} {base[metric]} -> {case[metric]}')
+        if case['makespan'] > base['makespan']:
+            regressions.append(f'{name}: makespan {base["makespan"]} -> {case["makespan"]}')
+
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pipeline planner scaling benchmark')
+    parser.add_argument('--tasks', type=int, nargs='+', default=[20, 50])
+    parser.add_argument('--cpu_cores', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--depth', type=int, default=8)
+    parser.add_argument('--fan_in', type=int, default=2)
+    parser.add_argument('--groups', type=int, default=3)
+    parser.add_argument('--durations', default='uniform', choices=DURATION_DISTRIBUTIONS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cumulative_cores', action='store_true')
+    parser.add_argument('--time_limit', type=float, default=60.0)
+    parser.add_argument('--workers', type=int, default=1, help='CP-SAT search workers, fixed for comparable runs')
+    parser.add_argument('--output', type=str, help='path to write the results to')
+    parser.add_argument('--baseline', type=str, help='path to the results of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='relative slowdown/growth tolerated')
+    args = parser.parse_args()
+
+    cases = [
+        {
+            'tasks': task_count,
+            'depth': args.depth,
+            'fan_in': args.fan_in,
+            'groups': args.groups,
+            'durations': args.durations,
+            'seed': args.seed,
+            'cpu_cores': cpu_cores,
+            'cumulative_cores': args.cumulative_cores
+        } for task_count in args.tasks for cpu_cores in args.cpu_cores
+    ]
+
+    results = []
+    for case in cases:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+            result = executor.submit(run_case, case, args.time_limit, args.workers).result()
+        results.append(result)
+        print(
+            f'{case["tasks"]} tasks, {case["cpu_cores"]} cores: validate={result["validate_time"]:.3f}s '
+            f'build={result["build_time"]:.3f}s solve={result["solve_time"]:.3f}s status={result["status"]} '
+            f'makespan={result["makespan"]} bound={result["lower_bound"]} '
+            f'memory={(result["peak_memory_bytes"] or 0) / 2 ** 20:.0f}MiB'
+        )
+
+    if args.output is not None:
+        with open(args.output, 'w') as output_file:
+            json.dump({
+                'environment': {
+                    'python': platform.python_version(),
+                    'ortools': version('ortools'),
+                    'platform': platform.platform(),
+                    'cpu_count': os.cpu_count(),
+                    'date': time.strftime('%Y-%m-%d')
+                },
+                'time_limit': args.time_limit,
+                'workers': args.workers,
+                'cases': results
+            }, output_file, indent=2)
+            output_file.write('\n')
+
+    if args.baseline is not None:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file)['cases'], args.tolerance)
+
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if len(regressions) > 0:
+            sys.exit(1)
+        print('No regression compared with the baseline.')
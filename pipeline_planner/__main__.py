@@ -1,9 +1,21 @@
 import argparse
+import contextlib
 import logging
+import os
+import sys
 from pipeline_planner.task_parser import TaskParser
-from pipeline_planner.pipeline_planner import PipelinePlanner
+from pipeline_planner.packed_pipeline import PackedPipeline
+from pipeline_planner.list_scheduler import ListScheduler
+from pipeline_planner.fast_path import plan_by_list_scheduling
+from pipeline_planner.task_graph import TaskGraph
+from pipeline_planner.plan_profile import PlanProfile
+from pipeline_planner.machine import Machine, CoreClass
+from pipeline_planner.cluster_planner import ClusterPlanner, Node
 from pipeline_planner.task_schedule_report import TaskScheduleReport
 
+# The planners importing OR-Tools are only imported once they are needed, so
+# that --help, invalid arguments and trivial pipelines do not pay for it
+
 
 __MIN_CORES = 1
 __MAX_CORES = 32
@@ -15,14 +27,30 @@ __LOG_LEVELS = {
 }
 
 
+def core_class(value: str) -> CoreClass:
+    # Parses NAME:CORES[:SPEED]
+    name, cores, *speed = value.split(':')
+    if len(speed) > 1 or int(cores) < 1 or (len(speed) == 1 and float(speed[0]) <= 0):
+        raise ValueError
+    return CoreClass(name, int(cores), float(speed[0]) if len(speed) == 1 else 1.0)
+
+
+def node(value: str) -> Node:
+    # Parses NAME:CORES
+    name, cores = value.split(':')
+    if int(cores) < 1:
+        raise ValueError
+    return Node(name, int(cores))
+
+
 parser = argparse.ArgumentParser(description='Data Pipeline Planner')
 
 parser.add_argument(
     '--cpu_cores', 
     type=int,
-    required=True,
     action='append',
-    help=f'the number of available CPU cores (must be between {__MIN_CORES} and {__MAX_CORES})'
+    help=f'the number of available CPU cores (must be between {__MIN_CORES} and {__MAX_CORES}). '
+         f'When given more than once, the pipelines are planned for each of the core counts'
 )
 
 parser.add_argument(
@@ -30,7 +58,180 @@ parser.add_argument(
     type=str,
     required=True,
     action='append',
-    help='path to the file containing the pipeline tasks'
+    help='path to the file containing the pipeline tasks, as text or packed (see --pack). When given more than once, all the pipelines are '
+         'planned in parallel'
+)
+
+parser.add_argument(
+    '--processes',
+    type=int,
+    help='the number of processes planning pipelines in parallel when planning more than one '
+         '(pipeline, cpu cores) combination. Default is the number of host CPU cores'
+)
+
+parser.add_argument(
+    '--engine',
+    default='cp-sat',
+    choices=['cp-sat', 'heuristic'],
+    help='"cp-sat" finds an optimal plan, "heuristic" finds a good plan in milliseconds using list scheduling. '
+         'Default is "cp-sat"'
+)
+
+parser.add_argument(
+    '--time_limit',
+    type=float,
+    help='stop the "cp-sat" engine after this many seconds and use the best plan found so far'
+)
+
+parser.add_argument(
+    '--gap',
+    type=float,
+    help='stop the "cp-sat" engine once the plan is proven to be within this relative gap of the optimum '
+         '(e.g. 0.05 for 5%%)'
+)
+
+parser.add_argument(
+    '--sweep',
+    type=int,
+    nargs=2,
+    metavar=('MIN_CORES', 'MAX_CORES'),
+    help='report the execution time for every number of CPU cores in [MIN_CORES, MAX_CORES] '
+         'instead of the plan for --cpu_cores'
+)
+
+parser.add_argument(
+    '--cumulative_cores',
+    action='store_true',
+    help='model the CPU cores as a single cumulative resource and assign the cores after solving '
+         '(much smaller model for many cores)'
+)
+
+parser.add_argument(
+    '--decompose',
+    action='store_true',
+    help='plan the independent sub-pipelines (not linked by dependencies or groups) separately, in parallel, '
+         'each on its own share of the CPU cores. Much faster for large pipelines, but not guaranteed optimal'
+)
+
+parser.add_argument(
+    '--core_class',
+    type=core_class,
+    action='append',
+    metavar='NAME:CORES[:SPEED]',
+    help='plan on a machine with this class of CPU cores instead of --cpu_cores identical cores, and with the '
+         'cores, memory and speed demands of the tasks (see the "cores=", "memory=" and "speed.NAME=" task '
+         'execution times). Can be given several times'
+)
+
+parser.add_argument(
+    '--memory',
+    type=int,
+    metavar='GB',
+    help='the memory shared by the tasks, with --core_class. Unlimited by default'
+)
+
+parser.add_argument(
+    '--node',
+    type=node,
+    action='append',
+    metavar='NAME:CORES',
+    help='plan across a cluster with this node of CORES CPU cores instead of on --cpu_cores cores, the plan of every '
+         'node being reported separately. Can be given several times'
+)
+
+parser.add_argument(
+    '--transfer_delay',
+    type=int,
+    default=0,
+    metavar='MINUTES',
+    help='with --node, the time a task waits for the output of a dependency which ran on another node. Default is 0'
+)
+
+parser.add_argument(
+    '--coarsen',
+    type=int,
+    nargs='?',
+    const=0,
+    metavar='BUCKET',
+    help='plan in a coarser time unit, much faster for long execution times: the GCD of the execution times '
+         '(exact) or, with BUCKET, the execution times rounded up to multiples of BUCKET minutes (the loss in '
+         'execution time is reported)'
+)
+
+parser.add_argument(
+    '--polish',
+    type=float,
+    metavar='SECONDS',
+    help='with --coarsen, spend up to SECONDS improving the coarse plan in minutes'
+)
+
+parser.add_argument(
+    '--robust',
+    type=float,
+    nargs='?',
+    const=95,
+    metavar='PERCENTILE',
+    help='choose the plan with the lowest PERCENTILE (95 when not given) of the execution time over sampled '
+         'execution times of the tasks (see the "p95=" and "samples=" task execution times), instead of the plan '
+         'with the lowest execution time as planned'
+)
+
+parser.add_argument(
+    '--scenarios',
+    type=int,
+    default=10000,
+    help='the number of sampled execution times the plans are evaluated with, for --robust. Default is 10000'
+)
+
+parser.add_argument(
+    '--plan_cache',
+    type=str,
+    help='path to a file caching the plans of pipelines planned before with the same settings'
+)
+
+parser.add_argument(
+    '--plan_cache_size',
+    type=int,
+    default=256,
+    help='the maximum size of the plan cache in MiB, least recently used plans are evicted first. Default is 256'
+)
+
+parser.add_argument(
+    '--per_minute',
+    action='store_true',
+    help='report the tasks being executed on every minute, instead of on every interval during which the same '
+         'tasks are executed'
+)
+
+parser.add_argument(
+    '--format',
+    default='table',
+    choices=['table', 'json', 'jsonl', 'csv', 'arrow'],
+    help='the format of the plan: a "table" for humans, or one row per task (name, group, core, start, end and '
+         'slack) as "json", "jsonl", "csv" or "arrow" (requires pyarrow). Default is "table"'
+)
+
+parser.add_argument(
+    '--output',
+    type=str,
+    help='path to the file to write the plan to. Default is the standard output'
+)
+
+parser.add_argument(
+    '--pack',
+    type=str,
+    help='write the --pipeline in the compact binary format to this path (much faster to load for big '
+         'pipelines) instead of planning it'
+)
+
+parser.add_argument(
+    '--profile',
+    type=str,
+    nargs='?',
+    const='-',
+    metavar='PATH',
+    help='write the statistics of the planning run as JSON to PATH (or to the standard error when no PATH is '
+         'given): the time of every phase, the model and solver statistics and the peak memory'
 )
 
 parser.add_argument(
@@ -45,30 +246,242 @@ args = parser.parse_args()
 if (level := __LOG_LEVELS.get(args.log.lower())) is not None:
     logging.basicConfig(level=level)
 
-if len(args.cpu_cores) != 1:
-    parser.error('--cpu_cores argument must be specified exactly once')
-
-if len(args.pipeline) != 1:
-    parser.error('--pipeline argument must be specified exactly once')
-
-__cpu_cores, __pipeline_path = args.cpu_cores[0], args.pipeline[0]
-
-if __cpu_cores < __MIN_CORES or __cpu_cores > __MAX_CORES:
-    parser.error(f'--cpu_cores argument be in the range [{__MIN_CORES}, {__MAX_CORES}]')
-
-__task_lines = []
-try:
-    with open(__pipeline_path, 'r') as pipeline_file:
-        __task_lines = [line for line in pipeline_file.read().split('\n')]
-except Exception as e:
-    parser.error(f'Pipeline tasks file "{__pipeline_path}" does NOT exist. Error: {e}')
-finally:
-    if len(__task_lines) < 5:
-        parser.error(f'Pipeline tasks file "{__pipeline_path}" needs at least 5 lines of content.')
-
-try:
-    __tasks = TaskParser().parse(__task_lines)
-    __scheduled_tasks = PipelinePlanner(__tasks).plan(__cpu_cores)
-    print(TaskScheduleReport().generate(__scheduled_tasks))
-except Exception as e:
-    logging.error(f'Failed to generate a plan. Error: {e}')
+# Each of these planning modes replaces the others
+__planning_modes = [
+    option for option, given in [
+        ('--node', args.node is not None),
+        ('--core_class', args.core_class is not None),
+        ('--decompose', args.decompose),
+        ('--coarsen', args.coarsen is not None),
+        ('--robust', args.robust is not None)
+    ]
+    if given
+]
+if len(__planning_modes) > 1:
+    parser.error(f'{" and ".join(__planning_modes)} cannot be combined')
+if len(__planning_modes) > 0 and args.engine != 'cp-sat':
+    parser.error(f'{__planning_modes[0]} is only supported by the "cp-sat" engine')
+
+__machine = None
+if args.core_class is not None:
+    __machine = Machine(args.core_class, args.memory)
+    if args.cpu_cores is not None or args.sweep is not None or len(args.pipeline) > 1 or args.engine != 'cp-sat':
+        parser.error('--core_class is only supported by the "cp-sat" engine, for a single --pipeline, instead of '
+                     '--cpu_cores')
+    args.cpu_cores = [__machine.cpu_cores]
+
+if args.node is not None:
+    if args.cpu_cores is not None or args.core_class is not None or args.sweep is not None or args.decompose or \
+            len(args.pipeline) > 1 or args.engine != 'cp-sat' or args.format != 'table':
+        parser.error('--node is only supported by the "cp-sat" engine, for a single --pipeline and the "table" '
+                     '--format, instead of --cpu_cores and --core_class')
+    if args.transfer_delay < 0:
+        parser.error('--transfer_delay argument must not be negative')
+    if any(n.cpu_cores > __MAX_CORES for n in args.node):
+        parser.error(f'--node cores must be in the range [{__MIN_CORES}, {__MAX_CORES}]')
+    args.cpu_cores = [max(n.cpu_cores for n in args.node)]
+
+if args.cpu_cores is None:
+    if args.sweep is None:
+        parser.error('the following arguments are required: --cpu_cores')
+    args.cpu_cores = [args.sweep[0]]
+
+for __cpu_cores in args.cpu_cores:
+    if __cpu_cores < __MIN_CORES or __cpu_cores > __MAX_CORES:
+        parser.error(f'--cpu_cores argument be in the range [{__MIN_CORES}, {__MAX_CORES}]')
+
+if args.time_limit is not None and args.time_limit <= 0:
+    parser.error('--time_limit argument must be positive')
+
+if args.gap is not None and args.gap < 0:
+    parser.error('--gap argument must not be negative')
+
+if args.processes is not None and args.processes < 1:
+    parser.error('--processes argument must be positive')
+
+if args.sweep is not None:
+    if args.sweep[0] < __MIN_CORES or args.sweep[1] > __MAX_CORES or args.sweep[0] > args.sweep[1]:
+        parser.error(f'--sweep arguments must be an increasing range within [{__MIN_CORES}, {__MAX_CORES}]')
+
+    if args.engine != 'cp-sat' or len(args.pipeline) > 1:
+        parser.error('--sweep is only supported by the "cp-sat" engine, for a single --pipeline')
+
+if args.format != 'table' and (args.sweep is not None or len(args.cpu_cores) > 1 or len(args.pipeline) > 1):
+    parser.error('--format is only supported for a single --pipeline and --cpu_cores')
+
+if args.pack is not None and (len(args.pipeline) > 1 or args.sweep is not None):
+    parser.error('--pack is only supported for a single --pipeline')
+
+if args.profile is not None and (args.sweep is not None or len(args.cpu_cores) > 1 or len(args.pipeline) > 1):
+    parser.error('--profile is only supported for a single --pipeline and --cpu_cores')
+
+if args.decompose and (args.sweep is not None or len(args.cpu_cores) > 1 or len(args.pipeline) > 1):
+    parser.error('--decompose is only supported for a single --pipeline and --cpu_cores')
+
+if (args.coarsen is not None or args.robust is not None) and \
+        (args.sweep is not None or len(args.cpu_cores) > 1 or len(args.pipeline) > 1):
+    parser.error('--coarsen and --robust are only supported for a single --pipeline and --cpu_cores')
+
+if args.polish is not None and args.coarsen is None:
+    parser.error('--polish is only supported with --coarsen')
+
+if args.sweep is None and (len(args.cpu_cores) > 1 or len(args.pipeline) > 1):
+    # Batch mode: plan every (pipeline, cpu cores) combination in parallel
+    if args.engine != 'cp-sat':
+        parser.error('multiple --pipeline/--cpu_cores arguments are only supported by the "cp-sat" engine')
+
+    from pipeline_planner.batch_planner import BatchPlanner, PlanJob
+
+    __jobs = [
+        PlanJob(pipeline_path, cpu_cores) for pipeline_path in args.pipeline for cpu_cores in args.cpu_cores
+    ]
+    __job_results = BatchPlanner(
+        args.processes,
+        args.cumulative_cores,
+        args.time_limit,
+        args.gap,
+        args.plan_cache,
+        args.plan_cache_size * 1024 * 1024
+    ).plan(__jobs)
+
+    for __job_result in __job_results:
+        print(f'Pipeline "{__job_result.job.pipeline}" with {__job_result.job.cpu_cores} CPU core(s)')
+        if __job_result.error is None:
+            print(TaskScheduleReport().generate(__job_result.result.scheduled_tasks, args.per_minute))
+        else:
+            logging.error(f'Failed to generate a plan. Error: {__job_result.error}')
+        print()
+else:
+    __cpu_cores, __pipeline_path = args.cpu_cores[0], args.pipeline[0]
+    __plan_cache = None
+    if args.plan_cache is not None:
+        from pipeline_planner.plan_cache import PlanCache
+        __plan_cache = PlanCache(args.plan_cache, args.plan_cache_size * 1024 * 1024)
+    __profile = PlanProfile()
+
+    if not os.path.isfile(__pipeline_path):
+        parser.error(f'Pipeline tasks file "{__pipeline_path}" does NOT exist.')
+
+    try:
+        # The packed pipeline file stays mapped until the plan is reported
+        with contextlib.ExitStack() as __open_files:
+            with __profile.phase('parse'):
+                if PackedPipeline.is_packed(__pipeline_path):
+                    __pipeline = __open_files.enter_context(PackedPipeline(__pipeline_path))
+                    __tasks = __pipeline.tasks()
+                else:
+                    __pipeline = __tasks = TaskParser().parse_file(__pipeline_path)
+                # Not stored by the packed format
+                __has_multi_core_tasks = __pipeline is __tasks and any(task.cores > 1 for task in __tasks)
+
+            if args.pack is not None:
+                PackedPipeline.write(__tasks, args.pack)
+                logging.info(f'Packed {len(__tasks)} task(s) into "{args.pack}"')
+            elif args.sweep is not None:
+                from pipeline_planner.pipeline_planner import PipelinePlanner
+                print(TaskScheduleReport().generate_sweep(
+                    PipelinePlanner(__pipeline).sweep(args.sweep[0], args.sweep[1], args.time_limit)
+                ))
+            else:
+                if args.node is not None:
+                    with __profile.phase('solve'):
+                        __scheduled_tasks = ClusterPlanner(__tasks, args.node, args.transfer_delay).plan(
+                            args.time_limit
+                        ).scheduled_tasks
+                elif args.engine == 'heuristic':
+                    with __profile.phase('solve'):
+                        __scheduled_tasks = ListScheduler(__tasks).schedule(__cpu_cores)
+                elif args.decompose:
+                    from pipeline_planner.component_planner import ComponentPlanner
+                    with __profile.phase('solve'):
+                        __scheduled_tasks = ComponentPlanner(__tasks).plan(
+                            __cpu_cores, args.processes, args.cumulative_cores, args.time_limit, args.gap
+                        ).scheduled_tasks
+                elif __machine is not None:
+                    from pipeline_planner.pipeline_planner import PipelinePlanner
+                    with __profile.phase('solve'):
+                        __scheduled_tasks = PipelinePlanner(__pipeline).solve_machine(
+                            __machine, args.time_limit, args.gap, profile=__profile
+                        ).scheduled_tasks
+                elif args.coarsen is not None:
+                    from pipeline_planner.pipeline_planner import PipelinePlanner
+                    with __profile.phase('solve'):
+                        __scheduled_tasks = PipelinePlanner(__pipeline).solve_coarse(
+                            __cpu_cores,
+                            args.coarsen if args.coarsen > 0 else None,
+                            args.polish,
+                            args.cumulative_cores,
+                            args.time_limit,
+                            args.gap
+                        ).scheduled_tasks
+                elif args.robust is not None:
+                    from pipeline_planner.pipeline_planner import PipelinePlanner
+                    with __profile.phase('solve'):
+                        __robust_result = PipelinePlanner(__pipeline).solve_robust(
+                            __cpu_cores, args.scenarios, args.robust, args.cumulative_cores, args.time_limit
+                        )
+                    __scheduled_tasks = __robust_result.scheduled_tasks
+                    logging.info(
+                        f'Execution time over {args.scenarios} scenarios: '
+                        f'p50 = {__robust_result.makespan_distribution.p50:.1f}, '
+                        f'p{args.robust:g} = '
+                        f'{__robust_result.makespan_distribution.percentile(args.robust):.1f} minute(s)'
+                    )
+                elif args.profile is not None or __has_multi_core_tasks:
+                    from pipeline_planner.pipeline_planner import PipelinePlanner
+                    # A profiled run always builds and solves the model, to profile it, and
+                    # the tasks running on several cores are planned on a machine
+                    __scheduled_tasks = PipelinePlanner(__pipeline, __plan_cache, profile=__profile).plan(
+                        __cpu_cores, args.cumulative_cores, args.time_limit, args.gap, profile=__profile
+                    )
+                else:
+                    __graph = __pipeline.task_graph() if isinstance(__pipeline, PackedPipeline) else TaskGraph(__tasks)
+                    __list_schedule = plan_by_list_scheduling(__tasks, __cpu_cores, __graph)
+                    if __list_schedule.is_optimal():
+                        logging.debug('The list schedule is optimal, skipping the solver.')
+                        __scheduled_tasks = list(__list_schedule.scheduled_tasks)
+                    else:
+                        from pipeline_planner.pipeline_planner import PipelinePlanner
+                        __scheduled_tasks = PipelinePlanner(__pipeline, __plan_cache, __graph).plan(
+                            __cpu_cores, args.cumulative_cores, args.time_limit, args.gap, list_schedule=__list_schedule
+                        )
+
+                with __profile.phase('report'):
+                    if args.node is not None:
+                        __report = '\n\n'.join(
+                            f'Node "{n.name}" with {n.cpu_cores} CPU core(s)\n' + TaskScheduleReport().generate(
+                                [s_task for s_task in __scheduled_tasks if s_task.node == index], args.per_minute
+                            )
+                            for index, n in enumerate(args.node)
+                        )
+                        if args.output is None:
+                            print(__report)
+                        else:
+                            with open(args.output, 'w') as output_file:
+                                output_file.write(__report + '\n')
+                    elif args.format == 'table' and args.output is None:
+                        print(TaskScheduleReport().generate(__scheduled_tasks, args.per_minute))
+                    elif args.format == 'table':
+                        with open(args.output, 'w') as output_file:
+                            output_file.write(TaskScheduleReport().generate(__scheduled_tasks, args.per_minute) + '\n')
+                    elif args.output is not None:
+                        with open(args.output, 'wb' if args.format == 'arrow' else 'w') as output_file:
+                            TaskScheduleReport().write(__scheduled_tasks, output_file, args.format)
+                    else:
+                        TaskScheduleReport().write(
+                            __scheduled_tasks, sys.stdout.buffer if args.format == 'arrow' else sys.stdout, args.format
+                        )
+    except Exception as e:
+        logging.error(f'Failed to generate a plan. Error: {e}')
+
+    if __plan_cache is not None:
+        logging.debug(f'Plan cache: {__plan_cache.stats()}')
+        __plan_cache.close()
+
+    if args.profile is not None:
+        __profile.record_peak_memory()
+        if args.profile == '-':
+            print(__profile.to_json(), file=sys.stderr)
+        else:
+            with open(args.profile, 'w') as profile_file:
+                profile_file.write(__profile.to_json() + '\n')
@@ -0,0 +1,110 @@
+import concurrent.futures
+import os
+from dataclasses import dataclass
+from pipeline_planner.task import Task
+from pipeline_planner.task_parser import TaskParser
+from pipeline_planner.packed_pipeline import PackedPipeline
+from pipeline_planner.pipeline_planner import PipelinePlanner
+from pipeline_planner.plan_result import PlanResult
+from pipeline_planner.plan_cache import PlanCache
+
+
+@dataclass
+class PlanJob:
+    """
+    A single planning job of a batch. When ``tasks`` is not given, the
+    pipeline is parsed from the ``pipeline`` file by the worker process.
+    """
+    pipeline: str
+    cpu_cores: int
+    tasks: list[Task] | None = None
+
+
+@dataclass
+class PlanJobResult:
+    """The outcome of a planning job: either its plan or the reason it failed."""
+    job: PlanJob
+    result: PlanResult | None = None
+    error: str | None = None
+
+
+@dataclass
+class _PlanOptions:
+    cumulative_cores: bool
+    time_limit: float
+    relative_gap: float
+    num_workers: int
+    cache_path: str
+    cache_max_bytes: int
+
+
+_plan_cache = None  # opened once per worker process
+
+
+def _run_job(job: PlanJob, options: _PlanOptions) -> PlanJobResult:
+    global _plan_cache
+    try:
+        if options.cache_path is not None and _plan_cache is None:
+            _plan_cache = PlanCache(options.cache_path, options.cache_max_bytes)
+
+        if job.tasks is not None:
+            planner = PipelinePlanner(job.tasks, _plan_cache)
+        elif PackedPipeline.is_packed(job.pipeline):
+            with PackedPipeline(job.pipeline) as packed:
+                planner = PipelinePlanner(packed, _plan_cache)
+        else:
+            planner = PipelinePlanner(TaskParser().parse_file(job.pipeline), _plan_cache)
+
+        result = planner.solve(
+            job.cpu_cores,
+            options.cumulative_cores,
+            options.time_limit,
+            options.relative_gap,
+            num_workers=options.num_workers
+        )
+        return PlanJobResult(job, result=result)
+    except Exception as e:
+        return PlanJobResult(job, error=str(e))
+
+
+class BatchPlanner:
+    """
+    Plans many (pipeline, cpu cores) jobs across a pool of processes.
+
+    The host CPU cores are split between the processes, so each CP-SAT solve
+    gets ``cpu_count // processes`` search workers. A failing job does not
+    affect the others - its error is reported in its ``PlanJobResult``. The
+    processes can share a ``PlanCache`` file given by ``cache_path``.
+    """
+
+    __processes: int
+    __options: _PlanOptions
+
+    def __init__(
+        self,
+        processes: int | None = None,
+        cumulative_cores: bool = False,
+        time_limit: float | None = None,
+        relative_gap: float | None = None,
+        cache_path: str | None = None,
+        cache_max_bytes: int = 256 * 1024 * 1024
+    ):
+        cpu_count = os.cpu_count() or 1
+        self.__processes = processes if processes is not None else cpu_count
+        self.__options = _PlanOptions(
+            cumulative_cores,
+            time_limit,
+            relative_gap,
+            max(1, cpu_count // self.__processes),
+            cache_path,
+            cache_max_bytes
+        )
+
+    def plan(self, jobs: list[PlanJob]) -> list[PlanJobResult]:
+        """Returns the results in the order of the jobs."""
+        if len(jobs) == 0:
+            return []
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(self.__processes, len(jobs))) as executor:
+            futures = [executor.submit(_run_job, job, self.__options) for job in jobs]
+            return [future.result() for future in futures]
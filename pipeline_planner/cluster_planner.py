@@ -0,0 +1,284 @@
+import bisect
+import concurrent.futures
+import heapq
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pipeline_planner.machine import check_single_core
+from pipeline_planner.task import Task, ScheduledTask
+from pipeline_planner.task_graph import TaskGraph
+from pipeline_planner.plan_result import PlanResult
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+
+
+@dataclass(frozen=True)
+class Node:
+    """A machine of the cluster, with its identical CPU cores."""
+    name: str
+    cpu_cores: int
+
+
+class ClusterPlanner:
+    """
+    Plans a pipeline across the nodes of a cluster, where a task depending on
+    a task of another node waits for the output of the dependency to be
+    transferred. The transfer delay (in minutes) of a dependency is, by
+    priority, its own one from ``edge_delays`` (by (dependency, task) names),
+    the one between the two nodes from ``node_delays`` (by node names, in
+    either order) or ``transfer_delay``. Dependencies within a node have no
+    delay. The tasks of different groups cannot run at the same time on a
+    node, but can on different nodes.
+
+    Every task runs on a single core of its node (the cores, memory and speed
+    demands of the tasks are not supported). The scheduled tasks hold the
+    index of their node in ``nodes`` and their core within the node.
+
+    The plan is solved hierarchically, so that it scales to dozens of nodes:
+        - the tasks are assigned to the nodes by list scheduling, longest
+          tail first, each on the node where it would end first given the
+          transfers of its dependencies;
+        - the plan of every node is then improved with CP-SAT, in parallel
+          threads, keeping the tasks within the times the other nodes allow:
+          a task waiting for the transfer of a task of another node cannot
+          start before it is transferred, and a task transferred to another
+          node cannot end later than it already does. Within the makespan of
+          its node, every task transferred to another node then ends as early
+          as it can, and the nodes are solved again for ``rounds`` rounds, as
+          the transfers arriving earlier let the waiting tasks move earlier.
+    As the nodes are not chosen by the solver, the plan is not guaranteed to
+    be optimal - its ``lower_bound`` is the one of the whole pipeline on all
+    the cores, ignoring the transfers.
+    """
+
+    __tasks: list[Task]
+    __graph: TaskGraph
+    __nodes: list[Node]
+    __transfer_delay: int
+    __node_delays: dict[tuple[str, str], int]
+    __edge_delays: dict[tuple[str, str], int]
+
+    def __init__(
+        self,
+        tasks: list[Task],
+        nodes: list[Node],
+        transfer_delay: int = 0,
+        node_delays: dict[tuple[str, str], int] | None = None,
+        edge_delays: dict[tuple[str, str], int] | None = None
+    ):
+        self.__tasks = tasks
+        self.__graph = TaskGraph(tasks)
+        self.__nodes = nodes
+        self.__transfer_delay = transfer_delay
+        self.__node_delays = node_delays or {}
+        self.__edge_delays = edge_delays or {}
+        self.__validate()
+
+    def __validate(self) -> None:
+        if len(self.__nodes) == 0 or any(node.cpu_cores < 1 for node in self.__nodes):
+            raise PipelinePlanningError('The cluster must have at least one node, with at least one CPU core each.')
+
+        node_names = {node.name for node in self.__nodes}
+        if len(node_names) != len(self.__nodes):
+            raise PipelinePlanningError('The cluster contains duplicated node names.')
+
+        unknown = sorted({name for pair in self.__node_delays for name in pair if name not in node_names})
+        if len(unknown) > 0:
+            raise PipelinePlanningError(f'Transfer delays between unknown nodes: {", ".join(unknown)}')
+
+        graph = self.__graph
+        unknown_edges = [
+            f'({dependency}, {task})' for dependency, task in self.__edge_delays
+            if task not in graph.indices or dependency not in graph.indices or
+            graph.indices[dependency] not in graph.predecessors[graph.indices[task]]
+        ]
+        if len(unknown_edges) > 0:
+            raise PipelinePlanningError(f'Transfer delays of unknown dependencies: {", ".join(unknown_edges)}')
+
+        delays = [self.__transfer_delay, *self.__node_delays.values(), *self.__edge_delays.values()]
+        if any(delay < 0 for delay in delays):
+            raise PipelinePlanningError('Transfer delays must not be negative.')
+
+        check_single_core(self.__tasks, 'across nodes')
+
+    def transfer_delay(self, dependency: str, task: str, dependency_node: int, task_node: int) -> int:
+        if dependency_node == task_node:
+            return 0
+
+        delay = self.__edge_delays.get((dependency, task))
+        if delay is not None:
+            return delay
+
+        l_name, r_name = self.__nodes[dependency_node].name, self.__nodes[task_node].name
+        delay = self.__node_delays.get((l_name, r_name), self.__node_delays.get((r_name, l_name)))
+        return delay if delay is not None else self.__transfer_delay
+
+    def plan(self, time_limit: float | None = None, rounds: int = 2, num_workers: int | None = None) -> PlanResult:
+        """
+        Plans the pipeline. ``time_limit`` is the time of every round of node
+        solves, and the host CPU cores (or ``num_workers``) are split between
+        the nodes solved in parallel.
+        """
+        started = time.perf_counter()
+        graph = self.__graph
+
+        nodes, cores, starts = self.__list_schedule()
+        makespan = self.__makespan(starts)
+        logging.debug(f'List scheduled makespan across {len(self.__nodes)} node(s) = {makespan}')
+
+        for round_index in range(rounds):
+            refined_cores, refined_starts = self.__refine(nodes, cores, starts, time_limit, num_workers)
+            if (refined_cores, refined_starts) == (cores, starts):
+                break
+
+            cores, starts, makespan = refined_cores, refined_starts, self.__makespan(refined_starts)
+            logging.debug(f'Makespan after round {round_index + 1} of node solves = {makespan}')
+
+        scheduled_tasks = [
+            ScheduledTask(task, cores[i], starts[i], node=nodes[i]) for i, task in enumerate(self.__tasks)
+        ]
+        total_cores = sum(node.cpu_cores for node in self.__nodes)
+        lower_bound = max(graph.critical_path_length, -(-sum(graph.durations) // total_cores))
+
+        return PlanResult(
+            scheduled_tasks,
+            makespan,
+            min(makespan, lower_bound),
+            'OPTIMAL' if makespan <= lower_bound else 'FEASIBLE',
+            time.perf_counter() - started
+        )
+
+    def __makespan(self, starts: list[int]) -> int:
+        return max((start + duration for start, duration in zip(starts, self.__graph.durations)), default=0)
+
+    def __list_schedule(self) -> tuple[list[int], list[int], list[int]]:
+        # Returns the node, core and start of every task
+        tasks, graph = self.__tasks, self.__graph
+        nodes, cores, starts = [0] * len(tasks), [0] * len(tasks), [0] * len(tasks)
+        core_ends = [[0] * node.cpu_cores for node in self.__nodes]
+        # The (start, end, group) phases of the grouped tasks of every node,
+        # sorted and disjoint as the tasks of other groups never overlap
+        node_phases = [[] for _ in self.__nodes]
+
+        pending_deps = [len(preds) for preds in graph.predecessors]
+        ready = [(-graph.tails[i], i) for i, count in enumerate(pending_deps) if count == 0]
+        heapq.heapify(ready)
+        while ready:
+            _, i = heapq.heappop(ready)
+            task, duration = tasks[i], graph.durations[i]
+
+            best = None
+            for node in range(len(self.__nodes)):
+                release = max(
+                    (
+                        starts[pred] + graph.durations[pred] +
+                        self.transfer_delay(graph.names[pred], task.name, nodes[pred], node)
+                        for pred in graph.predecessors[i]
+                    ),
+                    default=0
+                )
+                core = min(range(len(core_ends[node])), key=lambda c: core_ends[node][c])
+                start = max(release, core_ends[node][core])
+                if task.has_group():
+                    start = self.__group_start(node_phases[node], task.group, start, duration)
+
+                if best is None or start + duration < best[0]:
+                    best = (start + duration, node, core, start)
+
+            end, nodes[i], cores[i], starts[i] = best
+            core_ends[nodes[i]][cores[i]] = end
+            if task.has_group():
+                self.__add_phase(node_phases[nodes[i]], task.group, starts[i], end)
+
+            for succ in graph.successors[i]:
+                pending_deps[succ] -= 1
+                if pending_deps[succ] == 0:
+                    heapq.heappush(ready, (-graph.tails[succ], succ))
+
+        return nodes, cores, starts
+
+    @staticmethod
+    def __group_start(phases: list[tuple[int, int, str]], group: str, start: int, duration: int) -> int:
+        # The earliest start from ``start`` not overlapping the phases of the
+        # other groups, from the first phase ending after it
+        for index in range(bisect.bisect_right(phases, start, key=lambda phase: phase[1]), len(phases)):
+            p_start, p_end, p_group = phases[index]
+            if p_start >= start + duration:
+                break
+            if p_group != group:
+                start = p_end
+
+        return start
+
+    @staticmethod
+    def __add_phase(phases: list[tuple[int, int, str]], group: str, start: int, end: int) -> None:
+        # The task only overlaps phases of its own group, merged with it
+        low = bisect.bisect_right(phases, start, key=lambda phase: phase[1])
+        high = bisect.bisect_left(phases, end, lo=low, key=lambda phase: phase[0])
+        if low < high:
+            start, end = min(start, phases[low][0]), max(end, phases[high - 1][1])
+        phases[low:high] = [(start, end, group)]
+
+    def __refine(
+        self, nodes: list[int], cores: list[int], starts: list[int], time_limit: float, num_workers: int
+    ) -> tuple[list[int], list[int]]:
+        # Only imported when refining, as it imports OR-Tools
+        from pipeline_planner.pipeline_planner import PipelinePlanner
+
+        tasks, graph = self.__tasks, self.__graph
+        ends = [start + duration for start, duration in zip(starts, graph.durations)]
+
+        node_tasks = [[] for _ in self.__nodes]
+        for i in graph.order:
+            node_tasks[nodes[i]].append(i)
+
+        earliest_starts, latest_ends = {}, {}
+        for i, preds in enumerate(graph.predecessors):
+            for pred in preds:
+                if nodes[pred] != nodes[i]:
+                    delay = self.transfer_delay(graph.names[pred], graph.names[i], nodes[pred], nodes[i])
+                    earliest_starts[graph.names[i]] = max(earliest_starts.get(graph.names[i], 0), ends[pred] + delay)
+                    latest_ends[graph.names[pred]] = ends[pred]
+
+        active = [node for node, indices in enumerate(node_tasks) if len(indices) > 0]
+        workers = max(1, (num_workers or os.cpu_count() or 1) // len(active))
+
+        def solve(node: int) -> PlanResult:
+            # Only the dependencies within the node are left, the others are
+            # replaced by the earliest starts and latest ends
+            node_task_list = [
+                Task(
+                    tasks[i].name,
+                    tasks[i].group,
+                    tasks[i].execution_time,
+                    {graph.names[pred] for pred in graph.predecessors[i] if nodes[pred] == node}
+                )
+                for i in node_tasks[node]
+            ]
+            plan = [
+                ScheduledTask(node_task, cores[i], starts[i])
+                for node_task, i in zip(node_task_list, node_tasks[node])
+            ]
+            names = {node_task.name for node_task in node_task_list}
+
+            return PipelinePlanner(node_task_list).solve_within(
+                self.__nodes[node].cpu_cores,
+                plan,
+                {name: start for name, start in earliest_starts.items() if name in names},
+                {name: end for name, end in latest_ends.items() if name in names},
+                [name for name in latest_ends if name in names],
+                time_limit,
+                workers
+            )
+
+        # CP-SAT releases the GIL while solving, so threads solve the nodes in parallel
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(active)) as executor:
+            results = list(executor.map(solve, active))
+
+        cores, starts = list(cores), list(starts)
+        for result in results:
+            for s_task in result.scheduled_tasks:
+                i = graph.indices[s_task.task.name]
+                cores[i], starts[i] = s_task.core, s_task.start
+
+        return cores, starts
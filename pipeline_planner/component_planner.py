@@ -0,0 +1,119 @@
+import logging
+import time
+from pipeline_planner.task import Task, ScheduledTask
+from pipeline_planner.task_graph import TaskGraph
+from pipeline_planner.pipeline_planner import PipelinePlanner
+from pipeline_planner.batch_planner import BatchPlanner, PlanJob
+from pipeline_planner.plan_result import PlanResult
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+
+
+class ComponentPlanner:
+    """
+    Plans pipelines made of several independent sub-pipelines by planning
+    each of them separately, in parallel processes, and merging the plans.
+
+    Sub-pipelines are the connected components of the dependency graph, except
+    that all the components with grouped tasks are planned together when the
+    pipeline has more than one group, as the group constraints link them.
+
+    The CPU cores are split between the sub-pipelines, which then run side by
+    side on their own cores: every sub-pipeline gets one core and each extra
+    core goes to the sub-pipeline with the longest estimated execution time.
+    As the cores are not shared over time, the merged plan is not guaranteed
+    to be optimal - its ``lower_bound`` is the one of the whole pipeline.
+
+    With a single sub-pipeline, more sub-pipelines than cores (where giving
+    every sub-pipeline cores of its own could double the makespan) or tasks
+    running on several cores (which may not fit the share of their
+    sub-pipeline), the whole pipeline is planned at once instead.
+    """
+
+    __tasks: list[Task]
+    __graph: TaskGraph
+
+    def __init__(self, tasks: list[Task]):
+        self.__tasks = tasks
+        self.__graph = TaskGraph(tasks)
+
+    def components(self) -> list[list[Task]]:
+        components = self.__graph.components()
+
+        if len({task.group for task in self.__tasks if task.has_group()}) > 1:
+            grouped = [
+                component for component in components if any(self.__tasks[i].has_group() for i in component)
+            ]
+            if len(grouped) > 1:
+                components = [component for component in components if component not in grouped]
+                components.append(sorted((i for component in grouped for i in component), key=self.__order_key()))
+
+        return [[self.__tasks[i] for i in component] for component in components]
+
+    def __order_key(self):
+        positions = {task_index: position for position, task_index in enumerate(self.__graph.order)}
+        return lambda i: positions[i]
+
+    def plan(
+        self,
+        cpu_cores: int,
+        processes: int | None = None,
+        cumulative_cores: bool = False,
+        time_limit: float | None = None,
+        relative_gap: float | None = None
+    ) -> PlanResult:
+        started = time.perf_counter()
+        components = self.components()
+        works = [sum(task.execution_time for task in component) for component in components]
+
+        logging.debug(f'Planning {len(components)} independent sub-pipeline(s)')
+
+        if len(components) == 1 or len(components) > cpu_cores or any(task.cores > 1 for task in self.__tasks):
+            return PipelinePlanner(self.__tasks).solve(cpu_cores, cumulative_cores, time_limit, relative_gap)
+
+        cores = self.__split_cores(components, works, cpu_cores)
+        job_results = BatchPlanner(processes, cumulative_cores, time_limit, relative_gap).plan([
+            PlanJob(f'component {i}', component_cores, component)
+            for i, (component, component_cores) in enumerate(zip(components, cores))
+        ])
+
+        errors = [job_result.error for job_result in job_results if job_result.error is not None]
+        if len(errors) > 0:
+            raise PipelinePlanningError(errors[0])
+
+        merged = {}
+        for i, job_result in enumerate(job_results):
+            core_offset = sum(cores[:i])
+            for s_task in job_result.result.scheduled_tasks:
+                merged[s_task.task.name] = ScheduledTask(
+                    s_task.task,
+                    s_task.core + core_offset,
+                    s_task.start,
+                    tuple(core + core_offset for core in s_task.cores)
+                )
+
+        scheduled_tasks = [merged[task.name] for task in self.__tasks]
+        makespan = max((s_task.start + s_task.task.execution_time for s_task in scheduled_tasks), default=0)
+        lower_bound = min(makespan, max(self.__graph.critical_path_length, -(-sum(works) // cpu_cores)))
+
+        return PlanResult(
+            scheduled_tasks,
+            makespan,
+            lower_bound,
+            'OPTIMAL' if makespan == lower_bound else 'FEASIBLE',
+            time.perf_counter() - started
+        )
+
+    def __split_cores(self, components: list[list[Task]], works: list[int], cpu_cores: int) -> list[int]:
+        critical_paths = [TaskGraph(component).critical_path_length for component in components]
+
+        def estimate(i: int, component_cores: int) -> int:
+            return max(critical_paths[i], -(-works[i] // component_cores))
+
+        cores = [1] * len(components)
+        for _ in range(cpu_cores - len(components)):
+            longest = max(range(len(components)), key=lambda i: (estimate(i, cores[i]), -i))
+            if estimate(longest, cores[longest] + 1) == estimate(longest, cores[longest]):
+                break
+            cores[longest] += 1
+
+        return cores
@@ -0,0 +1,62 @@
+import heapq
+
+
+def assign_cores(intervals: list[tuple[int, int]]) -> list[int]:
+    """
+    Assigns a CPU core to each (start, end) interval so that intervals on the
+    same core never overlap, always reusing the lowest free core id.
+
+    This is the classic greedy interval colouring: it runs in O(n log n) and
+    uses exactly as many cores as the maximum number of overlapping intervals,
+    so any schedule satisfying a cumulative constraint of capacity ``c`` is
+    mapped onto cores ``0..c-1``.
+    """
+    cores = [-1] * len(intervals)
+    free_cores = []  # min-heap of released core ids
+    busy_cores = []  # min-heap of (end, core id)
+    next_core = 0
+
+    for i in sorted(range(len(intervals)), key=lambda i: intervals[i]):
+        start, end = intervals[i]
+        while len(busy_cores) > 0 and busy_cores[0][0] <= start:
+            heapq.heappush(free_cores, heapq.heappop(busy_cores)[1])
+
+        if len(free_cores) > 0:
+            core = heapq.heappop(free_cores)
+        else:
+            core, next_core = next_core, next_core + 1
+
+        cores[i] = core
+        heapq.heappush(busy_cores, (end, core))
+
+    return cores
+
+
+def assign_core_sets(intervals: list[tuple[int, int]], demands: list[int], first_core: int = 0) -> list[list[int]]:
+    """
+    Assigns ``demands[i]`` CPU cores to each (start, end) interval, the same
+    way as ``assign_cores`` - so any schedule satisfying a cumulative
+    constraint of capacity ``c`` with these demands is mapped onto cores
+    ``first_core..first_core+c-1`` (the cores of a task are not necessarily
+    consecutive).
+    """
+    cores = [[] for _ in intervals]
+    free_cores = []  # min-heap of released core ids
+    busy_cores = []  # min-heap of (end, core id)
+    next_core = first_core
+
+    for i in sorted(range(len(intervals)), key=lambda i: intervals[i]):
+        start, end = intervals[i]
+        while len(busy_cores) > 0 and busy_cores[0][0] <= start:
+            heapq.heappush(free_cores, heapq.heappop(busy_cores)[1])
+
+        for _ in range(demands[i]):
+            if len(free_cores) > 0:
+                core = heapq.heappop(free_cores)
+            else:
+                core, next_core = next_core, next_core + 1
+
+            cores[i].append(core)
+            heapq.heappush(busy_cores, (end, core))
+
+    return cores
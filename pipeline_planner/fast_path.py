@@ -0,0 +1,52 @@
+import dataclasses
+import time
+from pipeline_planner.task import Task
+from pipeline_planner.task_graph import TaskGraph
+from pipeline_planner.list_scheduler import ListScheduler
+from pipeline_planner.plan_result import PlanResult
+
+
+def plan_by_list_scheduling(
+    tasks: list[Task], cpu_cores: int, graph: TaskGraph | None = None, scheduler: ListScheduler | None = None
+) -> PlanResult:
+    """
+    Returns the plan of the ``ListScheduler`` (or of the ``scheduler`` given
+    for the tasks) with the lower bound of the makespan given by the critical
+    path and by the total work spread over all the cores - OPTIMAL when the
+    plan reaches it, FEASIBLE otherwise. The scheduled tasks are a
+    ``ListSchedule``, built on access. Neither builds any CP-SAT model nor
+    imports OR-Tools.
+    """
+    started = time.perf_counter()
+    graph = graph if graph is not None else TaskGraph(tasks)
+    scheduler = scheduler if scheduler is not None else ListScheduler(tasks, graph)
+
+    lower_bound = max(graph.critical_path_length, -(-sum(graph.durations) // cpu_cores))
+    schedule = scheduler.list_schedule(cpu_cores)
+    makespan = max((start + duration for start, duration in zip(schedule.starts, graph.durations)), default=0)
+
+    return PlanResult(
+        schedule,
+        makespan,
+        min(makespan, lower_bound),
+        'OPTIMAL' if makespan <= lower_bound else 'FEASIBLE',
+        time.perf_counter() - started
+    )
+
+
+def plan_trivially(tasks: list[Task], cpu_cores: int, graph: TaskGraph | None = None) -> PlanResult | None:
+    """
+    Returns an optimal plan without building any CP-SAT model (or importing
+    OR-Tools) when the plan of the ``ListScheduler`` can be proven optimal
+    (see ``plan_by_list_scheduling``). This is always the case for:
+        - a single CPU core, where any topological order is optimal as no
+          core is ever idle;
+        - a chain of tasks, where the critical path is the total work;
+    and often for pipelines with more cores than tasks running in parallel.
+    Returns None otherwise.
+    """
+    result = plan_by_list_scheduling(tasks, cpu_cores, graph)
+    if not result.is_optimal():
+        return None
+
+    return dataclasses.replace(result, scheduled_tasks=list(result.scheduled_tasks))
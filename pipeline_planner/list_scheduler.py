@@ -0,0 +1,142 @@
+import collections
+import collections.abc
+import heapq
+import logging
+from typing import Sequence
+from pipeline_planner.task import Task, ScheduledTask
+from pipeline_planner.task_graph import TaskGraph
+from pipeline_planner.machine import check_single_core
+
+
+class ListSchedule(collections.abc.Sequence):
+    """
+    The plan of the ``ListScheduler``, as the core and start of every task by
+    index. Every ``ScheduledTask`` is built on access, so the tasks of a
+    packed pipeline are not built when the plan is only used as a hint.
+    """
+
+    cores: list[int]
+    starts: list[int]
+
+    def __init__(self, tasks: Sequence[Task], cores: list[int], starts: list[int]):
+        self.__tasks = tasks
+        self.cores = cores
+        self.starts = starts
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        return ScheduledTask(self.__tasks[index], self.cores[index], self.starts[index])
+
+
+class ListScheduler:
+    """
+    A greedy list scheduler producing a valid (but not necessarily optimal)
+    plan in O((V + E) log V + V * G) time, where G is the number of groups.
+
+    Whenever a CPU core is free, the scheduler starts the ready task (i.e. one
+    whose dependencies have all completed) with the longest remaining critical
+    path. Grouped tasks are only started while no task from another group is
+    running, so the group constraints hold by construction. Every task runs
+    on a single core.
+
+    The planner passes the ``graph`` and the ``group_ids`` (indexed like the
+    graph, -1 for tasks without a group) it already has, and ``single_core``
+    once it has rejected the tasks running on several cores, so the tasks are
+    not read while scheduling.
+    """
+
+    __tasks: Sequence[Task]
+    __graph: TaskGraph
+    __group_ids: list[int]
+
+    def __init__(
+        self,
+        tasks: Sequence[Task],
+        graph: TaskGraph | None = None,
+        group_ids: list[int] | None = None,
+        single_core: bool = False
+    ):
+        if not single_core:
+            check_single_core(tasks, 'by the list scheduler')
+        self.__tasks = tasks
+        self.__graph = graph if graph is not None else TaskGraph(tasks)
+
+        if group_ids is None:
+            ids = {}
+            group_ids = [ids.setdefault(task.group, len(ids)) if task.has_group() else -1 for task in tasks]
+        self.__group_ids = group_ids
+
+    def schedule(self, cpu_cores: int) -> list[ScheduledTask]:
+        return list(self.list_schedule(cpu_cores))
+
+    def list_schedule(self, cpu_cores: int) -> ListSchedule:
+        graph, group_ids = self.__graph, self.__group_ids
+        # Longest remaining critical path first, definition order on ties
+        priorities = [(-tail, i) for i, tail in enumerate(graph.tails)]
+
+        pending_deps = [len(preds) for preds in graph.predecessors]
+        ready_ungrouped = []  # heap of priorities
+        ready_grouped = collections.defaultdict(list)  # heaps of priorities, indexed by group id
+
+        def make_ready(index: int) -> None:
+            group_id = group_ids[index]
+            heapq.heappush(ready_grouped[group_id] if group_id >= 0 else ready_ungrouped, priorities[index])
+
+        for i, count in enumerate(pending_deps):
+            if count == 0:
+                make_ready(i)
+
+        running = []  # heap of (end, task index, core)
+        free_cores = list(range(cpu_cores))
+        active_group, active_group_count = None, 0
+        starts, cores = [0] * len(graph.names), [0] * len(graph.names)
+        now = 0
+
+        while len(running) > 0 or len(ready_ungrouped) > 0 or any(ready_grouped.values()):
+            # Complete every task ending at the current time
+            while len(running) > 0 and running[0][0] <= now:
+                _, index, core = heapq.heappop(running)
+                heapq.heappush(free_cores, core)
+
+                if group_ids[index] >= 0:
+                    active_group_count -= 1
+                    if active_group_count == 0:
+                        active_group = None
+
+                for succ in graph.successors[index]:
+                    pending_deps[succ] -= 1
+                    if pending_deps[succ] == 0:
+                        make_ready(succ)
+
+            # Fill the free cores with the most critical startable tasks
+            while len(free_cores) > 0:
+                candidates = [ready_ungrouped] if len(ready_ungrouped) > 0 else []
+                if active_group is not None:
+                    if len(ready_grouped[active_group]) > 0:
+                        candidates.append(ready_grouped[active_group])
+                else:
+                    candidates.extend(heap for heap in ready_grouped.values() if len(heap) > 0)
+
+                if len(candidates) == 0:
+                    break
+
+                _, index = heapq.heappop(min(candidates, key=lambda heap: heap[0]))
+                if group_ids[index] >= 0:
+                    active_group, active_group_count = group_ids[index], active_group_count + 1
+
+                starts[index], cores[index] = now, heapq.heappop(free_cores)
+                heapq.heappush(running, (now + graph.durations[index], index, cores[index]))
+
+            if len(running) > 0:
+                now = running[0][0]
+
+        logging.debug(
+            f'List schedule makespan = {max((start + duration for start, duration in zip(starts, graph.durations)), default=0)}'
+        )
+
+        return ListSchedule(self.__tasks, cores, starts)
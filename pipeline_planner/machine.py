@@ -0,0 +1,63 @@
+import math
+from dataclasses import dataclass, field
+from typing import Iterable
+from pipeline_planner.task import Task
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+
+
+@dataclass(frozen=True)
+class CoreClass:
+    """
+    A set of identical CPU cores. A task runs ``speed`` times faster on them
+    than its execution time, unless the task sets its own speed for the class.
+    """
+    name: str
+    cores: int
+    speed: float = 1.0
+
+
+@dataclass(frozen=True)
+class Machine:
+    """
+    Describes the CPU cores, by class, and the memory (in GB, unlimited when
+    None) the tasks share. The cores are numbered class by class, in order.
+    """
+    core_classes: list[CoreClass] = field(default_factory=list)
+    memory: int | None = None
+
+    @property
+    def cpu_cores(self) -> int:
+        return sum(core_class.cores for core_class in self.core_classes)
+
+    def first_cores(self) -> list[int]:
+        """The id of the first core of every class."""
+        return [sum(core_class.cores for core_class in self.core_classes[:k]) for k in range(len(self.core_classes))]
+
+    def execution_time(self, task: Task, core_class: CoreClass) -> int:
+        speeds = task.speeds or {}
+        return math.ceil(task.execution_time / speeds.get(core_class.name, core_class.speed))
+
+    def validate(self, tasks: list[Task]) -> None:
+        if len(self.core_classes) == 0 or any(core_class.cores < 1 for core_class in self.core_classes):
+            raise PipelinePlanningError('The machine must have at least one CPU core in every core class.')
+        if len({core_class.name for core_class in self.core_classes}) != len(self.core_classes):
+            raise PipelinePlanningError('The machine contains duplicated core class names.')
+
+        too_big = [
+            task.name for task in tasks
+            if all(task.cores > core_class.cores for core_class in self.core_classes) or
+            (self.memory is not None and task.memory > self.memory)
+        ]
+        if len(too_big) > 0:
+            raise PipelinePlanningError(
+                f'Tasks needing more cores or memory than the machine has: {", ".join(too_big)}'
+            )
+
+
+def check_single_core(tasks: Iterable[Task], planner: str) -> None:
+    """Rejects the tasks running on several cores, which only a ``Machine`` model plans."""
+    multi_core = [task.name for task in tasks if task.cores > 1]
+    if len(multi_core) > 0:
+        raise PipelinePlanningError(
+            f'Tasks running on several cores are not supported {planner}: {", ".join(multi_core)}'
+        )
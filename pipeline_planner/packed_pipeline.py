@@ -0,0 +1,244 @@
+import array
+import collections.abc
+import mmap
+import struct
+import sys
+from pipeline_planner.task import Task
+from pipeline_planner.task_graph import TaskGraph
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+
+
+MAGIC = b'PPLN'
+VERSION = 1
+# magic, version, task count, dependency count, group count, names size, group names size
+HEADER = struct.Struct('<4s6I')
+
+
+def _int_section(buffer: memoryview, offset: int, count: int, typecode: str):
+    view = buffer[offset:offset + 4 * count].cast(typecode)
+    if sys.byteorder == 'little':
+        return view
+
+    values = array.array(typecode, view)
+    values.byteswap()
+    return values
+
+
+class _PackedDependencies(collections.abc.Set):
+    """The dependency names of a packed task, only looked up from their indices when read."""
+
+    __slots__ = ('__names', '__indices')
+
+    def __init__(self, names: list[str], indices: tuple[int, ...]):
+        self.__names = names
+        self.__indices = indices
+
+    def __contains__(self, name: object) -> bool:
+        return any(self.__names[index] == name for index in self.__indices)
+
+    def __iter__(self):
+        return (self.__names[index] for index in self.__indices)
+
+    def __len__(self) -> int:
+        return len(self.__indices)
+
+    def __repr__(self) -> str:
+        return repr(set(self))
+
+
+class PackedTasks(collections.abc.Sequence):
+    """
+    The tasks of a packed pipeline, every ``Task`` being built on its first
+    access - so planning a packed pipeline only builds the tasks it reports.
+    A built task no longer reads the memory map.
+    """
+
+    def __init__(self, packed: 'PackedPipeline'):
+        self.__packed = packed
+        self.__tasks = [None] * len(packed)
+
+    def __len__(self) -> int:
+        return len(self.__tasks)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        task = self.__tasks[index]
+        if task is None:
+            task = self.__tasks[index] = self.__packed.task(index)
+        return task
+
+
+class PackedPipeline:
+    """
+    A pipeline stored in a compact, little-endian binary file, loaded through
+    a read-only memory map.
+
+    After the header, the file holds (every section is 4-byte aligned):
+        - ``durations`` - int32 per task;
+        - ``group_ids`` - int32 per task, the index of its group or -1;
+        - ``dep_offsets`` and ``dep_indices`` - the dependencies in CSR form,
+          i.e. the indices of the dependencies of task ``i`` are
+          ``dep_indices[dep_offsets[i]:dep_offsets[i + 1]]``;
+        - the offsets of the UTF-8 task names and group names, followed by
+          the names themselves;
+    The dependencies are validated (existing and acyclic) when the file is
+    written, and are loaded without resolving any name. The cores, memory,
+    speeds and execution time distributions of the tasks are not stored, so
+    tasks using them cannot be packed.
+    """
+
+    durations: memoryview
+    group_ids: memoryview
+    dep_offsets: memoryview
+    dep_indices: memoryview
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as packed_file:
+            self.__mmap = mmap.mmap(packed_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__buffer = memoryview(self.__mmap)
+
+        if len(self.__buffer) < HEADER.size or self.__buffer[:4] != MAGIC:
+            self.close()
+            raise PipelinePlanningError(f'"{path}" is not a packed pipeline file.')
+
+        _, version, task_count, dep_count, group_count, names_size, groups_size = HEADER.unpack_from(self.__buffer)
+        if version != VERSION:
+            self.close()
+            raise PipelinePlanningError(f'Unsupported packed pipeline version: {version}')
+
+        offset = HEADER.size
+        sections = []
+        for count, typecode in [
+            (task_count, 'i'), (task_count, 'i'), (task_count + 1, 'I'), (dep_count, 'I'),
+            (task_count + 1, 'I'), (group_count + 1, 'I')
+        ]:
+            sections.append((offset, count, typecode))
+            offset += 4 * count
+
+        if offset + names_size + groups_size != len(self.__buffer):
+            self.close()
+            raise PipelinePlanningError(f'Packed pipeline file "{path}" is truncated or corrupted.')
+
+        (
+            self.durations, self.group_ids, self.dep_offsets, self.dep_indices, name_offsets, group_offsets
+        ) = [_int_section(self.__buffer, *section) for section in sections]
+
+        names = bytes(self.__buffer[offset:offset + names_size]).decode()
+        self.__names = [sys.intern(names[name_offsets[i]:name_offsets[i + 1]]) for i in range(task_count)]
+        offset += names_size
+        group_names = bytes(self.__buffer[offset:offset + groups_size]).decode()
+        self.__groups = [group_names[group_offsets[i]:group_offsets[i + 1]] for i in range(group_count)]
+
+        for view in [name_offsets, group_offsets]:
+            if isinstance(view, memoryview):
+                view.release()
+
+    @staticmethod
+    def is_packed(path: str) -> bool:
+        with open(path, 'rb') as packed_file:
+            return packed_file.read(len(MAGIC)) == MAGIC
+
+    @staticmethod
+    def write(tasks: list[Task], path: str) -> None:
+        """Writes the (validated) tasks as a packed pipeline file."""
+        unsupported = [
+            task.name for task in tasks
+            if task.cores > 1 or task.memory > 0 or task.speeds or task.distribution is not None
+        ]
+        if len(unsupported) > 0:
+            raise PipelinePlanningError(
+                f'Tasks with cores, memory, speeds or execution time distributions cannot be packed: '
+                f'{", ".join(unsupported)}'
+            )
+
+        graph = TaskGraph(tasks)
+
+        group_indices = {}
+        for task in tasks:
+            if task.has_group():
+                group_indices.setdefault(task.group, len(group_indices))
+
+        dep_offsets = array.array('I', [0])
+        dep_indices = array.array('I')
+        for preds in graph.predecessors:
+            dep_indices.extend(preds)
+            dep_offsets.append(len(dep_indices))
+
+        names, name_offsets = PackedPipeline.__pack_strings(graph.names)
+        groups, group_offsets = PackedPipeline.__pack_strings(list(group_indices))
+
+        sections = [
+            array.array('i', graph.durations),
+            array.array('i', [group_indices[task.group] if task.has_group() else -1 for task in tasks]),
+            dep_offsets, dep_indices, name_offsets, group_offsets
+        ]
+        if sys.byteorder != 'little':
+            for section in sections:
+                section.byteswap()
+
+        with open(path, 'wb') as packed_file:
+            packed_file.write(HEADER.pack(
+                MAGIC, VERSION, len(tasks), len(dep_indices), len(group_indices), len(names), len(groups)
+            ))
+            for section in sections:
+                packed_file.write(section.tobytes())
+            packed_file.write(names)
+            packed_file.write(groups)
+
+    @staticmethod
+    def __pack_strings(strings: list[str]) -> tuple[bytes, array.array]:
+        # The offsets index the decoded string, so that it can be sliced directly
+        offsets = array.array('I', [0])
+        for string in strings:
+            offsets.append(offsets[-1] + len(string))
+
+        return ''.join(strings).encode(), offsets
+
+    def __len__(self) -> int:
+        return len(self.__names)
+
+    @property
+    def names(self) -> list[str]:
+        return self.__names
+
+    @property
+    def groups(self) -> list[str]:
+        return self.__groups
+
+    def dependencies(self, index: int) -> memoryview:
+        return self.dep_indices[self.dep_offsets[index]:self.dep_offsets[index + 1]]
+
+    def task_graph(self) -> TaskGraph:
+        return TaskGraph.from_adjacency(
+            self.__names, self.durations, [self.dependencies(i).tolist() for i in range(len(self))]
+        )
+
+    def task(self, index: int) -> Task:
+        group_id = self.group_ids[index]
+        return Task(
+            self.__names[index],
+            self.__groups[group_id] if group_id >= 0 else '',
+            self.durations[index],
+            _PackedDependencies(self.__names, tuple(self.dependencies(index)))
+        )
+
+    def tasks(self) -> PackedTasks:
+        return PackedTasks(self)
+
+    def close(self) -> None:
+        # The views must be released before the memory map can be closed
+        for view in [
+            getattr(self, name, None) for name in ['durations', 'group_ids', 'dep_offsets', 'dep_indices']
+        ]:
+            if isinstance(view, memoryview):
+                view.release()
+        self.__buffer.release()
+        self.__mmap.close()
+
+    def __enter__(self) -> 'PackedPipeline':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,71 @@
+import math
+import random
+from pipeline_planner.task import Task
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+
+
+DURATION_DISTRIBUTIONS = ['uniform', 'exponential', 'lognormal']
+
+
+def generate_pipeline(
+    task_count: int,
+    depth: int = 8,
+    max_fan_in: int = 2,
+    group_count: int = 0,
+    duration_distribution: str = 'uniform',
+    min_duration: int = 1,
+    max_duration: int = 30,
+    seed: int = 0
+) -> list[Task]:
+    """
+    Generates a random layered pipeline, the same one for the same arguments.
+
+    The tasks ``T0``, ``T1``, ... are split evenly into ``depth`` layers and
+    every task after the first layer depends on 1 to ``max_fan_in`` tasks of
+    the previous layer, so the longest dependency chain has exactly ``depth``
+    tasks. Every task is in one of the ``group_count`` groups or in no group,
+    with equal probability. The execution times are in
+    [min_duration, max_duration] and follow ``duration_distribution``:
+        - "uniform" - all the times are equally likely;
+        - "exponential" - mostly short tasks, with a mean of a quarter of the
+          range;
+        - "lognormal" - centered on the geometric mean of the bounds, with a
+          long tail of long tasks;
+    """
+    if task_count < 1 or depth < 1 or max_fan_in < 1 or group_count < 0:
+        raise PipelinePlanningError(
+            'The task count, depth and fan-in must be positive and the group count must not be negative.'
+        )
+    if min_duration < 1 or max_duration < min_duration:
+        raise PipelinePlanningError(f'Invalid execution time range: [{min_duration}, {max_duration}]')
+    if duration_distribution not in DURATION_DISTRIBUTIONS:
+        raise PipelinePlanningError(f'Unsupported execution time distribution: {duration_distribution}')
+
+    rnd = random.Random(seed)
+    depth = min(depth, task_count)
+
+    def duration() -> int:
+        if duration_distribution == 'uniform':
+            value = rnd.randint(min_duration, max_duration)
+        elif duration_distribution == 'exponential':
+            value = min_duration + rnd.expovariate(4 / max(1, max_duration - min_duration))
+        else:
+            value = rnd.lognormvariate(math.log(math.sqrt(min_duration * max_duration)), 1)
+        return max(min_duration, min(max_duration, round(value)))
+
+    # The first task of every layer, with the end of the last layer appended
+    layer_starts = [layer * task_count // depth for layer in range(depth + 1)]
+
+    tasks = []
+    for layer in range(depth):
+        previous = range(layer_starts[layer - 1], layer_starts[layer]) if layer > 0 else range(0)
+        for i in range(layer_starts[layer], layer_starts[layer + 1]):
+            deps = set()
+            if len(previous) > 0:
+                fan_in = rnd.randint(1, min(max_fan_in, len(previous)))
+                deps = {f'T{dep}' for dep in rnd.sample(previous, fan_in)}
+
+            group = rnd.randrange(group_count + 1)
+            tasks.append(Task(f'T{i}', f'G{group}' if group < group_count else '', duration(), deps))
+
+    return tasks
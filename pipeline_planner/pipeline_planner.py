@@ -1,13 +1,31 @@
-import collections
+import contextlib
+import dataclasses
 import logging
-import itertools as it
+import math
+import os
+import threading
+from typing import Callable, Sequence, TYPE_CHECKING
 from ortools.sat.python import cp_model
 from pipeline_planner.task import Task, ScheduledTask
+from pipeline_planner.planning_model import PlanningModel
+from pipeline_planner.plan_result import PlanResult
+from pipeline_planner.plan_cache import PlanCache
+from pipeline_planner.plan_profile import PlanProfile
+from pipeline_planner.task_diff import TaskDiff
+from pipeline_planner.core_assignment import assign_cores, assign_core_sets
+from pipeline_planner.task_graph import TaskGraph
+from pipeline_planner.machine import Machine, CoreClass, check_single_core
+from pipeline_planner.packed_pipeline import PackedPipeline
+from pipeline_planner.list_scheduler import ListScheduler, ListSchedule
+from pipeline_planner.fast_path import plan_by_list_scheduling
 from pipeline_planner.pipeline_planning_error import PipelinePlanningError
 
+if TYPE_CHECKING:
+    from pipeline_planner.schedule_evaluator import RobustPlanResult
 
-def _task_pair_key(l_task: str, r_task: str) -> str:
-    return f'{l_task}_{r_task}' if l_task < r_task else f'{r_task}_{l_task}'
+
+def _phase(profile: PlanProfile | None, name: str) -> contextlib.AbstractContextManager:
+    return profile.phase(name) if profile is not None else contextlib.nullcontext()
 
 
 class PipelinePlanner:
@@ -19,38 +37,70 @@ class PipelinePlanner:
         - ensures there are no tasks with duplicated names;
         - ensures there are no circular dependencies;
         - ensures all dependencies are also exist as tasks;
+    The checks run in O(V+E) when the planner is created (see ``TaskGraph``),
+    so invalid pipelines are rejected before any CP-SAT model is built. A
+    ``graph`` already built for the tasks (e.g. for ``plan_trivially``) is
+    used as is, and a ``profile`` records the checks as its "validate" phase.
     """
 
-    __tasks: dict[str, Task]
-    __groups: dict[str, list[Task]]
+    __task_list: Sequence[Task]  # indexed like the graph, built on access for a packed pipeline
+    __group_ids: list[int]  # indexed like the graph, -1 for tasks without a group
+    __has_multi_core_tasks: bool
+    __graph: TaskGraph
     __horizon: int
+    __plan_cache: PlanCache
+    __stop_lock: threading.Lock
+    __stop_requested: bool
+    __running_callback: '_PlanSolutionCallback | None'  # the callback of the running solve
 
-    def __init__(self, tasks: list[Task]):
-        self.__tasks = {}
-        self.__groups = collections.defaultdict(list[Task])
-        self.__horizon = sum(task.execution_time for task in tasks)
+    def __init__(
+        self,
+        tasks: list[Task] | PackedPipeline,
+        plan_cache: PlanCache | None = None,
+        graph: TaskGraph | None = None,
+        profile: PlanProfile | None = None
+    ):
+        self.__plan_cache = plan_cache
+        self.__stop_lock = threading.Lock()
+        self.__stop_requested = False
+        self.__running_callback = None
 
-        self.__build_associativity(tasks)
+        with _phase(profile, 'validate'):
+            if isinstance(tasks, PackedPipeline):
+                # The packed dependencies are already resolved and validated,
+                # and the graph and groups are read from the packed arrays, so
+                # no task is built before the plan is
+                self.__task_list = tasks.tasks()
+                self.__group_ids = list(tasks.group_ids)
+                self.__graph = graph if graph is not None else tasks.task_graph()
+                self.__has_multi_core_tasks = False  # not stored by the packed format
+            else:
+                self.__task_list = list(tasks)
+                self.__graph = graph if graph is not None else TaskGraph(self.__task_list)
+                self.__build_group_ids()
+                self.__has_multi_core_tasks = any(task.cores > 1 for task in self.__task_list)
 
-    def __build_associativity(self, tasks: list[Task]) -> None:
-        self.__tasks = {task.name: task for task in tasks}
+        self.__horizon = sum(self.__graph.durations)
 
-        if len(tasks) != len(self.__tasks):
-            raise PipelinePlanningError(
-                'Pipeline tasks contain duplicated task names.'
-            )
+        logging.debug(f'Critical path length = {self.__graph.critical_path_length}')
 
-        for task in tasks:
-            if task.has_group():
-                self.__groups[task.group].append(task)
+    @property
+    def task_graph(self) -> TaskGraph:
+        return self.__graph
 
-                for dep_name in task.dependencies:
-                    if dep_name not in self.__tasks:
-                        raise PipelinePlanningError(
-                            f'Task {task.name} has non-existent dependency: {dep_name}'
-                        )
+    def __build_group_ids(self) -> None:
+        group_ids = {}
+        self.__group_ids = [
+            group_ids.setdefault(task.group, len(group_ids)) if task.has_group() else -1 for task in self.__task_list
+        ]
 
-    def plan(self, cpu_cores: int) -> list[ScheduledTask]:
+    def build_model(
+        self,
+        cpu_cores: int,
+        cumulative_cores: bool = False,
+        upper_bound: int | None = None,
+        heuristic_plan: ListSchedule | None = None
+    ) -> PlanningModel:
         """
         The plan is a slight variation on the flexible jobshop problem: https://github.com/google/or-tools/blob/master/examples/python/flexible_job_shop_sat.py
         The only modifications needed are:
@@ -61,107 +111,963 @@ class PipelinePlanner:
               the deps between any 2 tasks, regardless of the group they belong
               to;
             - ensure that tasks from different groups cannot be executed
-              simultaneously. This can be modeled by ensuring that tasks from
-              different group do NOT overlap. See: https://github.com/google/or-tools/blob/554cbccaa95b4c11eced13f145de1bf468e1f919/ortools/sat/samples/no_overlap_sample_sat.py#L50
+              simultaneously. Each grouped task gets a single cumulative
+              constraint in which it consumes the whole capacity, while the
+              tasks from the other groups consume one unit each - the other
+              tasks can still overlap among themselves, but none of them can
+              overlap the task. Pairs of tasks already ordered by their
+              dependencies are skipped, and with a single CPU core the
+              constraint is implied by the core's NoOverlap. Only the number
+              of constraints is linear: the cumulatives still hold one
+              element per pair of unordered tasks from different groups, so
+              the model size and build time grow quadratically with the
+              grouped tasks (e.g. 3.2M elements, 21 MB and 7 s to build for
+              3,000 tasks in 8 groups, see benchmarks/group_exclusivity.py).
+
+        The start and end of every task are restricted to the window allowed by
+        its critical-path bounds: it cannot start before its longest chain of
+        dependencies completes, and it must end early enough for its longest
+        chain of dependents to complete within the makespan upper bound. The
+        upper bound comes from the plan of the ``ListScheduler`` (unless
+        ``upper_bound`` is given), which is also given to the solver as a hint
+        so it starts from a good solution - unless the ``heuristic_plan`` of
+        the ``ListScheduler`` is already known. The makespan itself is bounded
+        below by the critical path length and by the total work spread over
+        all the cores.
+
+        Every task runs on a single core - tasks running on several cores are
+        only planned by ``build_machine_model``.
+
+        With ``cumulative_cores`` the CPU cores are treated as interchangeable:
+        instead of one optional interval per (task, core) they become a single
+        cumulative resource of capacity ``cpu_cores``, which removes the
+        ``cpu_cores!`` symmetric copies of every solution and keeps the model
+        size independent of the core count. The cores are then assigned after
+        solving (see ``assign_cores``). As the group constraints are always
+        present in this mode, the capacity of the cumulative can be changed to
+        plan for a different number of cores (see ``sweep``).
         """
 
-        logging.debug(f'Tasks horizon = {self.__horizon}')
+        self.__check_single_core('by this planning mode (plan them on a machine)')
 
-        intervals_per_core = collections.defaultdict(list)  # indexed by core id
-        intervals = {}  # indexed by task name
-        starts = {}  # indexed by task name
-        ends = {}  # indexed by task name
-        presences = {}  # indexed by (task name, cpu core id).
+        graph = self.__graph
+        durations = graph.durations
+        if heuristic_plan is None:
+            heuristic_plan = self.__list_scheduler().list_schedule(cpu_cores)
+        if upper_bound is None:
+            upper_bound = min(
+                self.__horizon,
+                max((start + duration for start, duration in zip(heuristic_plan.starts, durations)), default=0)
+            )
+        lower_bound = self.__makespan_lower_bound(cpu_cores)
+
+        logging.debug(f'Tasks horizon = {self.__horizon}, makespan bounds = [{lower_bound}, {upper_bound}]')
+
+        # Every variable is indexed by the task index in the graph. The
+        # variables are left unnamed to keep the model small.
+        intervals_per_core = [[] for _ in range(cpu_cores)]
+        intervals, starts, ends = [], [], []
+        presences = []  # indexed by task index, then by cpu core id
 
         model = cp_model.CpModel()
 
         # Create the relevant variables and intervals
-        for task in self.__tasks.values():
+        for i, (duration, head, tail) in enumerate(zip(durations, graph.heads, graph.tails)):
             # Create main interval for the task
-            suffix_name = task.name
-            start = model.NewIntVar(0, self.__horizon, f'start_{suffix_name}')
-            end = model.NewIntVar(0, self.__horizon, f'end_{suffix_name}')
-            interval = model.NewIntervalVar(
-                start, task.execution_time, end, f'interval_{suffix_name}'
-            )
+            start = model.NewIntVar(head, upper_bound - tail, '')
+            end = model.NewIntVar(head + duration, upper_bound - tail + duration, '')
+            interval = model.NewIntervalVar(start, duration, end, '')
 
-            intervals[task.name] = interval
-            starts[task.name] = start
-            ends[task.name] = end
-
-            # Create alternative intervals for the different cpu cores
-            if cpu_cores > 1:
-                l_presences = []
-                for core in range(cpu_cores):
-                    alt_suffix = f'_{task.name}_{core}'
-                    l_presence = model.NewBoolVar(f'presence_{alt_suffix}')
-                    l_start = model.NewIntVar(0, self.__horizon, f'start_{alt_suffix}')
-                    l_end = model.NewIntVar(0, self.__horizon, f'end_{alt_suffix}')
-                    l_interval = model.NewOptionalIntervalVar(
-                        l_start, task.execution_time, l_end, l_presence, f'interval_{alt_suffix}'
-                    )
-                    l_presences.append(l_presence)
+            intervals.append(interval)
+            starts.append(start)
+            ends.append(end)
 
-                    # Link the master variables with the local ones
-                    model.Add(start == l_start).OnlyEnforceIf(l_presence)
-                    model.Add(end == l_end).OnlyEnforceIf(l_presence)
+            hint_start = heuristic_plan.starts[i]
+            model.AddHint(start, hint_start)
+            model.AddHint(end, hint_start + duration)
 
-                    # Add the local interval to the relevant cpu core
-                    intervals_per_core[core].append(l_interval)
+            # Create alternative intervals for the different cpu cores. They
+            # share the start of the main interval and, being of fixed size,
+            # need no constraint linking their start and end.
+            if cumulative_cores or cpu_cores == 1:
+                presences.append([])
+                intervals_per_core[0].append(interval)
+                continue
 
-                    presences[(task.name, core)] = l_presence
+            # The hinted plan is only a complete solution once the cores of its tasks are hinted too
+            l_presences = [model.NewBoolVar('') for _ in range(cpu_cores)]
+            for core, l_presence in enumerate(l_presences):
+                intervals_per_core[core].append(model.NewOptionalFixedSizeIntervalVar(start, duration, l_presence, ''))
+                model.AddHint(l_presence, int(core == heuristic_plan.cores[i]))
 
-                model.AddExactlyOne(l_presences)
-            else:
-                intervals_per_core[0].append(interval)
-                presences[(task.name, 0)] = model.NewConstant(1)
+            model.AddExactlyOne(l_presences)
+            presences.append(l_presences)
 
         # Enforce task dependencies
-        for task in self.__tasks.values():
-            for dep in task.dependencies:
-                model.Add(starts[task.name] >= ends[dep])
+        for i, preds in enumerate(graph.predecessors):
+            for pred in preds:
+                model.Add(starts[i] >= ends[pred])
 
         # Ensure tasks from different groups cannot run simultaneously
-        for g1_tasks, g2_tasks in it.combinations(self.__groups.values(), 2):
-            for g1_task, g2_task in it.product(g1_tasks, g2_tasks):
-                model.AddNoOverlap(
-                    [intervals[g1_task.name], intervals[g2_task.name]]
-                )
+        if cpu_cores > 1 or cumulative_cores:
+            self.__add_group_exclusivity(model, intervals)
 
         # Ensure each CPU core can run a single task at a time
-        for core in range(cpu_cores):
-            intervals = intervals_per_core[core]
-            if len(intervals) > 1:
-                model.AddNoOverlap(intervals)
+        core_capacity = None
+        if cumulative_cores:
+            core_capacity = model.AddCumulative(intervals, [1] * len(intervals), cpu_cores)
+        else:
+            for core_intervals in intervals_per_core:
+                if len(core_intervals) > 1:
+                    model.AddNoOverlap(core_intervals)
 
         # Define the objective
-        makespan = model.NewIntVar(0, self.__horizon, 'makespan')
-        model.AddMaxEquality(makespan, [end for end in ends.values()])
+        makespan = model.NewIntVar(lower_bound, upper_bound, 'makespan')
+        model.AddMaxEquality(makespan, ends)
         model.Minimize(makespan)
 
+        return PlanningModel(
+            model,
+            starts,
+            ends,
+            intervals,
+            presences,
+            makespan,
+            cpu_cores,
+            lower_bound,
+            heuristic_plan,
+            core_capacity
+        )
+
+    def build_machine_model(self, machine: Machine) -> PlanningModel:
+        """
+        Builds the planning model of the pipeline on a ``Machine``, where the
+        tasks can need several cores and some memory, and run faster on some
+        classes of cores.
+
+        Instead of one interval per core, each task gets one optional interval
+        per class of cores it fits on, sized by its execution time on that
+        class, and every class is a cumulative resource whose capacity is its
+        number of cores (the demand of a task being its number of cores). The
+        memory is one more cumulative over the tasks, so the model grows with
+        the number of core classes rather than of cores. The cores are
+        assigned within their class after solving (see ``assign_core_sets``).
+
+        The bounds of the tasks and of the makespan come from the shortest
+        execution time of every task, and the tasks run one after the other,
+        each on its fastest class, in the hinted plan.
+        """
+        machine.validate(self.__task_list)
+
+        graph = self.__graph
+        core_classes = machine.core_classes
+        class_durations = [
+            [machine.execution_time(task, core_class) if task.cores <= core_class.cores else None
+             for core_class in core_classes]
+            for task in self.__task_list
+        ]
+        shortest = [min(duration for duration in durations if duration is not None) for durations in class_durations]
+        bounds = TaskGraph.from_adjacency(graph.names, shortest, graph.predecessors)
+
+        heuristic_plan = self.__sequential_plan(machine, class_durations)
+        upper_bound = sum(shortest)
+        lower_bound = max(
+            bounds.critical_path_length,
+            -(-sum(duration * task.cores for duration, task in zip(shortest, self.__task_list)) // machine.cpu_cores)
+        )
+
+        logging.debug(f'Machine makespan bounds = [{lower_bound}, {upper_bound}]')
+
+        model = cp_model.CpModel()
+        intervals, starts, ends, presences = [], [], [], []
+        class_intervals = [[] for _ in core_classes]
+        class_demands = [[] for _ in core_classes]
+
+        for i, (durations, head, tail) in enumerate(zip(class_durations, bounds.heads, bounds.tails)):
+            # The tail includes the shortest execution time of the task
+            start = model.NewIntVar(head, upper_bound - tail, '')
+            end = model.NewIntVar(head + shortest[i], upper_bound - tail + shortest[i], '')
+            options = [(k, duration) for k, duration in enumerate(durations) if duration is not None]
+
+            if len(options) == 1:
+                k, duration = options[0]
+                interval = model.NewIntervalVar(start, duration, end, '')
+                class_intervals[k].append(interval)
+                class_demands[k].append(self.__task_list[i].cores)
+                presences.append([model.NewConstant(int(j == k)) for j in range(len(core_classes))])
+            else:
+                size = model.NewIntVarFromDomain(
+                    cp_model.Domain.FromValues([duration for _, duration in options]), ''
+                )
+                interval = model.NewIntervalVar(start, size, end, '')
+
+                l_presences = [model.NewConstant(0)] * len(core_classes)
+                for k, duration in options:
+                    l_presences[k] = model.NewBoolVar('')
+                    model.Add(size == duration).OnlyEnforceIf(l_presences[k])
+                    class_intervals[k].append(
+                        model.NewOptionalFixedSizeIntervalVar(start, duration, l_presences[k], '')
+                    )
+                    class_demands[k].append(self.__task_list[i].cores)
+                    model.AddHint(l_presences[k], int(heuristic_plan[i].task.execution_time == duration))
+
+                model.AddExactlyOne(l_presences[k] for k, _ in options)
+                presences.append(l_presences)
+
+            intervals.append(interval)
+            starts.append(start)
+            ends.append(end)
+
+            model.AddHint(start, heuristic_plan[i].start)
+            model.AddHint(end, heuristic_plan[i].start + heuristic_plan[i].task.execution_time)
+
+        # Enforce task dependencies
+        for i, preds in enumerate(graph.predecessors):
+            for pred in preds:
+                model.Add(starts[i] >= ends[pred])
+
+        # Ensure tasks from different groups cannot run simultaneously
+        if machine.cpu_cores > 1:
+            self.__add_group_exclusivity(model, intervals)
+
+        # Ensure each class of cores runs as many tasks as it has cores
+        for core_class, core_intervals, demands in zip(core_classes, class_intervals, class_demands):
+            if len(core_intervals) > 1:
+                model.AddCumulative(core_intervals, demands, core_class.cores)
+
+        # Ensure the tasks running at once fit in memory
+        if machine.memory is not None:
+            memory_tasks = [i for i, task in enumerate(self.__task_list) if task.memory > 0]
+            if len(memory_tasks) > 1:
+                model.AddCumulative(
+                    [intervals[i] for i in memory_tasks], [self.__task_list[i].memory for i in memory_tasks],
+                    machine.memory
+                )
+
+        makespan = model.NewIntVar(lower_bound, upper_bound, 'makespan')
+        model.AddMaxEquality(makespan, ends)
+        model.Minimize(makespan)
+
+        return PlanningModel(
+            model,
+            starts,
+            ends,
+            intervals,
+            presences,
+            makespan,
+            machine.cpu_cores,
+            lower_bound,
+            heuristic_plan,
+            machine=machine
+        )
+
+    def __sequential_plan(self, machine: Machine, class_durations: list[list[int | None]]) -> list[ScheduledTask]:
+        # Runs the tasks one after the other, in topological order, each on
+        # the first cores of its fastest class
+        first_cores = machine.first_cores()
+        scheduled_tasks = [None] * len(self.__task_list)
+        now = 0
+        for i in self.__graph.order:
+            task = self.__task_list[i]
+            duration, k = min((duration, k) for k, duration in enumerate(class_durations[i]) if duration is not None)
+            cores = tuple(range(first_cores[k], first_cores[k] + task.cores))
+            scheduled_tasks[i] = ScheduledTask(
+                dataclasses.replace(task, execution_time=duration), cores[0], now, cores if len(cores) > 1 else ()
+            )
+            now += duration
+
+        return scheduled_tasks
+
+    def __list_scheduler(self) -> ListScheduler:
+        # The tasks on several cores are rejected or planned on a machine before
+        return ListScheduler(self.__task_list, self.__graph, self.__group_ids, single_core=True)
+
+    def __check_single_core(self, planner: str) -> None:
+        if self.__has_multi_core_tasks:
+            check_single_core(self.__task_list, planner)
+
+    def __makespan_lower_bound(self, cpu_cores: int) -> int:
+        return max(self.__graph.critical_path_length, -(-self.__horizon // cpu_cores))
+
+    def __add_group_exclusivity(self, model: cp_model.CpModel, intervals: list[cp_model.IntervalVar]) -> None:
+        ancestors = self.__graph.ancestors()
+        group_ids = self.__group_ids
+        grouped = [i for i, group_id in enumerate(group_ids) if group_id >= 0]
+
+        def are_ordered(l_index: int, r_index: int) -> bool:
+            return bool((ancestors[l_index] >> r_index) & 1 or (ancestors[r_index] >> l_index) & 1)
+
+        # Each pair of conflicting tasks is covered once, by the cumulative of
+        # the task which comes first in the pipeline definition
+        for pos, index in enumerate(grouped):
+            others = [
+                intervals[o_index] for o_index in grouped[pos + 1:]
+                if group_ids[o_index] != group_ids[index] and not are_ordered(index, o_index)
+            ]
+            if len(others) > 0:
+                model.AddCumulative(
+                    [intervals[index]] + others, [len(others)] + [1] * len(others), len(others)
+                )
+
+    def plan(
+        self,
+        cpu_cores: int,
+        cumulative_cores: bool = False,
+        time_limit: float | None = None,
+        relative_gap: float | None = None,
+        solution_callback: Callable[[PlanResult], None] | None = None,
+        num_workers: int | None = None,
+        profile: PlanProfile | None = None,
+        list_schedule: PlanResult | None = None
+    ) -> list[ScheduledTask]:
+        """
+        Returns the best plan found (see ``solve``).
+        """
+        return self.solve(
+            cpu_cores,
+            cumulative_cores,
+            time_limit,
+            relative_gap,
+            solution_callback,
+            num_workers,
+            profile,
+            list_schedule
+        ).scheduled_tasks
+
+    def solve(
+        self,
+        cpu_cores: int,
+        cumulative_cores: bool = False,
+        time_limit: float | None = None,
+        relative_gap: float | None = None,
+        solution_callback: Callable[[PlanResult], None] | None = None,
+        num_workers: int | None = None,
+        profile: PlanProfile | None = None,
+        list_schedule: PlanResult | None = None
+    ) -> PlanResult:
+        """
+        Solves the planning model and returns the best plan found along with
+        its proven lower bound.
+
+        Without any limits the solver runs until the plan is proven optimal.
+        With ``time_limit`` (in seconds) and/or ``relative_gap`` it stops
+        earlier and returns the best feasible plan - or the heuristic plan if
+        it has not found a solution of its own. ``solution_callback`` is
+        called with every improving plan found during the search.
+
+        CP-SAT runs ``num_workers`` parallel search workers, one per host CPU
+        core by default.
+
+        Tasks running on several cores are planned as on a ``Machine`` with
+        ``cpu_cores`` identical cores (see ``solve_machine``).
+
+        When the planner has a ``PlanCache``, a plan found before for the same
+        pipeline, core count and solver settings is returned without solving.
+        Otherwise, when the plan of the ``ListScheduler`` is provably optimal,
+        it is returned without building the model (see ``plan_trivially``) -
+        and without calling ``solution_callback``. A ``list_schedule`` already
+        found for ``cpu_cores`` by ``plan_by_list_scheduling`` is not
+        scheduled again.
+
+        A ``profile`` is filled in with the timings of the model build, solve
+        and extract phases and with the model and solver statistics - so the
+        model is then always built and solved.
+        """
+        if self.__has_multi_core_tasks:
+            machine = Machine([CoreClass('cpu', cpu_cores)])
+            return self.solve_machine(machine, time_limit, relative_gap, solution_callback, num_workers, profile)
+
+        cache_key = None
+        if self.__plan_cache is not None:
+            tasks = self.__task_list
+            cache_key = PlanCache.key(tasks, cpu_cores, {
+                'cumulative_cores': cumulative_cores, 'time_limit': time_limit, 'relative_gap': relative_gap
+            })
+            if (result := self.__plan_cache.get(cache_key, tasks)) is not None:
+                logging.debug(f'Found plan {cache_key} in the plan cache.')
+                return result
+
+        if profile is None:
+            if list_schedule is None:
+                list_schedule = plan_by_list_scheduling(
+                    self.__task_list, cpu_cores, self.__graph, self.__list_scheduler()
+                )
+            if list_schedule.is_optimal():
+                logging.debug('The list schedule is optimal, skipping the solver.')
+                return dataclasses.replace(list_schedule, scheduled_tasks=list(list_schedule.scheduled_tasks))
+
+        with _phase(profile, 'model build'):
+            planning_model = self.build_model(
+                cpu_cores,
+                cumulative_cores,
+                heuristic_plan=list_schedule.scheduled_tasks if list_schedule is not None else None
+            )
+        if profile is not None:
+            profile.record_model(planning_model.model)
+
+        result = self.__solve_model(
+            planning_model, time_limit, relative_gap, solution_callback, num_workers, profile
+        )
+
+        if cache_key is not None:
+            self.__plan_cache.put(cache_key, result)
+
+        return result
+
+    def solve_machine(
+        self,
+        machine: Machine,
+        time_limit: float | None = None,
+        relative_gap: float | None = None,
+        solution_callback: Callable[[PlanResult], None] | None = None,
+        num_workers: int | None = None,
+        profile: PlanProfile | None = None
+    ) -> PlanResult:
+        """
+        Solves the planning model of the pipeline on a ``Machine`` (see
+        ``build_machine_model``) like ``solve``. The tasks of the plan hold
+        their execution time on the cores they were planned on.
+        """
+        with _phase(profile, 'model build'):
+            planning_model = self.build_machine_model(machine)
+        if profile is not None:
+            profile.record_model(planning_model.model)
+
+        return self.__solve_model(planning_model, time_limit, relative_gap, solution_callback, num_workers, profile)
+
+    def solve_robust(
+        self,
+        cpu_cores: int,
+        scenarios: int = 10000,
+        percentile: float = 95,
+        cumulative_cores: bool = False,
+        time_limit: float | None = None,
+        num_workers: int | None = None,
+        seed: int = 0
+    ) -> 'RobustPlanResult':
+        """
+        Returns the plan with the lowest ``percentile`` of its makespan over
+        ``scenarios`` sampled execution times (see ``ScheduleEvaluator``),
+        rather than the lowest makespan with the planned execution times.
+
+        The candidate plans are the plan of the ``ListScheduler``, every
+        improving plan found while solving with the planned execution times
+        and the plan solved with the ``percentile`` of every execution time,
+        which leaves room for the longer ones. All of them are evaluated with
+        the same scenarios; ties are broken by the planned makespan.
+        """
+        # Only imported for robust planning, as it imports NumPy
+        from pipeline_planner.schedule_evaluator import ScheduleEvaluator, RobustPlanResult
+
+        self.__check_single_core('by robust planning')
+        evaluator = ScheduleEvaluator(self.__task_list, scenarios, seed, self.__graph)
+
+        candidates = [self.__list_scheduler().schedule(cpu_cores)]
+        nominal = self.solve(
+            cpu_cores,
+            cumulative_cores,
+            time_limit,
+            solution_callback=lambda result: candidates.append(result.scheduled_tasks),
+            num_workers=num_workers
+        )
+        candidates.append(nominal.scheduled_tasks)
+
+        pessimistic_durations = evaluator.duration_percentiles(percentile)
+        if pessimistic_durations != self.__graph.durations:
+            pessimistic_plan = PipelinePlanner([
+                dataclasses.replace(task, execution_time=duration)
+                for task, duration in zip(self.__task_list, pessimistic_durations)
+            ]).plan(cpu_cores, cumulative_cores, time_limit, num_workers=num_workers)
+            candidates.append([
+                ScheduledTask(task, s_task.core, s_task.start)
+                for task, s_task in zip(self.__task_list, pessimistic_plan)
+            ])
+
+        distributions = [evaluator.evaluate(candidate) for candidate in candidates]
+        best = min(
+            range(len(candidates)), key=lambda i: (distributions[i].percentile(percentile), distributions[i].nominal)
+        )
+
+        logging.debug(
+            f'Chose candidate plan {best} of {len(candidates)}, makespan p{percentile} = '
+            f'{distributions[best].percentile(percentile):.1f} (planned makespan = {distributions[best].nominal})'
+        )
+
+        return RobustPlanResult(candidates[best], distributions[best].nominal, distributions[best], len(candidates))
+
+    def solve_coarse(
+        self,
+        cpu_cores: int,
+        bucket: int | None = None,
+        polish_time_limit: float | None = None,
+        cumulative_cores: bool = False,
+        time_limit: float | None = None,
+        relative_gap: float | None = None,
+        num_workers: int | None = None
+    ) -> PlanResult:
+        """
+        Solves a smaller model in a coarser time unit and maps its plan back to
+        minutes, for pipelines with long execution times (whose variable
+        domains grow with the horizon).
+
+        By default the time unit is the GCD of the execution times, which
+        plans exactly as ``solve``. With ``bucket``, the execution times are
+        rounded up to multiples of ``bucket`` minutes - every task then gets
+        up to ``bucket - 1`` minutes more than it needs, and the plan is
+        reported against the lower bound of the original pipeline. With
+        ``polish_time_limit`` (in seconds), the mapped plan is then used as
+        the hint and the upper bound of a time-limited solve of the original
+        model, which removes some of the rounding slack.
+        """
+        if bucket is not None and bucket < 1:
+            raise PipelinePlanningError(f'Invalid time bucket: {bucket}')
+        if polish_time_limit is not None:
+            self.__check_single_core('when polishing a coarse plan')
+
+        time_unit = bucket if bucket is not None else math.gcd(*self.__graph.durations)
+        if time_unit == 1:
+            return self.solve(cpu_cores, cumulative_cores, time_limit, relative_gap, num_workers=num_workers)
+
+        coarse = PipelinePlanner([
+            dataclasses.replace(task, execution_time=-(-task.execution_time // time_unit))
+            for task in self.__task_list
+        ]).solve(cpu_cores, cumulative_cores, time_limit, relative_gap, num_workers=num_workers)
+
+        scheduled_tasks = [
+            ScheduledTask(task, s_task.core, s_task.start * time_unit, s_task.cores)
+            for task, s_task in zip(self.__task_list, coarse.scheduled_tasks)
+        ]
+        makespan = max((s_task.start + s_task.task.execution_time for s_task in scheduled_tasks), default=0)
+
+        if bucket is None:
+            # Every execution time is a multiple of the unit, so the plans map one to one
+            result = PlanResult(
+                scheduled_tasks, makespan, coarse.lower_bound * time_unit, coarse.status, coarse.wall_time
+            )
+        else:
+            lower_bound = self.__makespan_lower_bound(cpu_cores)
+            result = PlanResult(
+                scheduled_tasks,
+                makespan,
+                lower_bound,
+                'OPTIMAL' if makespan == lower_bound else 'FEASIBLE',
+                coarse.wall_time
+            )
+
+        logging.info(
+            f'Planned in units of {time_unit} minute(s): makespan {makespan}, '
+            f'lower bound {result.lower_bound} (gap = {result.gap:.2%})'
+        )
+
+        if polish_time_limit is None or result.is_optimal():
+            return result
+
+        polished = self.__solve_model(
+            self.__build_hinted_model(
+                cpu_cores, cumulative_cores, {s_task.task.name: s_task for s_task in scheduled_tasks}, makespan
+            ),
+            polish_time_limit,
+            None,
+            None,
+            num_workers
+        )
+        lower_bound = max(result.lower_bound, polished.lower_bound)
+        best = polished if polished.makespan < result.makespan else result
+
+        logging.info(f'Polished the plan from makespan {result.makespan} to {best.makespan}')
+
+        return PlanResult(
+            best.scheduled_tasks,
+            best.makespan,
+            lower_bound,
+            'OPTIMAL' if best.makespan == lower_bound else best.status,
+            result.wall_time + polished.wall_time
+        )
+
+    def sweep(
+        self, min_cores: int, max_cores: int, time_limit: float | None = None, num_workers: int | None = None
+    ) -> dict[int, PlanResult]:
+        """
+        Plans the pipeline for every core count in [min_cores, max_cores] and
+        returns the plans indexed by core count, e.g. to find the point after
+        which more cores stop reducing the makespan.
+
+        A single cumulative-cores model is built and only its core capacity
+        and makespan domain change between the solves. Since a plan remains
+        valid when more cores are available, the previous plan is used both as
+        the solution hint and as the makespan upper bound of the next solve.
+        Once a plan reaches the lower bound of the next core count, it is
+        reused without solving (with the critical-path bound, this applies to
+        all the remaining core counts).
+        """
+        if min_cores < 1 or max_cores < min_cores:
+            raise PipelinePlanningError(f'Invalid core range for the sweep: [{min_cores}, {max_cores}]')
+
+        planning_model = self.build_model(min_cores, cumulative_cores=True)
+        model = planning_model.model
+        makespan_domain = model.Proto().variables[planning_model.makespan.Index()].domain
+
+        results = {}
+        previous = None
+        for cpu_cores in range(min_cores, max_cores + 1):
+            lower_bound = self.__makespan_lower_bound(cpu_cores)
+
+            if previous is not None and previous.makespan <= lower_bound:
+                results[cpu_cores] = dataclasses.replace(previous, lower_bound=previous.makespan, wall_time=0.0)
+                continue
+
+            if previous is not None:
+                makespan_domain[:] = [lower_bound, previous.makespan]
+                model.ClearHints()
+                for start, end, s_task in zip(planning_model.starts, planning_model.ends, previous.scheduled_tasks):
+                    model.AddHint(start, s_task.start)
+                    model.AddHint(end, s_task.start + s_task.task.execution_time)
+
+            planning_model.core_capacity.Proto().cumulative.capacity.offset = cpu_cores
+            previous = results[cpu_cores] = self.__solve_model(
+                dataclasses.replace(planning_model, cpu_cores=cpu_cores, lower_bound=lower_bound),
+                time_limit,
+                None,
+                None,
+                num_workers
+            )
+
+            logging.debug(f'Makespan with {cpu_cores} core(s) = {previous.makespan}')
+
+        return results
+
+    def replan(
+        self,
+        cpu_cores: int,
+        previous: list[ScheduledTask],
+        diff: TaskDiff,
+        freeze_unaffected: bool = False,
+        cumulative_cores: bool = False,
+        time_limit: float | None = None,
+        num_workers: int | None = None
+    ) -> PlanResult:
+        """
+        Plans the pipeline after a small change, reusing the ``previous`` plan
+        of the pipeline before ``diff`` was applied (the planner itself must
+        hold the tasks after the change, e.g. ``diff.apply(old_tasks)``).
+
+        The tasks affected by the change are the added and modified ones and
+        every task (indirectly) depending on them. The previous start times
+        of all the other tasks are given to the solver as a hint and, with
+        ``freeze_unaffected``, are kept as they are - so only the affected
+        tasks are planned. The affected tasks can always run after the frozen
+        ones, so the whole pipeline is only planned again when the previous
+        plan does not fit the new pipeline - and when the solver does not find
+        a plan in time, the affected tasks are planned one after the other
+        once the frozen ones end. The lower bound of a
+        frozen plan is the one known before solving, since the solver only
+        proves bounds for the restricted problem.
+        """
+        affected = self.__downstream_cone(diff.changed_names())
+        previous_plan = {
+            s_task.task.name: s_task
+            for s_task in previous
+            if s_task.task.name in self.__graph.indices and s_task.task.name not in affected
+        }
+
+        logging.debug(f'Replanning {len(affected)} affected task(s), reusing {len(previous_plan)} planned task(s)')
+
+        if freeze_unaffected and len(previous_plan) > 0:
+            # The affected tasks run one after the other once the frozen ones end, in the hinted plan
+            graph = self.__graph
+            upper_bound = max(s_task.start + s_task.task.execution_time for s_task in previous_plan.values())
+            appended_plan = {}
+            for i in graph.order:
+                name, frozen = graph.names[i], previous_plan.get(graph.names[i])
+                if frozen is not None:
+                    appended_plan[name] = ScheduledTask(self.__task_list[i], frozen.core, frozen.start)
+                else:
+                    appended_plan[name] = ScheduledTask(self.__task_list[i], 0, upper_bound)
+                    upper_bound += graph.durations[i]
+
+            frozen_model = self.__build_hinted_model(cpu_cores, cumulative_cores, appended_plan, upper_bound)
+            for name, s_task in previous_plan.items():
+                index = graph.indices[name]
+                frozen_model.model.Add(frozen_model.starts[index] == s_task.start)
+                if s_task.core < len(frozen_model.presences[index]):
+                    frozen_model.model.Add(frozen_model.presences[index][s_task.core] == 1)
+
+            try:
+                result = self.__solve_model(frozen_model, time_limit, None, None, num_workers)
+                lower_bound = min(upper_bound, frozen_model.lower_bound)
+                if result.status == 'UNKNOWN':
+                    # The heuristic plan does not keep the frozen tasks
+                    return PlanResult(
+                        [appended_plan[name] for name in graph.names], upper_bound, lower_bound, 'FEASIBLE',
+                        result.wall_time
+                    )
+                return dataclasses.replace(result, lower_bound=min(result.makespan, lower_bound))
+            except PipelinePlanningError:
+                logging.info('The unaffected tasks cannot keep their previous plan, replanning all the tasks.')
+
+        return self.__solve_model(
+            self.__build_hinted_model(cpu_cores, cumulative_cores, previous_plan), time_limit, None, None, num_workers
+        )
+
+    def solve_within(
+        self,
+        cpu_cores: int,
+        plan: list[ScheduledTask],
+        earliest_starts: dict[str, int],
+        latest_ends: dict[str, int],
+        early_ends: list[str] | None = None,
+        time_limit: float | None = None,
+        num_workers: int | None = None
+    ) -> PlanResult:
+        """
+        Improves ``plan``, a valid plan of the pipeline where the tasks start
+        no earlier than their ``earliest_starts`` and end no later than their
+        ``latest_ends``, keeping the tasks within these times - e.g. as the
+        tasks wait for or are waited for by other pipelines.
+
+        The plan is given to the solver as the hint and its makespan as the
+        upper bound, and it is returned as is when the solver does not find a
+        plan of its own in time. With ``early_ends``, the plan found is then
+        solved again within its makespan, ending these tasks (e.g. the ones
+        waited for) as early as possible.
+        """
+        indices = self.__graph.indices
+
+        def build_model(hint: list[ScheduledTask], upper_bound: int) -> PlanningModel:
+            planning_model = self.__build_hinted_model(
+                cpu_cores, False, {s_task.task.name: s_task for s_task in hint}, upper_bound
+            )
+            for name, earliest_start in earliest_starts.items():
+                planning_model.model.Add(planning_model.starts[indices[name]] >= earliest_start)
+            for name, latest_end in latest_ends.items():
+                planning_model.model.Add(planning_model.ends[indices[name]] <= latest_end)
+            return planning_model
+
+        upper_bound = max((s_task.start + s_task.task.execution_time for s_task in plan), default=0)
+        result = self.__solve_model(build_model(plan, upper_bound), time_limit, None, None, num_workers)
+        if result.status == 'UNKNOWN':
+            # The heuristic plan does not know about the time windows
+            return PlanResult(plan, upper_bound, result.lower_bound, 'FEASIBLE', result.wall_time)
+        if not early_ends:
+            return result
+
+        planning_model = build_model(result.scheduled_tasks, result.makespan)
+        planning_model.model.Minimize(sum(planning_model.ends[indices[name]] for name in early_ends))
+        early_result = self.__solve_model(planning_model, time_limit, None, None, num_workers)
+
+        # Only the plan is kept, the bounds of the second solve are about the ends
+        return dataclasses.replace(
+            result,
+            scheduled_tasks=(
+                early_result.scheduled_tasks if early_result.status != 'UNKNOWN' else result.scheduled_tasks
+            ),
+            wall_time=result.wall_time + early_result.wall_time
+        )
+
+    def __build_hinted_model(
+        self,
+        cpu_cores: int,
+        cumulative_cores: bool,
+        previous_plan: dict[str, ScheduledTask],
+        upper_bound: int | None = None
+    ) -> PlanningModel:
+        planning_model = self.build_model(cpu_cores, cumulative_cores, upper_bound)
+
+        planning_model.model.ClearHints()
+        heuristic_plan, graph = planning_model.heuristic_plan, self.__graph
+        for i, (start, end, l_presences) in enumerate(
+            zip(planning_model.starts, planning_model.ends, planning_model.presences)
+        ):
+            hint = previous_plan.get(graph.names[i])
+            hint_start, hint_core = (
+                (hint.start, hint.core) if hint is not None else (heuristic_plan.starts[i], heuristic_plan.cores[i])
+            )
+            planning_model.model.AddHint(start, hint_start)
+            planning_model.model.AddHint(end, hint_start + graph.durations[i])
+            for core, l_presence in enumerate(l_presences):
+                planning_model.model.AddHint(l_presence, int(core == hint_core))
+
+        return planning_model
+
+    def __downstream_cone(self, names: set[str]) -> set[str]:
+        graph = self.__graph
+        pending = [graph.indices[name] for name in names if name in graph.indices]
+        cone = set(pending)
+        while pending:
+            for succ in graph.successors[pending.pop()]:
+                if succ not in cone:
+                    cone.add(succ)
+                    pending.append(succ)
+
+        return {graph.names[i] for i in cone}
+
+    def stop_search(self) -> None:
+        """
+        Stops the running solve, which then returns the best plan found so far,
+        and prevents any further solve. It can be called from any thread.
+        """
+        with self.__stop_lock:
+            self.__stop_requested = True
+            if self.__running_callback is not None:
+                self.__running_callback.StopSearch()
+
+    def __solve_model(
+        self,
+        planning_model: PlanningModel,
+        time_limit: float,
+        relative_gap: float,
+        solution_callback: Callable[[PlanResult], None],
+        num_workers: int,
+        profile: PlanProfile | None = None
+    ) -> PlanResult:
         solver = cp_model.CpSolver()
-        status = solver.StatusName(solver.Solve(model))
+        solver.parameters.num_workers = num_workers if num_workers is not None else (os.cpu_count() or 1)
+        if time_limit is not None:
+            solver.parameters.max_time_in_seconds = time_limit
+        if relative_gap is not None:
+            solver.parameters.relative_gap_limit = relative_gap
+
+        def on_solution(solution: Callable[[], list[int]], objective: float, bound: float, wall_time: float) -> None:
+            if self.__stop_requested:
+                callback.StopSearch()
+            if profile is not None:
+                profile.bound_progress.append([wall_time, round(objective), math.ceil(bound)])
+            if solution_callback is not None:
+                solution_callback(self.__build_result(planning_model, solution(), bound, 'FEASIBLE', wall_time))
 
-        if status == 'INFEASIBLE':
-            raise PipelinePlanningError('Impossible to schedule tasks - check for circular dependencies.')
+        # The callback is also the handle used to stop the search (see stop_search)
+        callback = _PlanSolutionCallback(on_solution)
+        with self.__stop_lock:
+            if self.__stop_requested:
+                raise PipelinePlanningError('The planning was stopped.')
+            self.__running_callback = callback
 
-        if status != 'OPTIMAL':
-            raise PipelinePlanningError('Failed to find an optimal solution.')
+        try:
+            with _phase(profile, 'solve'):
+                status = solver.StatusName(solver.Solve(planning_model.model, callback))
+        finally:
+            with self.__stop_lock:
+                self.__running_callback = None
+        if profile is not None:
+            profile.record_solver(solver, status)
 
-        # Generate the final result
-        scheduled_tasks = []
-        for task in self.__tasks.values():
-            task_start = solver.Value(starts[task.name])
-            selected_core = next(
-                (core for core in range(cpu_cores) if solver.Value(presences[(task.name, core)])), -1
+        with _phase(profile, 'extract'):
+            if status in ('OPTIMAL', 'FEASIBLE'):
+                result = self.__build_result(
+                    planning_model, list(solver.ResponseProto().solution), solver.BestObjectiveBound(), status,
+                    solver.WallTime()
+                )
+            elif status == 'UNKNOWN':
+                result = self.__build_heuristic_result(planning_model, solver.BestObjectiveBound(), solver.WallTime())
+            else:
+                raise PipelinePlanningError(f'Failed to find a solution (solver status: {status}).')
+
+        if result.is_optimal():
+            logging.debug(f'Found optimal solution in {result.wall_time} second(s).')
+        else:
+            logging.info(
+                f'Found a solution with makespan {result.makespan} in {result.wall_time} second(s), '
+                f'but it is not proven optimal (lower bound = {result.lower_bound}, gap = {result.gap:.2%}).'
             )
 
-            scheduled_tasks.append(ScheduledTask(task, selected_core, task_start))
+        return result
+
+    def __build_result(
+        self,
+        planning_model: PlanningModel,
+        solution: list[int],
+        bound: float,
+        status: str,
+        wall_time: float
+    ) -> PlanResult:
+        # ``solution`` holds the value of every model variable, by variable index
+        durations = self.__graph.durations
+        task_starts = [solution[start.Index()] for start in planning_model.starts]
+
+        if planning_model.machine is not None:
+            scheduled_tasks = self.__machine_scheduled_tasks(planning_model, solution, task_starts)
+        else:
+            if planning_model.core_capacity is not None:
+                selected_cores = assign_cores([
+                    (task_start, task_start + duration) for task_start, duration in zip(task_starts, durations)
+                ])
+            else:
+                selected_cores = [
+                    next((core for core, presence in enumerate(l_presences) if solution[presence.Index()]), 0)
+                    for l_presences in planning_model.presences
+                ]
+
+            scheduled_tasks = [
+                ScheduledTask(task, selected_core, task_start)
+                for task, selected_core, task_start in zip(self.__task_list, selected_cores, task_starts)
+            ]
+
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            for s_task in scheduled_tasks:
+                logging.debug(
+                    f'Task {s_task.task.name} starts at {s_task.start} on cpu core {s_task.core} '
+                    f'(duration={s_task.task.execution_time})'
+                )
+
+        makespan = max((s_task.start + s_task.task.execution_time for s_task in scheduled_tasks), default=0)
+        lower_bound = min(makespan, max(planning_model.lower_bound, math.ceil(bound)))
 
-            logging.debug(
-                f'Task {task.name} starts at {task_start} on cpu core {selected_core} (duration={task.execution_time})'
+        # CP-SAT also reports OPTIMAL once the relative gap limit is reached,
+        # so the status follows the bounds instead
+        status = 'OPTIMAL' if makespan == lower_bound else 'FEASIBLE'
+
+        return PlanResult(scheduled_tasks, makespan, lower_bound, status, wall_time)
+
+    def __machine_scheduled_tasks(
+        self, planning_model: PlanningModel, solution: list[int], task_starts: list[int]
+    ) -> list[ScheduledTask]:
+        machine = planning_model.machine
+        task_ends = [solution[end.Index()] for end in planning_model.ends]
+        task_classes = [
+            next(k for k, presence in enumerate(l_presences) if solution[presence.Index()])
+            for l_presences in planning_model.presences
+        ]
+
+        # The cores are assigned class by class
+        task_cores = [()] * len(self.__task_list)
+        for k, first_core in enumerate(machine.first_cores()):
+            class_tasks = [i for i, task_class in enumerate(task_classes) if task_class == k]
+            core_sets = assign_core_sets(
+                [(task_starts[i], task_ends[i]) for i in class_tasks],
+                [self.__task_list[i].cores for i in class_tasks],
+                first_core
             )
+            for i, cores in zip(class_tasks, core_sets):
+                task_cores[i] = tuple(cores)
 
-        logging.debug(f'Found optimal solution in {solver.WallTime()} second(s).')
+        return [
+            ScheduledTask(
+                dataclasses.replace(task, execution_time=task_end - task_start),
+                cores[0],
+                task_start,
+                cores if len(cores) > 1 else ()
+            )
+            for task, task_start, task_end, cores in zip(self.__task_list, task_starts, task_ends, task_cores)
+        ]
 
-        return scheduled_tasks
+    @staticmethod
+    def __build_heuristic_result(planning_model: PlanningModel, bound: float, wall_time: float) -> PlanResult:
+        scheduled_tasks = list(planning_model.heuristic_plan)
+        makespan = max((s_task.start + s_task.task.execution_time for s_task in scheduled_tasks), default=0)
+        lower_bound = min(makespan, max(planning_model.lower_bound, math.ceil(bound)))
+
+        return PlanResult(scheduled_tasks, makespan, lower_bound, 'UNKNOWN', wall_time)
+
+
+class _PlanSolutionCallback(cp_model.CpSolverSolutionCallback):
+    """Forwards every improving solution found by CP-SAT."""
+
+    def __init__(self, on_solution: Callable[[Callable[[], list[int]], float, float, float], None]):
+        super().__init__()
+        self.__on_solution = on_solution
+
+    def on_solution_callback(self) -> None:
+        # The solution values are only copied when they are needed
+        self.__on_solution(
+            lambda: list(self.Response().solution), self.ObjectiveValue(), self.BestObjectiveBound(), self.WallTime()
+        )
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from dataclasses import dataclass
+from pipeline_planner.task import Task, ScheduledTask
+from pipeline_planner.plan_result import PlanResult
+
+
+@dataclass
+class PlanCacheStats:
+    hits: int
+    misses: int
+    entries: int
+    size_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / max(1, self.hits + self.misses)
+
+
+class PlanCache:
+    """
+    A persistent, content-addressed cache of plans, stored in a sqlite file.
+
+    The key is a SHA-256 of the canonical form of the pipeline (the tasks
+    sorted by name, each with its execution time, group and sorted
+    dependencies), the number of CPU cores and the solver settings - so the
+    same pipeline hits the cache regardless of the order of its tasks. The
+    plans are stored compressed, and the least recently used ones are evicted
+    once the total size exceeds ``max_bytes``. The file can be shared by
+    several processes.
+    """
+
+    __connection: sqlite3.Connection
+    __max_bytes: int
+    __hits: int
+    __misses: int
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.__max_bytes = max_bytes
+        self.__hits = 0
+        self.__misses = 0
+
+        self.__connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('PRAGMA synchronous=NORMAL')
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS plans ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)'
+        )
+        self.__connection.execute('CREATE INDEX IF NOT EXISTS plans_last_used ON plans (last_used)')
+
+    @staticmethod
+    def key(tasks: list[Task], cpu_cores: int, settings: dict) -> str:
+        canonical = json.dumps(
+            [
+                sorted(
+                    [task.name, task.execution_time, task.group, sorted(task.dependencies)] for task in tasks
+                ),
+                cpu_cores,
+                sorted(settings.items())
+            ],
+            separators=(',', ':')
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str, tasks: list[Task]) -> PlanResult | None:
+        """Returns the cached plan of the tasks, in the order of ``tasks``."""
+        row = self.__connection.execute('SELECT value FROM plans WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.__misses += 1
+            return None
+
+        self.__hits += 1
+        self.__connection.execute('UPDATE plans SET last_used = ? WHERE key = ?', (time.time(), key))
+
+        makespan, lower_bound, status, placements = json.loads(zlib.decompress(row[0]))
+        scheduled_tasks = [ScheduledTask(task, *placements[task.name]) for task in tasks]
+
+        return PlanResult(scheduled_tasks, makespan, lower_bound, status, 0.0)
+
+    def put(self, key: str, result: PlanResult) -> None:
+        value = zlib.compress(json.dumps(
+            [
+                result.makespan,
+                result.lower_bound,
+                result.status,
+                {s_task.task.name: [s_task.core, s_task.start] for s_task in result.scheduled_tasks}
+            ],
+            separators=(',', ':')
+        ).encode())
+
+        self.__connection.execute(
+            'INSERT OR REPLACE INTO plans (key, value, size, last_used) VALUES (?, ?, ?, ?)',
+            (key, value, len(value), time.time())
+        )
+        self.__evict()
+
+    def __evict(self) -> None:
+        total_size = self.__connection.execute('SELECT COALESCE(SUM(size), 0) FROM plans').fetchone()[0]
+        if total_size <= self.__max_bytes:
+            return
+
+        evicted = []
+        for key, size in self.__connection.execute('SELECT key, size FROM plans ORDER BY last_used'):
+            if total_size <= self.__max_bytes:
+                break
+            evicted.append((key,))
+            total_size -= size
+
+        self.__connection.executemany('DELETE FROM plans WHERE key = ?', evicted)
+
+    def stats(self) -> PlanCacheStats:
+        entries, size = self.__connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM plans').fetchone()
+        return PlanCacheStats(self.__hits, self.__misses, entries, size)
+
+    def close(self) -> None:
+        self.__connection.close()
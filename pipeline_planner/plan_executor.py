@@ -0,0 +1,301 @@
+import dataclasses
+import heapq
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable
+from pipeline_planner.task import Task, ScheduledTask
+from pipeline_planner.task_graph import TaskGraph
+from pipeline_planner.task_diff import TaskDiff
+from pipeline_planner.machine import check_single_core
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+
+
+@dataclass
+class ExecutionResult:
+    """
+    Describes how a plan was executed with the actual execution times of the
+    tasks - the tasks of ``scheduled_tasks`` hold their actual execution time.
+    """
+    scheduled_tasks: list[ScheduledTask]
+    makespan: int
+    planned_makespan: int
+    replans: list[int]  # the times at which the remaining tasks were planned again
+    max_drift: int  # the largest difference between the actual and planned end of a task
+    replan_time: float  # in seconds, spent planning again
+
+    @property
+    def throughput_loss(self) -> float:
+        """The relative increase of the makespan over the planned one (negative when faster)."""
+        return (self.makespan - self.planned_makespan) / max(1, self.planned_makespan)
+
+
+class _ReadyQueue:
+    """
+    The released tasks waiting for a free core, by planned start. ``pop``
+    returns the first task which can start while ``active_group`` runs in
+    O(log n) amortized: besides a heap per group, a heap of the first task of
+    every group finds the first grouped task without looking at every group
+    (entries left behind by popped tasks are skipped when they surface).
+    """
+
+    def __init__(self):
+        self.__ungrouped = []
+        self.__grouped = {}
+        self.__group_heads = []
+
+    def push(self, priority: tuple[int, int], group: str) -> None:
+        if group == '':
+            heapq.heappush(self.__ungrouped, priority)
+            return
+
+        heap = self.__grouped.setdefault(group, [])
+        heapq.heappush(heap, priority)
+        if heap[0] == priority:
+            heapq.heappush(self.__group_heads, (priority, group))
+
+    def pop(self, active_group: str | None) -> int | None:
+        if active_group is not None:
+            heap = self.__grouped.get(active_group)
+            group = active_group if heap else None
+        else:
+            heads = self.__group_heads
+            while heads and not self.__is_head(*heads[0]):
+                heapq.heappop(heads)
+            group = heads[0][1] if heads else None
+
+        if group is not None and (not self.__ungrouped or self.__grouped[group][0] < self.__ungrouped[0]):
+            heap = self.__grouped[group]
+            _, index = heapq.heappop(heap)
+            if heap:
+                heapq.heappush(self.__group_heads, (heap[0], group))
+            return index
+
+        if self.__ungrouped:
+            return heapq.heappop(self.__ungrouped)[1]
+
+        return None
+
+    def __is_head(self, priority: tuple[int, int], group: str) -> bool:
+        heap = self.__grouped[group]
+        return len(heap) > 0 and heap[0] == priority
+
+    def clear(self) -> None:
+        self.__ungrouped.clear()
+        self.__grouped.clear()
+        self.__group_heads.clear()
+
+
+class PlanExecutor:
+    """
+    Replays a plan as an event-driven dispatcher, with the actual execution
+    times of the tasks instead of the planned ones, e.g. to measure how much
+    a plan degrades when tasks finish early or late.
+
+    A task is released once its dependencies have completed and its planned
+    start is reached. Whenever a CPU core is free, the released task with the
+    earliest planned start which can run alongside the running tasks (i.e.
+    not from another group than the running grouped tasks) is started on it.
+    With the planned execution times the plan is executed as is.
+
+    As tasks never start before their planned start, a task finishing early
+    leaves its core idle and a task finishing late delays its dependents.
+    With ``drift_threshold``, every time a task completes more than
+    ``drift_threshold`` minutes away from its planned end, the tasks not
+    started yet are planned again with CP-SAT, from the current time and with
+    the running tasks kept on their cores (see ``PipelinePlanner.replan``),
+    within ``replan_time_limit`` seconds. The plan only guides the dispatcher,
+    so the execution stays valid whatever the plan found in time.
+
+    Every task runs on a single one of ``cpu_cores`` identical cores, and the
+    memory of the tasks is not limited.
+    """
+
+    __tasks: list[Task]
+    __graph: TaskGraph
+    __plan: list[ScheduledTask]  # indexed like the graph
+    __cpu_cores: int
+
+    def __init__(self, tasks: list[Task], plan: list[ScheduledTask], cpu_cores: int, graph: TaskGraph | None = None):
+        check_single_core(tasks, 'by the plan executor')
+        self.__tasks = tasks
+        self.__graph = graph if graph is not None else TaskGraph(tasks)
+        self.__cpu_cores = cpu_cores
+
+        planned = {s_task.task.name: s_task for s_task in plan}
+        missing = [task.name for task in tasks if task.name not in planned]
+        if len(missing) > 0:
+            raise PipelinePlanningError(f'The plan does not contain the tasks: {", ".join(missing)}')
+        self.__plan = [planned[task.name] for task in tasks]
+
+    def run(
+        self,
+        actual_durations: dict[str, int] | Callable[[Task], int] = None,
+        drift_threshold: int | None = None,
+        replan_time_limit: float = 1.0,
+        num_workers: int | None = None
+    ) -> ExecutionResult:
+        """
+        Executes the plan with the ``actual_durations`` of the tasks, either
+        by task name (the missing tasks take their planned execution time) or
+        as a function called when a task starts.
+        """
+        tasks, graph, cpu_cores = self.__tasks, self.__graph, self.__cpu_cores
+        if actual_durations is None:
+            actual_durations = {}
+        duration_of = (
+            actual_durations if callable(actual_durations)
+            else lambda task: actual_durations.get(task.name, task.execution_time)
+        )
+
+        planned_starts = [s_task.start for s_task in self.__plan]
+        planned_ends = [s_task.start + task.execution_time for s_task, task in zip(self.__plan, tasks)]
+        planned_makespan = max(planned_ends, default=0)
+
+        pending_deps = [len(preds) for preds in graph.predecessors]
+        started = [False] * len(tasks)
+        starts, cores, durations = [0] * len(tasks), [0] * len(tasks), list(graph.durations)
+
+        waiting = []  # heap of (planned start, task index) of the tasks whose dependencies completed
+        ready = _ReadyQueue()
+        running = []  # heap of (end, task index, core)
+        free_cores = list(range(cpu_cores))
+        active_group, active_group_count = None, 0
+        replans, max_drift, replan_time = [], 0, 0.0
+        now = 0
+
+        for i, count in enumerate(pending_deps):
+            if count == 0:
+                heapq.heappush(waiting, (planned_starts[i], i))
+
+        while running or waiting:
+            # Complete every task ending at the current time
+            drift = 0
+            while running and running[0][0] <= now:
+                _, index, core = heapq.heappop(running)
+                heapq.heappush(free_cores, core)
+                drift = max(drift, abs(now - planned_ends[index]))
+
+                if tasks[index].has_group():
+                    active_group_count -= 1
+                    if active_group_count == 0:
+                        active_group = None
+
+                for succ in graph.successors[index]:
+                    pending_deps[succ] -= 1
+                    if pending_deps[succ] == 0:
+                        heapq.heappush(waiting, (planned_starts[succ], succ))
+
+            max_drift = max(max_drift, drift)
+            if drift_threshold is not None and drift > drift_threshold and not all(started):
+                replan_started = time.perf_counter()
+                self.__replan(
+                    now, started, starts, running, planned_starts, planned_ends, replan_time_limit, num_workers
+                )
+                replan_time += time.perf_counter() - replan_started
+                replans.append(now)
+
+                # Release the waiting and ready tasks again, by their new planned start
+                waiting = [
+                    (planned_starts[i], i) for i in range(len(tasks)) if not started[i] and pending_deps[i] == 0
+                ]
+                heapq.heapify(waiting)
+                ready.clear()
+
+            # Release the tasks whose planned start is reached
+            while waiting and waiting[0][0] <= now:
+                _, index = heapq.heappop(waiting)
+                ready.push((planned_starts[index], index), tasks[index].group)
+
+            # Fill the free cores with the released tasks planned first
+            while free_cores:
+                index = ready.pop(active_group)
+                if index is None:
+                    break
+
+                task = tasks[index]
+                if task.has_group():
+                    active_group, active_group_count = task.group, active_group_count + 1
+
+                durations[index] = duration_of(task)
+                if durations[index] < 0:
+                    raise PipelinePlanningError(
+                        f'Invalid actual execution time of task {task.name}: {durations[index]}'
+                    )
+
+                started[index], starts[index], cores[index] = True, now, heapq.heappop(free_cores)
+                heapq.heappush(running, (now + durations[index], index, cores[index]))
+
+            next_times = [heap[0][0] for heap in (running, waiting) if heap]
+            if next_times:
+                now = min(next_times)
+
+        scheduled_tasks = [
+            ScheduledTask(dataclasses.replace(task, execution_time=duration), core, start)
+            for task, duration, core, start in zip(tasks, durations, cores, starts)
+        ]
+        makespan = max((start + duration for start, duration in zip(starts, durations)), default=0)
+
+        logging.debug(
+            f'Executed makespan = {makespan}, planned makespan = {planned_makespan}, {len(replans)} replan(s)'
+        )
+
+        return ExecutionResult(scheduled_tasks, makespan, planned_makespan, replans, max_drift, replan_time)
+
+    def __replan(
+        self,
+        now: int,
+        started: list[bool],
+        starts: list[int],
+        running: list[tuple[int, int, int]],
+        planned_starts: list[int],
+        planned_ends: list[int],
+        time_limit: float,
+        num_workers: int
+    ) -> None:
+        # Only imported when replanning, as it imports OR-Tools
+        from pipeline_planner.pipeline_planner import PipelinePlanner
+
+        tasks, graph = self.__tasks, self.__graph
+
+        # The running tasks are expected to take their planned execution time,
+        # or one more minute once they have exceeded it
+        running_tasks = [
+            ScheduledTask(
+                dataclasses.replace(
+                    tasks[i],
+                    execution_time=max(1, starts[i] + tasks[i].execution_time - now),
+                    dependencies=set()
+                ),
+                core,
+                0
+            )
+            for _, i, core in running
+        ]
+        running_names = {s_task.task.name for s_task in running_tasks}
+        remaining = [
+            dataclasses.replace(
+                task,
+                dependencies={
+                    graph.names[pred] for pred in graph.predecessors[i]
+                    if not started[pred] or graph.names[pred] in running_names
+                }
+            )
+            for i, task in enumerate(tasks) if not started[i]
+        ]
+
+        logging.debug(f'Replanning {len(remaining)} task(s) at time {now}')
+
+        result = PipelinePlanner([s_task.task for s_task in running_tasks] + remaining).replan(
+            self.__cpu_cores,
+            running_tasks,
+            TaskDiff(added=remaining),
+            freeze_unaffected=True,
+            time_limit=time_limit,
+            num_workers=num_workers
+        )
+
+        for s_task in result.scheduled_tasks:
+            index = graph.indices[s_task.task.name]
+            planned_starts[index] = now + s_task.start
+            planned_ends[index] = now + s_task.start + s_task.task.execution_time
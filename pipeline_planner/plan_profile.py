@@ -0,0 +1,82 @@
+import collections
+import contextlib
+import json
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ortools.sat.python import cp_model
+
+
+@dataclass
+class PlanProfile:
+    """
+    Instrumentation of a planning run, filled in by ``PipelinePlanner``
+    (and by the CLI for the phases around it):
+        - ``phases`` - the wall time in seconds of every phase, e.g. "parse",
+          "validate", "model build", "solve", "extract" and "report";
+        - ``model`` - the size of the CP-SAT model: its variables, its
+          constraints by type, its intervals and the sizes of its NoOverlap
+          constraints;
+        - ``solver`` - the CP-SAT search statistics;
+        - ``bound_progress`` - ``[wall time, makespan, lower bound]`` for
+          every improving plan found during the search;
+        - ``peak_memory_bytes`` - the peak resident memory of the process
+          (including the solver), when the platform reports it;
+    """
+    phases: dict[str, float] = field(default_factory=dict)
+    model: dict = field(default_factory=dict)
+    solver: dict = field(default_factory=dict)
+    bound_progress: list[list] = field(default_factory=list)
+    peak_memory_bytes: int | None = None
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def record_model(self, model: 'cp_model.CpModel') -> None:
+        proto = model.Proto()
+        constraint_types = collections.Counter(constraint.WhichOneof('constraint') for constraint in proto.constraints)
+
+        self.model = {
+            'variables': len(proto.variables),
+            'constraints': len(proto.constraints),
+            'constraint_types': dict(sorted(constraint_types.items())),
+            'intervals': constraint_types.get('interval', 0),
+            'no_overlap_sizes': [
+                len(constraint.no_overlap.intervals) for constraint in proto.constraints
+                if constraint.WhichOneof('constraint') == 'no_overlap'
+            ]
+        }
+
+    def record_solver(self, solver: 'cp_model.CpSolver', status: str) -> None:
+        self.solver = {
+            'status': status,
+            'wall_time': solver.WallTime(),
+            'user_time': solver.UserTime(),
+            'branches': solver.NumBranches(),
+            'conflicts': solver.NumConflicts(),
+            'booleans': solver.NumBooleans(),
+            'objective': solver.ObjectiveValue(),
+            'bound': solver.BestObjectiveBound(),
+            'workers': solver.parameters.num_workers
+        }
+
+    def record_peak_memory(self) -> None:
+        try:
+            import resource
+        except ImportError:
+            return  # not available on Windows
+
+        # ru_maxrss is in KiB on Linux but in bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.peak_memory_bytes = max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), indent=2)
@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from pipeline_planner.task import ScheduledTask
+
+
+@dataclass
+class PlanResult:
+    """
+    Describes the best plan found by the planner together with how far it can
+    be from the optimal one.
+    """
+    scheduled_tasks: list[ScheduledTask]
+    makespan: int
+    lower_bound: int  # proven lower bound of the optimal makespan
+    status: str  # OPTIMAL (the makespan is the lower bound), FEASIBLE or UNKNOWN (heuristic plan)
+    wall_time: float  # in seconds
+
+    @property
+    def gap(self) -> float:
+        """The relative optimality gap, as defined by CP-SAT's relative_gap_limit."""
+        return (self.makespan - self.lower_bound) / max(1, self.makespan)
+
+    def is_optimal(self) -> bool:
+        return self.makespan == self.lower_bound
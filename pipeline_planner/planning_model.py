@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+from typing import Sequence
+from ortools.sat.python import cp_model
+from pipeline_planner.task import ScheduledTask
+from pipeline_planner.machine import Machine
+
+
+@dataclass
+class PlanningModel:
+    """
+    The CP-SAT model of a pipeline together with the variables needed to read
+    back a solution. The variables are indexed by the position of the task in
+    the planner's ``TaskGraph``.
+    """
+    model: cp_model.CpModel
+    starts: list[cp_model.IntVar]
+    ends: list[cp_model.IntVar]
+    intervals: list[cp_model.IntervalVar]
+    presences: list[list[cp_model.IntVar]]  # indexed by cpu core id, empty for a single or cumulative cores
+    makespan: cp_model.IntVar
+    cpu_cores: int
+    lower_bound: int  # makespan lower bound known before solving
+    heuristic_plan: Sequence[ScheduledTask]  # used as the solution hint, indexed like the variables
+    core_capacity: cp_model.Constraint | None = None  # the cumulative over all tasks, for cumulative cores
+    machine: Machine | None = None  # planned on a machine, the presences are indexed by core class id
@@ -0,0 +1,345 @@
+"""
+A resident planning server answering JSON requests over HTTP, on a TCP port or
+on a Unix socket, so that plans do not pay for starting the interpreter and
+importing OR-Tools.
+
+Usage: python -m pipeline_planner.planning_service [--port 8765 | --unix_socket PATH] [--concurrency N]
+
+Endpoints:
+    - ``POST /plan`` - plans the pipeline of the JSON request:
+        {
+            "pipeline": "<the pipeline in the text format>",
+            "cpu_cores": 4,
+            "time_limit": 5.0,          (optional, in seconds)
+            "relative_gap": 0.05,       (optional)
+            "cumulative_cores": false,  (optional)
+            "format": "rows",           (optional, "rows" or "table")
+            "request_id": "abc"         (optional, to cancel the request)
+        }
+      The tasks can also be given as a list of objects, with the same fields
+      as ``Task``, in "tasks" instead of "pipeline". The response holds the
+      "makespan", "lower_bound", "status" and "wall_time" of the plan and,
+      depending on the format, one row per task in "tasks" (see
+      ``TaskScheduleReport.rows``) or the table report in "report";
+    - ``DELETE /plan/<request_id>`` - cancels a pending or running request;
+    - ``GET /health`` - the number of running requests;
+A request is also cancelled when its client disconnects.
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import logging
+import os
+import threading
+import uuid
+from pipeline_planner.task import Task
+from pipeline_planner.task_parser import TaskParser
+from pipeline_planner.pipeline_planner import PipelinePlanner
+from pipeline_planner.plan_cache import PlanCache
+from pipeline_planner.plan_result import PlanResult
+from pipeline_planner.task_schedule_report import TaskScheduleReport
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+
+
+class PlanningCancelledError(PipelinePlanningError):
+    pass
+
+
+class ServiceBusyError(PipelinePlanningError):
+    pass
+
+
+class _RunningPlan:
+    """A request being planned, which can be cancelled from any thread."""
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__planner = None
+        self.cancelled = False
+
+    def attach(self, planner: PipelinePlanner) -> None:
+        with self.__lock:
+            if self.cancelled:
+                raise PlanningCancelledError('The planning request was cancelled.')
+            self.__planner = planner
+
+    def cancel(self) -> None:
+        with self.__lock:
+            self.cancelled = True
+            if self.__planner is not None:
+                self.__planner.stop_search()
+
+
+class PlanningService:
+    """
+    Plans the requests in a pool of ``concurrency`` threads - CP-SAT releases
+    the GIL while solving, and each solve gets ``cpu_count // concurrency``
+    search workers. Up to ``max_pending`` more requests wait for a thread,
+    further requests are rejected as busy. The time limit of the requests is
+    capped by ``max_time_limit``. The threads share the ``PlanCache`` file at
+    ``cache_path``.
+    """
+
+    def __init__(
+        self,
+        concurrency: int | None = None,
+        max_pending: int | None = None,
+        max_time_limit: float | None = None,
+        cache_path: str | None = None,
+        cache_max_bytes: int = 256 * 1024 * 1024
+    ):
+        self.__concurrency = concurrency if concurrency is not None else (os.cpu_count() or 1)
+        self.__max_pending = max_pending if max_pending is not None else 4 * self.__concurrency
+        self.__max_time_limit = max_time_limit
+        self.__num_workers = max(1, (os.cpu_count() or 1) // self.__concurrency)
+        self.__executor = concurrent.futures.ThreadPoolExecutor(self.__concurrency, 'planner')
+        self.__running: dict[str, _RunningPlan] = {}
+
+        self.__cache_path = cache_path
+        self.__cache_max_bytes = cache_max_bytes
+        self.__thread_caches = threading.local()
+        self.__caches: list[PlanCache] = []
+        self.__caches_lock = threading.Lock()
+
+    @property
+    def running(self) -> int:
+        return len(self.__running)
+
+    async def plan(self, request: dict) -> dict:
+        request_id = str(request.get('request_id') or uuid.uuid4().hex)
+        if request_id in self.__running:
+            raise PipelinePlanningError(f'A request with id {request_id} is already running.')
+        if len(self.__running) >= self.__concurrency + self.__max_pending:
+            raise ServiceBusyError('Too many pending planning requests.')
+
+        cpu_cores, options = self.__parse_request(request)
+
+        running = self.__running[request_id] = _RunningPlan()
+        try:
+            response = await asyncio.get_running_loop().run_in_executor(
+                self.__executor, self.__solve, running, request, cpu_cores, options
+            )
+        except asyncio.CancelledError:
+            running.cancel()
+            raise
+        finally:
+            del self.__running[request_id]
+
+        if running.cancelled:
+            raise PlanningCancelledError('The planning request was cancelled.')
+
+        return {'request_id': request_id} | response
+
+    def cancel(self, request_id: str) -> bool:
+        running = self.__running.get(request_id)
+        if running is None:
+            return False
+
+        running.cancel()
+        return True
+
+    def __parse_request(self, request: dict) -> tuple[int, dict]:
+        # The tasks are read by __read_tasks in the executor, as reading a big
+        # pipeline would block the event loop
+        if 'pipeline' not in request and 'tasks' not in request:
+            raise PipelinePlanningError('The request must contain a "pipeline" or "tasks".')
+
+        cpu_cores = request.get('cpu_cores')
+        if not isinstance(cpu_cores, int) or cpu_cores < 1:
+            raise PipelinePlanningError('The request must contain a positive "cpu_cores".')
+
+        time_limit = request.get('time_limit')
+        if time_limit is not None and (not isinstance(time_limit, (int, float)) or time_limit <= 0):
+            raise PipelinePlanningError('The "time_limit" must be positive.')
+        if self.__max_time_limit is not None:
+            time_limit = min(time_limit or self.__max_time_limit, self.__max_time_limit)
+
+        relative_gap = request.get('relative_gap')
+        if relative_gap is not None and (not isinstance(relative_gap, (int, float)) or relative_gap < 0):
+            raise PipelinePlanningError('The "relative_gap" must be a non-negative number.')
+
+        output_format = request.get('format', 'rows')
+        if output_format not in ('rows', 'table'):
+            raise PipelinePlanningError(f'Unsupported format: {output_format}')
+
+        return cpu_cores, {
+            'cumulative_cores': bool(request.get('cumulative_cores', False)),
+            'time_limit': time_limit,
+            'relative_gap': relative_gap,
+            'format': output_format
+        }
+
+    @staticmethod
+    def __read_tasks(request: dict) -> list[Task]:
+        if 'pipeline' in request:
+            return TaskParser().parse(str(request['pipeline']).split('\n'))
+
+        try:
+            return [
+                Task(str(task['name']), str(task.get('group', '')), int(task['execution_time']),
+                     set(task.get('dependencies', [])))
+                for task in request['tasks']
+            ]
+        except (KeyError, TypeError, ValueError) as e:
+            raise PipelinePlanningError(f'Invalid "tasks" in the request: {e}')
+
+    def __solve(self, running: _RunningPlan, request: dict, cpu_cores: int, options: dict) -> dict:
+        planner = PipelinePlanner(self.__read_tasks(request), self.__thread_cache())
+        running.attach(planner)
+
+        result: PlanResult = planner.solve(
+            cpu_cores,
+            options['cumulative_cores'],
+            options['time_limit'],
+            options['relative_gap'],
+            num_workers=self.__num_workers
+        )
+        if running.cancelled:
+            raise PlanningCancelledError('The planning request was cancelled.')
+
+        response = {
+            'makespan': result.makespan,
+            'lower_bound': result.lower_bound,
+            'status': result.status,
+            'wall_time': result.wall_time
+        }
+        if options['format'] == 'table':
+            response['report'] = TaskScheduleReport().generate(result.scheduled_tasks)
+        else:
+            response['tasks'] = list(TaskScheduleReport().rows(result.scheduled_tasks))
+
+        return response
+
+    def __thread_cache(self) -> PlanCache | None:
+        if self.__cache_path is None:
+            return None
+
+        # sqlite connections are not shared between threads, they share the file
+        if getattr(self.__thread_caches, 'cache', None) is None:
+            self.__thread_caches.cache = PlanCache(self.__cache_path, self.__cache_max_bytes)
+            with self.__caches_lock:
+                self.__caches.append(self.__thread_caches.cache)
+
+        return self.__thread_caches.cache
+
+    async def start(
+        self, host: str = '127.0.0.1', port: int = 8765, unix_socket: str | None = None
+    ) -> asyncio.AbstractServer:
+        if unix_socket is not None:
+            return await asyncio.start_unix_server(self.__handle_connection, unix_socket)
+        return await asyncio.start_server(self.__handle_connection, host, port)
+
+    def close(self) -> None:
+        for running in list(self.__running.values()):
+            running.cancel()
+        self.__executor.shutdown(wait=True, cancel_futures=True)
+
+        with self.__caches_lock:
+            for cache in self.__caches:
+                cache.close()
+            self.__caches.clear()
+
+    async def __handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            status, response = await self.__handle_request(reader)
+            if status is not None:
+                body = json.dumps(response).encode()
+                writer.write(
+                    f'HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n'
+                    f'Connection: close\r\n\r\n'.encode() + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def __handle_request(self, reader: asyncio.StreamReader) -> tuple[str | None, dict]:
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) != 3:
+            return '400 Bad Request', {'error': 'Invalid HTTP request.'}
+        method, path, _ = request_line
+
+        content_length = 0
+        while (header := (await reader.readline()).decode('latin-1').strip()) != '':
+            name, _, value = header.partition(':')
+            if name.strip().lower() == 'content-length':
+                value = value.strip()
+                if not (value.isascii() and value.isdigit()):
+                    return '400 Bad Request', {'error': f'Invalid Content-Length: {value}'}
+                content_length = int(value)
+        body = await reader.readexactly(content_length) if content_length > 0 else b''
+
+        if method == 'GET' and path == '/health':
+            return '200 OK', {'status': 'ok', 'running': self.running}
+
+        if method == 'DELETE' and path.startswith('/plan/'):
+            return '200 OK', {'cancelled': self.cancel(path[len('/plan/'):])}
+
+        if method != 'POST' or path != '/plan':
+            return '404 Not Found', {'error': f'Unknown endpoint: {method} {path}'}
+
+        try:
+            request = json.loads(body)
+            if not isinstance(request, dict):
+                raise ValueError('The request must be a JSON object.')
+        except ValueError as e:
+            return '400 Bad Request', {'error': f'Invalid JSON request: {e}'}
+
+        # Cancel the planning when the client disconnects before the response
+        plan = asyncio.ensure_future(self.plan(request))
+        disconnected = asyncio.ensure_future(reader.read())
+        await asyncio.wait([plan, disconnected], return_when=asyncio.FIRST_COMPLETED)
+        if not plan.done() and disconnected.result() == b'':
+            plan.cancel()
+            logging.info(f'Client of planning request {request.get("request_id")} disconnected.')
+            return None, {}
+        disconnected.cancel()
+
+        try:
+            return '200 OK', await plan
+        except PlanningCancelledError as e:
+            return '409 Conflict', {'error': str(e)}
+        except ServiceBusyError as e:
+            return '503 Service Unavailable', {'error': str(e)}
+        except PipelinePlanningError as e:
+            return '400 Bad Request', {'error': str(e)}
+        except Exception as e:
+            logging.exception('Failed to plan a request.')
+            return '500 Internal Server Error', {'error': str(e)}
+
+
+async def _serve(service: PlanningService, host: str, port: int, unix_socket: str) -> None:
+    server = await service.start(host, port, unix_socket)
+    logging.info(f'Planning service listening on {unix_socket or f"{host}:{port}"}')
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Data Pipeline Planning Service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix_socket', type=str, help='listen on this Unix socket instead of a TCP port')
+    parser.add_argument(
+        '--concurrency', type=int, help='the number of requests planned at once. Default is the number of CPU cores'
+    )
+    parser.add_argument('--max_pending', type=int, help='the number of requests waiting to be planned')
+    parser.add_argument('--max_time_limit', type=float, help='the maximum time limit of a request, in seconds')
+    parser.add_argument('--plan_cache', type=str, help='path to the plan cache file shared by the requests')
+    parser.add_argument('--plan_cache_size', type=int, default=256, help='the maximum size of the plan cache in MiB')
+    parser.add_argument('--log', default='info', choices=['error', 'warning', 'info', 'debug'])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log.upper())
+
+    __service = PlanningService(
+        args.concurrency, args.max_pending, args.max_time_limit, args.plan_cache, args.plan_cache_size * 1024 * 1024
+    )
+    try:
+        asyncio.run(_serve(__service, args.host, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        __service.close()
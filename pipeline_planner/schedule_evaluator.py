@@ -0,0 +1,242 @@
+import collections
+import math
+from dataclasses import dataclass
+from statistics import NormalDist
+import numpy as np
+from pipeline_planner.task import Task, ScheduledTask
+from pipeline_planner.task_graph import TaskGraph
+
+
+# The 95th percentile of the standard normal distribution
+_Z95 = NormalDist().inv_cdf(0.95)
+
+# The float64 values held per task and scenario while a batch is propagated:
+# the durations and ends of up to one barrier per task (both up to 2 rows per
+# task), the starts of a level and the log-normal samples (1 row per task)
+_VALUES_PER_TASK = 6
+
+# The nodes of a topological level by decreasing number of predecessors, their
+# padded predecessors (one row per node) and the number of nodes having a k-th
+# predecessor, for every k
+_Level = tuple[np.ndarray, np.ndarray, list[int]]
+
+
+@dataclass
+class MakespanDistribution:
+    """The makespans of a plan over the sampled scenarios."""
+    samples: np.ndarray
+    nominal: int  # the makespan of the plan with the planned execution times
+
+    def percentile(self, q: float) -> float:
+        return float(np.percentile(self.samples, q))
+
+    @property
+    def mean(self) -> float:
+        return float(self.samples.mean())
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> float:
+        return self.percentile(95)
+
+
+@dataclass
+class RobustPlanResult:
+    """
+    Describes the plan with the lowest makespan percentile among the candidate
+    plans considered by the planner (see ``PipelinePlanner.solve_robust``).
+    """
+    scheduled_tasks: list[ScheduledTask]
+    makespan: int  # with the planned execution times
+    makespan_distribution: MakespanDistribution
+    candidates: int
+
+
+class ScheduleEvaluator:
+    """
+    Evaluates the makespan of plans over ``scenarios`` sampled execution times
+    of the tasks (see ``DurationDistribution``; tasks without a distribution
+    always take their execution time).
+
+    A plan is executed with the order it sets: every task starts as soon as
+    its dependencies, the task before it on each of its cores and the tasks
+    of the previous group running before it have completed (the memory of the
+    tasks is not limited). These orders form a DAG, whose longest paths are
+    propagated for all the scenarios at once with NumPy, one topological
+    level at a time.
+
+    The scenarios are sampled in batches from ``seed`` and the batch index,
+    so every plan is evaluated with the same scenarios. Unless ``batch_size``
+    is given, a batch holds as many scenarios as fit in ``memory_budget``
+    bytes for the number of tasks, so the memory stays bounded however big
+    the pipeline is.
+    """
+
+    __tasks: list[Task]
+    __graph: TaskGraph
+    __scenarios: int
+    __seed: int
+    __batch_size: int
+
+    def __init__(
+        self,
+        tasks: list[Task],
+        scenarios: int = 10000,
+        seed: int = 0,
+        graph: TaskGraph | None = None,
+        batch_size: int | None = None,
+        memory_budget: int = 256 * 2 ** 20
+    ):
+        self.__tasks = tasks
+        self.__graph = graph if graph is not None else TaskGraph(tasks)
+        self.__scenarios = scenarios
+        self.__seed = seed
+        # From the number of tasks only, as the batches set the scenarios
+        self.__batch_size = batch_size if batch_size is not None else max(
+            1, memory_budget // (8 * _VALUES_PER_TASK * max(1, len(tasks)))
+        )
+
+    def evaluate(self, scheduled_tasks: list[ScheduledTask]) -> MakespanDistribution:
+        levels = self.__propagation_levels(scheduled_tasks)
+        node_count = sum(len(nodes) for nodes, _, _ in levels)
+
+        samples = np.empty(self.__scenarios)
+        for batch, offset in enumerate(range(0, self.__scenarios, self.__batch_size)):
+            size = min(self.__batch_size, self.__scenarios - offset)
+            samples[offset:offset + size] = self.__propagate(levels, self.__sample_durations(batch, size, node_count))
+
+        by_name = {s_task.task.name: s_task for s_task in scheduled_tasks}
+        nominal = max(
+            (by_name[task.name].start + task.execution_time for task in self.__tasks), default=0
+        )
+
+        return MakespanDistribution(samples, nominal)
+
+    def duration_percentiles(self, q: float) -> list[int]:
+        """The ``q``-th percentile of the execution time of every task, rounded up."""
+        percentiles = []
+        for task in self.__tasks:
+            distribution = task.distribution
+            if distribution is None:
+                percentiles.append(task.execution_time)
+            elif distribution.p95 is not None:
+                z = NormalDist().inv_cdf(q / 100)
+                sigma = math.log(distribution.p95 / task.execution_time) / _Z95
+                percentiles.append(math.ceil(task.execution_time * math.exp(sigma * z) - 1e-9))
+            else:
+                percentiles.append(math.ceil(np.percentile(distribution.samples, q)))
+
+        return percentiles
+
+    def __sample_durations(self, batch: int, size: int, node_count: int) -> np.ndarray:
+        # Returns the execution times of the ``node_count`` nodes, by node
+        # index then scenario - the barriers past the tasks take no time
+        rng = np.random.default_rng([self.__seed, batch])
+        task_count = len(self.__tasks)
+        durations = np.empty((node_count, size))
+        durations[:task_count] = np.array(self.__graph.durations, dtype=float)[:, np.newaxis]
+        durations[task_count:] = 0
+
+        log_normal = [i for i, task in enumerate(self.__tasks) if task.distribution and task.distribution.p95]
+        if len(log_normal) > 0:
+            medians = np.array([self.__tasks[i].execution_time for i in log_normal], dtype=float)
+            sigmas = np.log(np.array([self.__tasks[i].distribution.p95 for i in log_normal]) / medians) / _Z95
+
+            # In place, as the batch can take hundreds of MiB
+            samples = rng.standard_normal((len(log_normal), size))
+            samples *= sigmas[:, np.newaxis]
+            np.exp(samples, out=samples)
+            samples *= medians[:, np.newaxis]
+            durations[log_normal] = samples
+
+        for i, task in enumerate(self.__tasks):
+            if task.distribution and not task.distribution.p95 and task.distribution.samples:
+                durations[i] = rng.choice(np.array(task.distribution.samples, dtype=float), size)
+
+        return durations
+
+    def __propagation_levels(self, scheduled_tasks: list[ScheduledTask]) -> list[_Level]:
+        """
+        Builds the DAG of the order set by the plan and returns its nodes by
+        topological level. Nodes past the tasks are the barriers between two
+        consecutive group phases.
+        """
+        graph = self.__graph
+        by_name = {s_task.task.name: s_task for s_task in scheduled_tasks}
+        placements = [by_name[name] for name in graph.names]
+        predecessors = [list(preds) for preds in graph.predecessors]
+
+        def by_start(i: int) -> tuple[int, int]:
+            return placements[i].start, i
+
+        # The tasks of every core run one after the other
+        per_core = {}
+        for i in sorted(range(len(placements)), key=by_start):
+            for core in placements[i].cores or (placements[i].core,):
+                previous = per_core.get(core)
+                if previous is not None:
+                    predecessors[i].append(previous)
+                per_core[core] = i
+
+        # The grouped tasks run in phases of a single group, each phase
+        # starting once the previous one (gathered by a barrier) has completed
+        phase, barrier = [], None
+        for i in sorted((i for i, task in enumerate(self.__tasks) if task.has_group()), key=by_start):
+            if phase and self.__tasks[phase[0]].group != self.__tasks[i].group:
+                barrier = len(predecessors)
+                predecessors.append(phase)
+                phase = []
+            if barrier is not None:
+                predecessors[i].append(barrier)
+            phase.append(i)
+
+        # Kahn-style, every node is one level past its last predecessor
+        successors = [[] for _ in predecessors]
+        for node, preds in enumerate(predecessors):
+            for pred in preds:
+                successors[pred].append(node)
+
+        in_degrees = [len(preds) for preds in predecessors]
+        node_levels = [0] * len(predecessors)
+        nodes_by_level = collections.defaultdict(list)
+        ready = [node for node, degree in enumerate(in_degrees) if degree == 0]
+        while ready:
+            node = ready.pop()
+            nodes_by_level[node_levels[node]].append(node)
+            for succ in successors[node]:
+                node_levels[succ] = max(node_levels[succ], node_levels[node] + 1)
+                in_degrees[succ] -= 1
+                if in_degrees[succ] == 0:
+                    ready.append(succ)
+
+        levels = []
+        for _, nodes in sorted(nodes_by_level.items()):
+            nodes.sort(key=lambda node: -len(predecessors[node]))
+            width = len(predecessors[nodes[0]])
+            levels.append((
+                np.array(nodes),
+                np.array([predecessors[node] + [0] * (width - len(predecessors[node])) for node in nodes], dtype=int),
+                [sum(1 for node in nodes if len(predecessors[node]) > k) for k in range(width)]
+            ))
+
+        return levels
+
+    def __propagate(self, levels: list[_Level], durations: np.ndarray) -> np.ndarray:
+        task_count, size = len(self.__tasks), durations.shape[1]
+        if task_count == 0:
+            return np.zeros(size)
+
+        ends = np.empty_like(durations)
+        for nodes, predecessors, counts in levels:
+            # The k-th predecessors of the first counts[k] nodes, as the nodes
+            # are sorted by decreasing number of predecessors
+            starts = np.zeros((len(nodes), size))
+            for k, count in enumerate(counts):
+                np.maximum(starts[:count], ends[predecessors[:count, k]], out=starts[:count])
+            ends[nodes] = starts + durations[nodes]
+
+        return ends[:task_count].max(axis=0)
+
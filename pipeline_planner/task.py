@@ -1,19 +1,34 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class DurationDistribution:
+    """
+    Describes how the execution time of a task varies, either as a log-normal
+    distribution through the task's execution time (its median) and ``p95``,
+    or as the empirical distribution of observed ``samples``.
+    """
+    p95: int = None
+    samples: tuple[int, ...] = ()
+
+
+@dataclass(slots=True)
 class Task:
     """Describes the properties of a pipeline task."""
     name: str
     group: str
     execution_time: int
     dependencies: set[str]
+    distribution: DurationDistribution | None = None  # None when the execution time does not vary
+    cores: int = 1  # the number of cores the task runs on at once
+    memory: int = 0  # in GB
+    speeds: dict[str, float] | None = None  # the speed factor by core class name, overriding the speed of the class
 
     def has_group(self) -> bool:
         return len(self.group) > 0
 
 
-@dataclass
+@dataclass(slots=True)
 class ScheduledTask:
     """
     Describes how the task is scheduled (i.e. it's start time, end time and core)
@@ -21,3 +36,5 @@ class ScheduledTask:
     task: Task
     core: int
     start: int
+    cores: tuple[int, ...] = ()  # all the cores of a task running on several cores, starting with ``core``
+    node: int = 0  # the index of the node of the cluster running the task, if any
@@ -0,0 +1,33 @@
+from dataclasses import dataclass, field
+from pipeline_planner.task import Task
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+
+
+@dataclass
+class TaskDiff:
+    """
+    Describes the changes between two versions of a pipeline. Modified tasks
+    keep their name and replace the task with the same name.
+    """
+    added: list[Task] = field(default_factory=list)
+    removed: set[str] = field(default_factory=set)
+    modified: list[Task] = field(default_factory=list)
+
+    def changed_names(self) -> set[str]:
+        """The names of the tasks whose plan can no longer be reused as is."""
+        return {task.name for task in self.added} | {task.name for task in self.modified}
+
+    def apply(self, tasks: list[Task]) -> list[Task]:
+        names = {task.name for task in tasks}
+        for name in self.removed | {task.name for task in self.modified}:
+            if name not in names:
+                raise PipelinePlanningError(f'Cannot remove or modify non-existent task: {name}')
+
+        for task in self.added:
+            if task.name in names:
+                raise PipelinePlanningError(f'Cannot add already existing task: {task.name}')
+
+        modified = {task.name: task for task in self.modified}
+        return [
+            modified.get(task.name, task) for task in tasks if task.name not in self.removed
+        ] + list(self.added)
@@ -0,0 +1,174 @@
+import collections
+from pipeline_planner.task import Task
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+
+
+class TaskGraph:
+    """
+    The dependency graph of the pipeline tasks, indexed by the position of the
+    task in the list it was built from.
+
+    Building the graph validates it in O(V+E) with a Kahn-style topological
+    sort:
+        - every dependency must exist as a task (all the missing ones are
+          reported at once);
+        - there must be no circular dependencies (the offending cycle is
+          reported as ``A -> B -> A``, read as "A depends on B");
+    It also computes the critical-path bounds of every task:
+        - ``heads[i]`` - the length of the longest dependency chain that must
+          complete before task ``i`` can start (i.e. its earliest start);
+        - ``tails[i]`` - the length of the longest dependency chain starting
+          with task ``i``, including its own execution time;
+    """
+
+    names: list[str]
+    indices: dict[str, int]
+    durations: list[int]
+    predecessors: list[list[int]]
+    successors: list[list[int]]
+    order: list[int]
+    heads: list[int]
+    tails: list[int]
+
+    def __init__(self, tasks: list[Task]):
+        self.names = [task.name for task in tasks]
+        self.indices = {name: i for i, name in enumerate(self.names)}
+        self.durations = [task.execution_time for task in tasks]
+
+        if len(self.indices) != len(self.names):
+            raise PipelinePlanningError('Pipeline tasks contain duplicated task names.')
+
+        self.__build_edges(tasks)
+        self.__sort_topologically()
+        self.__compute_critical_paths()
+
+    @classmethod
+    def from_adjacency(cls, names: list[str], durations: list[int], predecessors: list[list[int]]) -> 'TaskGraph':
+        """
+        Builds the graph from already resolved dependencies, where
+        ``predecessors[i]`` holds the indices of the dependencies of task
+        ``i`` - e.g. as stored by ``PackedPipeline``.
+        """
+        graph = cls.__new__(cls)
+        graph.names = names
+        graph.indices = {name: i for i, name in enumerate(names)}
+        graph.durations = list(durations)
+
+        if len(graph.indices) != len(graph.names):
+            raise PipelinePlanningError('Pipeline tasks contain duplicated task names.')
+
+        graph.predecessors = predecessors
+        graph.successors = [[] for _ in names]
+        for i, preds in enumerate(predecessors):
+            for pred in preds:
+                graph.successors[pred].append(i)
+
+        graph.__sort_topologically()
+        graph.__compute_critical_paths()
+
+        return graph
+
+    @property
+    def critical_path_length(self) -> int:
+        return max((head + tail for head, tail in zip(self.heads, self.tails)), default=0)
+
+    def __build_edges(self, tasks: list[Task]) -> None:
+        self.predecessors = [[] for _ in tasks]
+        self.successors = [[] for _ in tasks]
+
+        missing = []
+        for i, task in enumerate(tasks):
+            missing_deps = sorted(dep for dep in task.dependencies if dep not in self.indices)
+            if len(missing_deps) > 0:
+                plural = 'dependency' if len(missing_deps) == 1 else 'dependencies'
+                missing.append(f'Task {task.name} has non-existent {plural}: {", ".join(missing_deps)}')
+
+            for dep in sorted(task.dependencies):
+                if dep in self.indices:
+                    self.predecessors[i].append(self.indices[dep])
+                    self.successors[self.indices[dep]].append(i)
+
+        if len(missing) > 0:
+            raise PipelinePlanningError('; '.join(missing))
+
+    def __sort_topologically(self) -> None:
+        in_degrees = [len(preds) for preds in self.predecessors]
+        ready = collections.deque(i for i, degree in enumerate(in_degrees) if degree == 0)
+
+        self.order = []
+        while ready:
+            i = ready.popleft()
+            self.order.append(i)
+            for succ in self.successors[i]:
+                in_degrees[succ] -= 1
+                if in_degrees[succ] == 0:
+                    ready.append(succ)
+
+        if len(self.order) != len(self.names):
+            cycle = ' -> '.join(self.names[i] for i in self.__find_cycle(in_degrees))
+            raise PipelinePlanningError(
+                f'Impossible to schedule tasks - check for circular dependencies. Found cycle: {cycle}'
+            )
+
+    def __find_cycle(self, in_degrees: list[int]) -> list[int]:
+        # Every task left unsorted has at least one unsorted dependency, so
+        # walking backwards through them must eventually revisit a task
+        visited = {}
+        current = next(i for i, degree in enumerate(in_degrees) if degree > 0)
+        while current not in visited:
+            visited[current] = len(visited)
+            current = next(pred for pred in self.predecessors[current] if in_degrees[pred] > 0)
+
+        return list(visited)[visited[current]:] + [current]
+
+    def __compute_critical_paths(self) -> None:
+        self.heads = [0] * len(self.names)
+        for i in self.order:
+            for succ in self.successors[i]:
+                self.heads[succ] = max(self.heads[succ], self.heads[i] + self.durations[i])
+
+        self.tails = list(self.durations)
+        for i in reversed(self.order):
+            for pred in self.predecessors[i]:
+                self.tails[pred] = max(self.tails[pred], self.tails[i] + self.durations[pred])
+
+    def ancestors(self) -> list[int]:
+        """
+        Returns a bitset of the transitive dependencies of every task, where
+        bit ``j`` of ``ancestors()[i]`` is set when task ``i`` (indirectly)
+        depends on task ``j``.
+        """
+        ancestors = [0] * len(self.names)
+        for i in self.order:
+            for pred in self.predecessors[i]:
+                ancestors[i] |= ancestors[pred] | (1 << pred)
+
+        return ancestors
+
+    def components(self) -> list[list[int]]:
+        """
+        Returns the weakly connected components of the graph (i.e. the groups
+        of tasks linked by dependencies, regardless of their direction), each
+        in topological order.
+        """
+        component_ids = [-1] * len(self.names)
+        components = []
+        for i in self.order:
+            if component_ids[i] != -1:
+                continue
+
+            component_ids[i] = len(components)
+            pending = [i]
+            while pending:
+                current = pending.pop()
+                for neighbour in self.predecessors[current] + self.successors[current]:
+                    if component_ids[neighbour] == -1:
+                        component_ids[neighbour] = component_ids[i]
+                        pending.append(neighbour)
+
+            components.append([])
+
+        for i in self.order:
+            components[component_ids[i]].append(i)
+
+        return components
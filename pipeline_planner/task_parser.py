@@ -1,50 +1,111 @@
-from pipeline_planner.task import Task
+from typing import Iterable, Iterator
+from pipeline_planner.task import Task, DurationDistribution
 from pipeline_planner.pipeline_planning_error import PipelinePlanningError
 
 
 class TaskParser:
     """
     The class parses raw string lines into Task objects
+
+    Every task is defined by 4 lines (name, execution time, group and comma
+    separated dependencies) and the last task is followed by an "END" line,
+    optionally followed by empty lines. An "END" line followed by a non-empty
+    line starts a task named END instead. The lines can come from any iterable
+    (e.g. an open file) and are parsed lazily, so big pipelines are parsed in
+    bounded memory and the first invalid task is reported with its line number.
+
+    The execution time of a varying task can be followed by its distribution,
+    either ``10 p95=25`` (its median and 95th percentile) or
+    ``10 samples=8,9,12,30`` (observed execution times), see
+    ``DurationDistribution``. The planner uses the first value. It can also be
+    followed by the resources the task needs (see ``Machine``), e.g.
+    ``10 cores=4 memory=32 speed.fast=2``.
     """
 
-    def parse(self, tasks_raw: list[str]) -> list[Task]:
-        if len(tasks_raw) < 5 or (len(tasks_raw) - 1) % 4 != 0:
-            raise PipelinePlanningError(
-                f'Invalid pipeline task definition. Unexpected line count: {len(tasks_raw)}'
-            )
-        
-        if tasks_raw[-1] != 'END':
-            raise PipelinePlanningError(
-                f'Invalid pipeline task definition. Last line should read "END", instead found: {tasks_raw[-1]}'
-            )
+    def parse(self, tasks_raw: Iterable[str]) -> list[Task]:
+        return list(self.iter_tasks(tasks_raw))
+
+    def parse_file(self, path: str) -> list[Task]:
+        with open(path, 'r') as pipeline_file:
+            return self.parse(pipeline_file)
+
+    def iter_tasks(self, tasks_raw: Iterable[str]) -> Iterator[Task]:
+        task_names = set()
+        record = []
+        line_number = 0
+        ended = False
+        end_line_number = None  # of an "END" line ending the tasks, unless a task line follows
+
+        for line_number, line in enumerate(tasks_raw, 1):
+            line = line.rstrip('\r\n')
+
+            if end_line_number is not None and not ended:
+                if len(line.strip()) > 0:
+                    record, end_line_number = ['END'], None
+                else:
+                    TaskParser.__check_end(task_names, end_line_number)
+                    ended = True
 
-        parsed_tasks = []
-        for i in range(0, len(tasks_raw) - 4, 4):
-            parsed_tasks.append(TaskParser.__parse_task(*tasks_raw[i:i + 4]))
+            if ended:
+                if len(line.strip()) > 0:
+                    raise PipelinePlanningError(
+                        f'Invalid pipeline task definition. Unexpected content after "END" on line {line_number}: '
+                        f'{line}'
+                    )
+                continue
 
-        if len(parsed_tasks) != len(set([p_task.name for p_task in parsed_tasks])):
+            if len(record) == 0 and line == 'END':
+                end_line_number = line_number
+                continue
+
+            record.append(line)
+            if len(record) == 4:
+                task = TaskParser.__parse_task(*record, line_number - 3)
+                if task.name in task_names:
+                    raise PipelinePlanningError(
+                        f'Invalid pipeline task definition. Encountered duplicate task names: {task.name} '
+                        f'(line {line_number - 3})'
+                    )
+                task_names.add(task.name)
+                record = []
+                yield task
+
+        if end_line_number is not None and not ended:
+            TaskParser.__check_end(task_names, end_line_number)
+        elif not ended:
+            if len(record) == 1:
+                raise PipelinePlanningError(
+                    f'Invalid pipeline task definition. Last line should read "END", instead found: {record[0]} '
+                    f'(line {line_number})'
+                )
             raise PipelinePlanningError(
-                f'Invalid pipeline task definition. Encountered duplicate task names.'
+                f'Invalid pipeline task definition. Unexpected line count: {line_number}'
             )
 
-        return parsed_tasks
+    @staticmethod
+    def __check_end(task_names: set[str], line_number: int) -> None:
+        if len(task_names) == 0:
+            raise PipelinePlanningError(
+                f'Invalid pipeline task definition. Unexpected line count: {line_number} (no tasks)'
+            )
 
     @classmethod
     def __parse_task(
-       cls, name: str, execution_time: str, group: str, deps: str
+       cls, name: str, execution_time: str, group: str, deps: str, line_number: int
     ) -> Task:
         parsed_name = name.strip()
 
         if len(parsed_name) == 0:
-            raise PipelinePlanningError(f'Encountered a task with an invalid name: "{name}"')
+            raise PipelinePlanningError(
+                f'Encountered a task with an invalid name: "{name}" (line {line_number})'
+            )
         
         try:
-            parsed_execution_time = int(execution_time)
-            if parsed_execution_time < 1:
-                raise Exception
+            task_fields = cls.__parse_execution_time(execution_time)
         except Exception:
             raise PipelinePlanningError(
-                f'Encountered a task with an invalid execution time! Task: "{name}", execution time: "{execution_time}"'
+                f'Encountered a task with an invalid execution time! Task: "{name}", execution time: '
+                f'"{execution_time}" (line {line_number + 1})'
             )
         
         parsed_deps = [
@@ -52,5 +113,45 @@ class TaskParser:
         ]
         
         return Task(
-            parsed_name, group.strip(), parsed_execution_time, set(parsed_deps)
+            parsed_name, group.strip(), dependencies=set(parsed_deps), **task_fields
         )
+
+    @staticmethod
+    def __parse_execution_time(execution_time: str) -> dict:
+        # The execution time can be followed by "<option>=<value>" options:
+        # its distribution, either as "p95=<minutes>" or as
+        # "samples=<minutes>,<minutes>,...", its resource demands as
+        # "cores=<count>" and "memory=<GB>", and its speed on a class of
+        # cores as "speed.<core class>=<factor>"
+        parsed_execution_time, *options = execution_time.split()
+        task_fields = {'execution_time': int(parsed_execution_time)}
+        if task_fields['execution_time'] < 1:
+            raise ValueError
+
+        keys = set()
+        for option in options:
+            key, _, value = option.partition('=')
+            if key in keys:
+                raise ValueError
+            keys.add(key)
+
+            if key == 'p95' and 'samples' not in keys:
+                p95 = int(value)
+                if p95 < task_fields['execution_time']:
+                    raise ValueError
+                task_fields['distribution'] = DurationDistribution(p95=p95)
+            elif key == 'samples' and 'p95' not in keys:
+                samples = tuple(int(sample) for sample in value.split(','))
+                if min(samples) < 1:
+                    raise ValueError
+                task_fields['distribution'] = DurationDistribution(samples=samples)
+            elif key == 'cores' and int(value) >= 1:
+                task_fields['cores'] = int(value)
+            elif key == 'memory' and int(value) >= 0:
+                task_fields['memory'] = int(value)
+            elif key.startswith('speed.') and len(key) > len('speed.') and float(value) > 0:
+                task_fields.setdefault('speeds', {})[key[len('speed.'):]] = float(value)
+            else:
+                raise ValueError
+
+        return task_fields
@@ -1,31 +1,186 @@
 import collections
-from tabulate import tabulate
+import csv
+import json
+from typing import Iterator, IO
 from pipeline_planner.task import ScheduledTask
+from pipeline_planner.task_graph import TaskGraph
+from pipeline_planner.plan_result import PlanResult
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+
+
+ROW_FIELDS = ['name', 'group', 'core', 'start', 'end', 'slack']
+ARROW_BATCH_SIZE = 64 * 1024
+
+
+def _table(table_data: list[list], headers: list[str]) -> str:
+    # Only imported when a table is rendered, not for the machine-readable formats
+    from tabulate import tabulate
+
+    return tabulate(table_data, headers=headers, tablefmt="github", numalign='left').replace('|\n', '\n')[:-1]
 
 
 class TaskScheduleReport:
-    def generate(self, scheduled_tasks: list[ScheduledTask]) -> str:
+    def generate(self, scheduled_tasks: list[ScheduledTask], per_minute: bool = False) -> str:
+        """
+        Reports the tasks being executed over time, with one row per interval
+        during which the same tasks are executed (or one row per minute when
+        ``per_minute`` is set, which grows with the execution time instead of
+        the number of tasks).
+        """
         execution_time = max(s_task.start + s_task.task.execution_time for s_task in scheduled_tasks)
         summary = f'Minimum Execution Time = {execution_time} minute(s)\n'
 
+        if per_minute:
+            table_data = self.__per_minute_rows(scheduled_tasks)
+        else:
+            table_data = self.__interval_rows(scheduled_tasks)
+
+        table = _table(table_data, ['Time', 'Tasks being Executed', 'Group Name'])
+
+        return summary + table
+
+    @staticmethod
+    def __per_minute_rows(scheduled_tasks: list[ScheduledTask]) -> list[list]:
         timestamps_to_tasks = collections.defaultdict(list[ScheduledTask])
         for s_task in scheduled_tasks:
             for task_timestamp in range(s_task.start, s_task.start + s_task.task.execution_time):
                 timestamps_to_tasks[task_timestamp].append(s_task)
 
-        table_data = [
+        return [
             [
                 ts + 1,
                 ','.join(sorted([s_task.task.name for s_task in scheduled_tasks])),
-                ','.join(set(s_task.task.group for s_task in scheduled_tasks if len(s_task.task.group) > 0))
+                ','.join(sorted(set(s_task.task.group for s_task in scheduled_tasks if len(s_task.task.group) > 0)))
             ] for ts, scheduled_tasks in sorted(timestamps_to_tasks.items())
         ]
 
-        table = tabulate(
-            table_data,
-            headers=['Time', 'Tasks being Executed', 'Group Name'],
-            tablefmt="github",
-            numalign='left'
-        ).replace('|\n', '\n')[:-1]
+    @staticmethod
+    def __interval_rows(scheduled_tasks: list[ScheduledTask]) -> list[list]:
+        # Sweep over the starts and ends - the running tasks only change there
+        events = sorted(
+            [(s_task.start, 1, s_task.task) for s_task in scheduled_tasks if s_task.task.execution_time > 0] +
+            [(s_task.start + s_task.task.execution_time, -1, s_task.task) for s_task in scheduled_tasks
+             if s_task.task.execution_time > 0],
+            key=lambda event: (event[0], event[1])
+        )
+
+        rows = []
+        running = {}
+        for i, (timestamp, change, task) in enumerate(events):
+            if change > 0:
+                running[task.name] = task
+            else:
+                del running[task.name]
+
+            if i + 1 == len(events) or events[i + 1][0] == timestamp or len(running) == 0:
+                continue
+
+            end = events[i + 1][0]
+            rows.append([
+                f'{timestamp + 1}' if end == timestamp + 1 else f'{timestamp + 1}-{end}',
+                ','.join(sorted(running)),
+                ','.join(sorted(set(task.group for task in running.values() if len(task.group) > 0)))
+            ])
+
+        return rows
+
+    def rows(self, scheduled_tasks: list[ScheduledTask]) -> Iterator[dict]:
+        """
+        Yields one row per task, ordered by start time and core, with the
+        task's ``name``, ``group``, ``core``, ``start``, ``end`` and ``slack``.
+        The slack is how long the task can be delayed without delaying the
+        tasks depending on it or the whole plan (the cores and the groups of
+        the other tasks are not taken into account).
+        """
+        graph = TaskGraph([s_task.task for s_task in scheduled_tasks])
+        ends = [s_task.start + s_task.task.execution_time for s_task in scheduled_tasks]
+
+        latest_ends = [max(ends, default=0)] * len(scheduled_tasks)
+        for i in reversed(graph.order):
+            for pred in graph.predecessors[i]:
+                latest_ends[pred] = min(latest_ends[pred], latest_ends[i] - graph.durations[i])
+
+        for i in sorted(range(len(scheduled_tasks)), key=lambda i: (scheduled_tasks[i].start, scheduled_tasks[i].core)):
+            s_task = scheduled_tasks[i]
+            yield {
+                'name': s_task.task.name,
+                'group': s_task.task.group,
+                'core': s_task.core,
+                'start': s_task.start,
+                'end': ends[i],
+                'slack': latest_ends[i] - ends[i]
+            }
+
+    def write(self, scheduled_tasks: list[ScheduledTask], output: IO, output_format: str) -> None:
+        """
+        Streams the rows of the plan to ``output`` (a binary stream for the
+        "arrow" format, a text stream otherwise), so that the report is never
+        built as a whole in memory:
+            - "json" - an object with the ``execution_time`` and the
+              ``tasks`` rows;
+            - "jsonl" - one JSON object per row;
+            - "csv" - a header followed by one line per row;
+            - "arrow" - an Arrow IPC stream, written in record batches
+              (requires ``pyarrow``);
+        """
+        rows = self.rows(scheduled_tasks)
+
+        if output_format == 'json':
+            execution_time = max((s_task.start + s_task.task.execution_time for s_task in scheduled_tasks), default=0)
+            output.write(f'{{"execution_time": {execution_time}, "tasks": [')
+            for i, row in enumerate(rows):
+                output.write((',\n' if i > 0 else '\n') + json.dumps(row))
+            output.write('\n]}\n')
+        elif output_format == 'jsonl':
+            for row in rows:
+                output.write(json.dumps(row) + '\n')
+        elif output_format == 'csv':
+            writer = csv.DictWriter(output, fieldnames=ROW_FIELDS, lineterminator='\n')
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+        elif output_format == 'arrow':
+            self.__write_arrow(rows, output)
+        else:
+            raise PipelinePlanningError(f'Unsupported report format: {output_format}')
+
+    @staticmethod
+    def __write_arrow(rows: Iterator[dict], output: IO) -> None:
+        try:
+            import pyarrow
+            import pyarrow.ipc
+        except ImportError:
+            raise PipelinePlanningError('The "arrow" report format requires pyarrow to be installed.')
+
+        schema = pyarrow.schema([
+            ('name', pyarrow.string()),
+            ('group', pyarrow.string()),
+            ('core', pyarrow.int32()),
+            ('start', pyarrow.int64()),
+            ('end', pyarrow.int64()),
+            ('slack', pyarrow.int64())
+        ])
+
+        with pyarrow.ipc.new_stream(output, schema) as writer:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == ARROW_BATCH_SIZE:
+                    writer.write_batch(pyarrow.RecordBatch.from_pylist(batch, schema=schema))
+                    batch = []
+            if len(batch) > 0:
+                writer.write_batch(pyarrow.RecordBatch.from_pylist(batch, schema=schema))
+
+    def generate_sweep(self, results: dict[int, PlanResult]) -> str:
+        best = min(results.items(), key=lambda item: (item[1].makespan, item[0]))
+        summary = f'Minimum Execution Time = {best[1].makespan} minute(s), reached with {best[0]} CPU core(s)\n'
+
+        table = _table(
+            [
+                [cpu_cores, result.makespan, 'yes' if result.is_optimal() else f'no (gap {result.gap:.2%})']
+                for cpu_cores, result in sorted(results.items())
+            ],
+            ['CPU Cores', 'Execution Time', 'Optimal']
+        )
 
         return summary + table
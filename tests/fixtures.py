@@ -0,0 +1,16 @@
+from pipeline_planner.task import Task
+
+
+# The small pipeline of test_data/pipeline_small.txt, shared by the tests of the planners
+TASKS = [
+    Task('A', 'raw', 48, set()),
+    Task('A1', 'raw', 5, {'A'}),
+    Task('B', 'feature', 26, {'A'}),
+    Task('C', 'feature', 10, {'B'}),
+    Task('D', 'raw', 4, set()),
+    Task('E', 'feature', 20, {'D'}),
+    Task('F', 'model', 24, {'C'}),
+    Task('G', 'model', 40, {'B', 'F'}),
+    Task('H', 'feature', 29, set()),
+    Task('Z', 'model', 58, {'H'})
+]
@@ -0,0 +1,54 @@
+from typing import Callable
+from pipeline_planner.task import Task, ScheduledTask
+
+
+class PlanAssertions:
+    """The checks of a valid plan, shared by the tests of the planners (mixed into a ``unittest.TestCase``)."""
+
+    def assertValidPlan(
+        self,
+        scheduled_tasks: list[ScheduledTask],
+        cpu_cores: int | list[int],
+        tasks: list[Task] | None = None,
+        transfer_delay: Callable[[str, str, int, int], int] | None = None,
+        memory: int | None = None
+    ):
+        """
+        Asserts that every task runs on as many of the ``cpu_cores`` of its
+        node (by node index for a cluster) as it needs, after its dependencies
+        and their ``transfer_delay`` from other nodes, and that the tasks
+        running at once on a node share no core, belong to a single group and
+        fit in ``memory``. With ``tasks``, the plan holds them in order.
+        """
+        if tasks is not None:
+            self.assertEqual([s_task.task for s_task in scheduled_tasks], tasks)
+
+        node_cores = cpu_cores if isinstance(cpu_cores, list) else [cpu_cores]
+        by_name = {s_task.task.name: s_task for s_task in scheduled_tasks}
+        for s_task in scheduled_tasks:
+            cores = s_task.cores or (s_task.core,)
+            self.assertEqual(len(cores), s_task.task.cores)
+            self.assertTrue(all(core in range(node_cores[s_task.node]) for core in cores))
+            for dep in s_task.task.dependencies:
+                dependency = by_name[dep]
+                delay = transfer_delay(dep, s_task.task.name, dependency.node, s_task.node) if transfer_delay else 0
+                self.assertGreaterEqual(s_task.start, dependency.start + dependency.task.execution_time + delay)
+
+            for other in scheduled_tasks:
+                overlap = (
+                    other is not s_task and other.node == s_task.node and
+                    other.start < s_task.start + s_task.task.execution_time and
+                    s_task.start < other.start + other.task.execution_time
+                )
+                if overlap:
+                    self.assertFalse(set(cores) & set(other.cores or (other.core,)))
+                    if s_task.task.has_group() and other.task.has_group():
+                        self.assertEqual(other.task.group, s_task.task.group)
+
+            if memory is not None:
+                # The memory in use only grows when a task starts
+                used = sum(
+                    other.task.memory for other in scheduled_tasks if other.node == s_task.node and
+                    other.start <= s_task.start < other.start + other.task.execution_time
+                )
+                self.assertLessEqual(used, memory)
@@ -0,0 +1,41 @@
+import os
+import unittest
+from pipeline_planner.batch_planner import BatchPlanner, PlanJob
+from pipeline_planner.task import Task
+
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), '..', 'test_data')
+
+
+class TestBatchPlanner(unittest.TestCase):
+
+    def test_results_follow_job_order(self):
+        tasks = [Task(f'T{i}', '', 4, set()) for i in range(8)]
+        jobs = [PlanJob('independent', cpu_cores, tasks) for cpu_cores in [1, 2, 4, 8]]
+
+        results = BatchPlanner(processes=2).plan(jobs)
+
+        self.assertEqual([result.job for result in results], jobs)
+        self.assertEqual([result.error for result in results], [None] * 4)
+        self.assertEqual([result.result.makespan for result in results], [32, 16, 8, 4])
+
+    def test_failures_are_collected_per_job(self):
+        results = BatchPlanner(processes=2).plan([
+            PlanJob(os.path.join(TEST_DATA, 'pipeline_tiny.txt'), 2),
+            PlanJob(os.path.join(TEST_DATA, 'pipeline_circular_dependency.txt'), 2),
+            PlanJob(os.path.join(TEST_DATA, 'missing.txt'), 2)
+        ])
+
+        self.assertIsNone(results[0].error)
+        self.assertEqual(results[0].result.makespan, 4)
+        self.assertIsNone(results[1].result)
+        self.assertRegex(results[1].error, 'check for circular dependencies')
+        self.assertIsNone(results[2].result)
+        self.assertRegex(results[2].error, 'No such file or directory')
+
+    def test_empty_batch(self):
+        self.assertEqual(BatchPlanner().plan([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
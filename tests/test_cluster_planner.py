@@ -0,0 +1,107 @@
+import unittest
+from pipeline_planner.cluster_planner import ClusterPlanner, Node
+from pipeline_planner.pipeline_planner import PipelinePlanner
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+from pipeline_planner.task import Task, ScheduledTask
+from tests.fixtures import TASKS
+from tests.plan_assertions import PlanAssertions
+
+
+class TestClusterPlanner(PlanAssertions, unittest.TestCase):
+
+    def test_single_node_matches_the_pipeline_planner(self):
+        nodes = [Node('n0', 2)]
+
+        result = ClusterPlanner(TASKS, nodes, transfer_delay=10).plan()
+
+        self.assertEqual(result.makespan, PipelinePlanner(TASKS).solve(2).makespan)
+        self.assertTrue(all(s_task.node == 0 for s_task in result.scheduled_tasks))
+
+    def test_plan_across_nodes(self):
+        nodes = [Node('n0', 1), Node('n1', 2), Node('n2', 1)]
+        planner = ClusterPlanner(TASKS, nodes, transfer_delay=3, node_delays={('n2', 'n0'): 8})
+
+        result = planner.plan(rounds=3)
+
+        self.assertValidPlan(
+            result.scheduled_tasks, [node.cpu_cores for node in nodes], transfer_delay=planner.transfer_delay
+        )
+        self.assertEqual(len({s_task.node for s_task in result.scheduled_tasks}), 3)
+        self.assertLessEqual(result.lower_bound, result.makespan)
+        self.assertLess(result.makespan, PipelinePlanner(TASKS).solve(1).makespan)
+
+    def test_large_delays_keep_a_chain_on_one_node(self):
+        chain = [Task('T0', '', 5, set())] + [Task(f'T{i}', '', 5, {f'T{i - 1}'}) for i in range(1, 6)]
+        nodes = [Node('n0', 1), Node('n1', 1)]
+
+        result = ClusterPlanner(chain, nodes, transfer_delay=100).plan()
+
+        self.assertEqual(len({s_task.node for s_task in result.scheduled_tasks}), 1)
+        self.assertEqual(result.makespan, 30)
+        self.assertEqual(result.status, 'OPTIMAL')
+
+    def test_edge_delays_override_the_node_delays(self):
+        tasks = [
+            Task('A', '', 10, set()),
+            Task('B', '', 10, set()),
+            Task('C', '', 10, {'A', 'B'})
+        ]
+        nodes = [Node('n0', 1), Node('n1', 1)]
+        planner = ClusterPlanner(tasks, nodes, transfer_delay=50, edge_delays={('A', 'C'): 1, ('B', 'C'): 1})
+
+        result = planner.plan()
+
+        self.assertValidPlan(
+            result.scheduled_tasks, [node.cpu_cores for node in nodes], transfer_delay=planner.transfer_delay
+        )
+        self.assertEqual(planner.transfer_delay('A', 'C', 0, 1), 1)
+        self.assertEqual(planner.transfer_delay('A', 'B', 0, 1), 50)
+        self.assertEqual(result.makespan, 21)
+
+    def test_node_solves_end_the_transferred_tasks_early(self):
+        tasks = [Task('X', '', 10, set()), Task('P', '', 2, set())]
+        plan = [ScheduledTask(tasks[0], 0, 0), ScheduledTask(tasks[1], 0, 10)]
+
+        result = PipelinePlanner(tasks).solve_within(1, plan, {}, {'P': 12}, ['P'], num_workers=1)
+
+        self.assertEqual(result.makespan, 12)
+        self.assertEqual({s_task.task.name: s_task.start for s_task in result.scheduled_tasks}, {'P': 0, 'X': 2})
+
+    def test_groups_only_exclude_each_other_within_a_node(self):
+        tasks = [Task('A', 'raw', 10, set()), Task('B', 'model', 10, set())]
+        nodes = [Node('n0', 2), Node('n1', 2)]
+
+        result = ClusterPlanner(tasks, nodes).plan()
+
+        self.assertEqual(result.makespan, 10)
+        self.assertNotEqual(result.scheduled_tasks[0].node, result.scheduled_tasks[1].node)
+
+    def test_grouped_tasks_wait_for_the_phases_of_other_groups(self):
+        # On a single node, the raw tasks form one phase and the model tasks wait for it
+        tasks = [
+            Task('A', 'raw', 10, set()), Task('B', 'raw', 4, set()), Task('C', 'model', 3, set()),
+            Task('D', 'model', 2, {'B'}), Task('E', '', 5, set())
+        ]
+
+        result = ClusterPlanner(tasks, [Node('n0', 3)]).plan(rounds=0)
+
+        self.assertValidPlan(result.scheduled_tasks, [3], tasks)
+        self.assertEqual(result.makespan, 13)
+
+    def test_invalid_cluster(self):
+        with self.assertRaisesRegex(PipelinePlanningError, 'at least one node'):
+            ClusterPlanner(TASKS, [])
+        with self.assertRaisesRegex(PipelinePlanningError, 'duplicated node names'):
+            ClusterPlanner(TASKS, [Node('n0', 1), Node('n0', 2)])
+        with self.assertRaisesRegex(PipelinePlanningError, 'unknown nodes: n9'):
+            ClusterPlanner(TASKS, [Node('n0', 1)], node_delays={('n0', 'n9'): 1})
+        with self.assertRaisesRegex(PipelinePlanningError, r'unknown dependencies: \(A, H\), \(A, Q\)'):
+            ClusterPlanner(TASKS, [Node('n0', 1)], edge_delays={('A', 'B'): 1, ('A', 'H'): 1, ('A', 'Q'): 1})
+        with self.assertRaisesRegex(PipelinePlanningError, 'must not be negative'):
+            ClusterPlanner(TASKS, [Node('n0', 1)], transfer_delay=-1)
+        with self.assertRaisesRegex(PipelinePlanningError, 'several cores are not supported across nodes: X'):
+            ClusterPlanner([Task('X', '', 10, set(), cores=2)], [Node('n0', 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from pipeline_planner.component_planner import ComponentPlanner
+from pipeline_planner.task import Task
+from tests.plan_assertions import PlanAssertions
+
+
+def chain(prefix: str, length: int, execution_time: int, group: str = '') -> list[Task]:
+    return [
+        Task(f'{prefix}{i}', group, execution_time, {f'{prefix}{i - 1}'} if i > 0 else set()) for i in range(length)
+    ]
+
+
+def fork(prefix: str, width: int, execution_time: int) -> list[Task]:
+    return [Task(f'{prefix}root', '', 1, set())] + [
+        Task(f'{prefix}{i}', '', execution_time, {f'{prefix}root'}) for i in range(width)
+    ]
+
+
+class TestComponentPlanner(PlanAssertions, unittest.TestCase):
+
+    def test_independent_components_are_planned_separately(self):
+        tasks = fork('A', 4, 5) + fork('B', 2, 5)
+        planner = ComponentPlanner(tasks)
+
+        self.assertEqual(len(planner.components()), 2)
+
+        result = planner.plan(6, processes=2)
+        self.assertValidPlan(result.scheduled_tasks, 6, tasks)
+        self.assertEqual(result.makespan, 6)
+        self.assertTrue(result.is_optimal())
+
+    def test_cores_go_to_the_longest_component(self):
+        tasks = fork('A', 6, 4) + chain('B', 3, 2)
+
+        result = ComponentPlanner(tasks).plan(4, processes=2)
+
+        self.assertValidPlan(result.scheduled_tasks, 4, tasks)
+        self.assertEqual(result.makespan, 9)
+
+    def test_more_components_than_cores_are_planned_together(self):
+        tasks = chain('A', 2, 5) + chain('B', 2, 3) + chain('C', 2, 2) + chain('D', 1, 4)
+
+        result = ComponentPlanner(tasks).plan(2)
+
+        self.assertValidPlan(result.scheduled_tasks, 2, tasks)
+        self.assertEqual(result.makespan, 12)
+        self.assertEqual(result.status, 'OPTIMAL')
+
+    def test_single_component_is_planned_in_process(self):
+        tasks = fork('A', 4, 5)
+
+        # No process pool is created, which would fail with no processes
+        result = ComponentPlanner(tasks).plan(2, processes=0)
+
+        self.assertValidPlan(result.scheduled_tasks, 2, tasks)
+        self.assertEqual(result.makespan, 11)
+        self.assertTrue(result.is_optimal())
+
+    def test_multi_core_tasks_are_planned_together(self):
+        tasks = [Task('A', '', 10, set(), cores=4), Task('B', '', 10, set(), cores=4)]
+
+        result = ComponentPlanner(tasks).plan(4)
+
+        self.assertEqual(result.makespan, 20)
+        self.assertEqual(sorted(s_task.cores for s_task in result.scheduled_tasks), [(0, 1, 2, 3)] * 2)
+
+    def test_components_with_different_groups_are_linked(self):
+        tasks = chain('A', 2, 3, 'G1') + chain('B', 2, 3, 'G2') + chain('C', 2, 3)
+        planner = ComponentPlanner(tasks)
+
+        self.assertEqual(sorted(len(component) for component in planner.components()), [2, 4])
+
+        result = planner.plan(3)
+        self.assertValidPlan(result.scheduled_tasks, 3, tasks)
+        self.assertEqual(result.makespan, 12)
+
+    def test_components_with_a_single_group_are_not_linked(self):
+        tasks = chain('A', 2, 3, 'G1') + chain('B', 2, 3, 'G1')
+
+        self.assertEqual(len(ComponentPlanner(tasks).components()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from pipeline_planner.list_scheduler import ListScheduler
+from pipeline_planner.pipeline_planner import PipelinePlanner
+from pipeline_planner.task import Task
+from tests.fixtures import TASKS
+from tests.plan_assertions import PlanAssertions
+
+
+class TestListScheduler(PlanAssertions, unittest.TestCase):
+
+    def test_valid_schedule(self):
+        for cpu_cores in [1, 2, 3, 8]:
+            scheduled_tasks = ListScheduler(TASKS).schedule(cpu_cores)
+
+            self.assertEqual([s_task.task for s_task in scheduled_tasks], TASKS)
+            self.assertValidPlan(scheduled_tasks, cpu_cores)
+
+            optimal = PipelinePlanner(TASKS).plan(cpu_cores)
+            self.assertGreaterEqual(
+                max(s_task.start + s_task.task.execution_time for s_task in scheduled_tasks),
+                max(s_task.start + s_task.task.execution_time for s_task in optimal)
+            )
+
+    def test_critical_path_first(self):
+        scheduled_tasks = ListScheduler([
+            Task('A', '', 1, set()),
+            Task('B', '', 2, set()),
+            Task('C', '', 2, {'B'})
+        ]).schedule(cpu_cores=1)
+
+        self.assertEqual([s_task.start for s_task in scheduled_tasks], [4, 0, 2])
+
+    def test_scale_linearly_when_no_dependencies(self):
+        tasks = [Task(f'T{i}', '', 4, set()) for i in range(8)]
+
+        for cpu_cores in [1, 2, 4, 8]:
+            scheduled_tasks = ListScheduler(tasks).schedule(cpu_cores)
+            self.assertEqual(max(s_task.start + s_task.task.execution_time for s_task in scheduled_tasks), 32 // cpu_cores)
+
+    def test_groups_do_not_overlap(self):
+        scheduled_tasks = ListScheduler([
+            Task('A', 'group1', 4, set()),
+            Task('B', 'group2', 4, set()),
+            Task('C', '', 4, set()),
+        ]).schedule(cpu_cores=3)
+
+        self.assertValidPlan(scheduled_tasks, 3)
+        self.assertEqual(max(s_task.start + s_task.task.execution_time for s_task in scheduled_tasks), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pipeline_planner.core_assignment import assign_core_sets
+from pipeline_planner.list_scheduler import ListScheduler
+from pipeline_planner.machine import Machine, CoreClass
+from pipeline_planner.pipeline_planner import PipelinePlanner
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+from pipeline_planner.task import Task
+from tests.plan_assertions import PlanAssertions
+
+
+class TestMachinePlanning(PlanAssertions, unittest.TestCase):
+
+    def test_multi_core_tasks(self):
+        tasks = [
+            Task('A', '', 10, set(), cores=3),
+            Task('B', '', 10, set(), cores=2),
+            Task('C', '', 10, set()),
+            Task('D', '', 5, {'C'}, cores=4)
+        ]
+        machine = Machine([CoreClass('cpu', 4)])
+
+        result = PipelinePlanner(tasks).solve_machine(machine)
+
+        self.assertValidPlan(result.scheduled_tasks, machine.cpu_cores, memory=machine.memory)
+        self.assertTrue(result.is_optimal())
+        self.assertEqual(result.makespan, 25)
+        # solve() plans multi-core tasks on identical cores the same way
+        self.assertEqual(PipelinePlanner(tasks).solve(cpu_cores=4).makespan, 25)
+
+    def test_memory_limits_parallelism(self):
+        tasks = [Task(f'T{i}', '', 10, set(), memory=16) for i in range(4)]
+
+        unlimited = PipelinePlanner(tasks).solve_machine(Machine([CoreClass('cpu', 4)]))
+        limited = PipelinePlanner(tasks).solve_machine(Machine([CoreClass('cpu', 4)], memory=32))
+
+        self.assertEqual(unlimited.makespan, 10)
+        self.assertEqual(limited.makespan, 20)
+        self.assertValidPlan(limited.scheduled_tasks, 4, memory=32)
+
+    def test_faster_core_classes(self):
+        tasks = [
+            Task('A', 'raw', 12, set()),
+            Task('B', 'raw', 12, set(), speeds={'fast': 4}),
+            Task('C', 'model', 6, {'A', 'B'}),
+            Task('D', '', 9, set(), cores=2)
+        ]
+        machine = Machine([CoreClass('slow', 2), CoreClass('fast', 1, speed=1.5)])
+
+        result = PipelinePlanner(tasks).solve_machine(machine)
+
+        self.assertValidPlan(result.scheduled_tasks, machine.cpu_cores, memory=machine.memory)
+        by_name = {s_task.task.name: s_task for s_task in result.scheduled_tasks}
+        # D only fits on the slow cores, B runs 4 times faster on the fast core
+        self.assertIn(by_name['D'].core, (0, 1))
+        self.assertEqual(by_name['B'].core, 2)
+        self.assertEqual(by_name['B'].task.execution_time, 3)
+        self.assertTrue(result.is_optimal())
+
+    def test_invalid_machine(self):
+        tasks = [Task('A', '', 1, set(), cores=4, memory=8), Task('B', '', 1, set(), memory=64)]
+
+        with self.assertRaisesRegex(PipelinePlanningError, 'more cores or memory than the machine has: A, B'):
+            PipelinePlanner(tasks).solve_machine(Machine([CoreClass('small', 2)], memory=32))
+
+        with self.assertRaisesRegex(PipelinePlanningError, 'duplicated core class names'):
+            PipelinePlanner(tasks).solve_machine(Machine([CoreClass('cpu', 4), CoreClass('cpu', 4)]))
+
+    def test_multi_core_tasks_need_a_machine_model(self):
+        tasks = [Task('A', '', 10, set(), cores=4), Task('B', '', 10, set(), cores=4)]
+        planner = PipelinePlanner(tasks)
+
+        self.assertEqual(planner.solve(4).makespan, 20)
+
+        for plan in [
+            lambda: ListScheduler(tasks).schedule(4),
+            lambda: planner.build_model(4),
+            lambda: planner.sweep(4, 5),
+            lambda: planner.solve_robust(4, scenarios=10),
+            lambda: planner.solve_coarse(4, polish_time_limit=1)
+        ]:
+            with self.assertRaisesRegex(PipelinePlanningError, 'several cores are not supported .*: A, B'):
+                plan()
+
+    def test_multi_core_tasks_from_the_command_line(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'pipeline.txt')
+            with open(path, 'w') as pipeline_file:
+                pipeline_file.write('A\n10 cores=4\n\n\nB\n10 cores=4\n\n\nEND\n')
+
+            output = subprocess.run(
+                [sys.executable, '-m', 'pipeline_planner', '--pipeline', path, '--cpu_cores', '4', '--format', 'json'],
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout
+
+        plan = json.loads(output)
+        self.assertEqual(plan['execution_time'], 20)
+        self.assertEqual(sorted(row['start'] for row in plan['tasks']), [0, 10])
+
+    def test_planning_modes_cannot_be_combined(self):
+        for arguments, error in [
+            (['--core_class', 'slow:1', '--core_class', 'fast:1:2', '--decompose'], '--core_class and --decompose'),
+            (['--cpu_cores', '2', '--coarsen', '--robust'], '--coarsen and --robust'),
+            (['--cpu_cores', '2', '--decompose', '--engine', 'heuristic'], '"cp-sat" engine')
+        ]:
+            completed = subprocess.run(
+                [sys.executable, '-m', 'pipeline_planner', '--pipeline', 'test_data/pipeline_tiny.txt', *arguments],
+                capture_output=True,
+                text=True
+            )
+
+            self.assertEqual(completed.returncode, 2)
+            self.assertIn(error, completed.stderr)
+
+    def test_assign_core_sets(self):
+        self.assertEqual(
+            assign_core_sets([(0, 10), (0, 5), (5, 10), (10, 12)], [2, 1, 1, 3], first_core=4),
+            [[5, 6], [4], [4], [4, 5, 6]]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+from pipeline_planner.packed_pipeline import PackedPipeline
+from pipeline_planner.pipeline_planner import PipelinePlanner
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+from pipeline_planner.task import Task, DurationDistribution
+from pipeline_planner.task_parser import TaskParser
+
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), '..', 'test_data')
+
+
+class TestPackedPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'pipeline.ppl')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        tasks = TaskParser().parse_file(os.path.join(TEST_DATA, 'pipeline_big.txt'))
+        PackedPipeline.write(tasks, self.path)
+
+        self.assertTrue(PackedPipeline.is_packed(self.path))
+        self.assertFalse(PackedPipeline.is_packed(os.path.join(TEST_DATA, 'pipeline_big.txt')))
+
+        with PackedPipeline(self.path) as packed:
+            self.assertEqual(len(packed), len(tasks))
+            self.assertEqual(list(packed.tasks()), tasks)
+            self.assertEqual(list(packed.durations), [task.execution_time for task in tasks])
+
+    def test_dependencies_are_stored_as_indices(self):
+        tasks = [
+            Task('α', 'G1', 2, set()),
+            Task('B', '', 1, {'α'}),
+            Task('C', 'G2', 3, {'α', 'B'}),
+        ]
+        PackedPipeline.write(tasks, self.path)
+
+        with PackedPipeline(self.path) as packed:
+            self.assertEqual(packed.names, ['α', 'B', 'C'])
+            self.assertEqual(packed.groups, ['G1', 'G2'])
+            self.assertEqual(list(packed.group_ids), [0, -1, 1])
+            self.assertEqual(sorted(packed.dependencies(2)), [0, 1])
+
+            graph = packed.task_graph()
+            self.assertEqual(graph.heads, [0, 2, 3])
+            self.assertEqual(graph.critical_path_length, 6)
+
+    def test_planner_consumes_packed_pipeline(self):
+        tasks = TaskParser().parse_file(os.path.join(TEST_DATA, 'pipeline_small.txt'))
+        PackedPipeline.write(tasks, self.path)
+
+        with PackedPipeline(self.path) as packed:
+            result = PipelinePlanner(packed).solve(2)
+
+        self.assertEqual(result.makespan, PipelinePlanner(tasks).solve(2).makespan)
+        self.assertEqual([s_task.task for s_task in result.scheduled_tasks], tasks)
+
+    def test_model_build_does_not_build_the_tasks(self):
+        class CountingPackedPipeline(PackedPipeline):
+            built = 0
+
+            def task(self, index: int) -> Task:
+                CountingPackedPipeline.built += 1
+                return super().task(index)
+
+        PackedPipeline.write(TaskParser().parse_file(os.path.join(TEST_DATA, 'pipeline_small.txt')), self.path)
+
+        with CountingPackedPipeline(self.path) as packed:
+            planner = PipelinePlanner(packed)
+            planning_model = planner.build_model(2)
+            self.assertEqual(CountingPackedPipeline.built, 0)
+
+            # Only the reported plan builds them, once each
+            planner.solve(2)
+            self.assertEqual(CountingPackedPipeline.built, len(packed))
+            self.assertEqual(len(planning_model.heuristic_plan), len(packed))
+
+    def test_tasks_are_built_on_access(self):
+        PackedPipeline.write([Task('A', 'G1', 2, set()), Task('B', '', 1, {'A'})], self.path)
+
+        with PackedPipeline(self.path) as packed:
+            tasks = packed.tasks()
+            task = tasks[1]
+            self.assertIs(tasks[1], task)
+
+        # The built tasks outlive the memory map
+        self.assertEqual(task, Task('B', '', 1, {'A'}))
+        self.assertIn('A', task.dependencies)
+        self.assertEqual(sorted(task.dependencies), ['A'])
+
+    def test_invalid_pipelines_are_not_written(self):
+        with self.assertRaisesRegex(PipelinePlanningError, 'check for circular dependencies'):
+            PackedPipeline.write([Task('A', '', 1, {'B'}), Task('B', '', 1, {'A'})], self.path)
+
+        with self.assertRaisesRegex(PipelinePlanningError, 'cannot be packed: B, C, D'):
+            PackedPipeline.write([
+                Task('A', '', 1, set()),
+                Task('B', '', 1, set(), cores=2),
+                Task('C', '', 1, set(), memory=4),
+                Task('D', '', 1, set(), DurationDistribution(p95=2))
+            ], self.path)
+
+    def test_invalid_file(self):
+        with open(self.path, 'wb') as packed_file:
+            packed_file.write(b'A\n1\n\n\nEND\n' * 4)
+
+        with self.assertRaisesRegex(PipelinePlanningError, 'is not a packed pipeline file'):
+            PackedPipeline(self.path)
+
+        PackedPipeline.write([Task('A', '', 1, set())], self.path)
+        with open(self.path, 'r+b') as packed_file:
+            packed_file.truncate(os.path.getsize(self.path) - 1)
+
+        with self.assertRaisesRegex(PipelinePlanningError, 'truncated or corrupted'):
+            PackedPipeline(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
+import io
+import itertools
 import unittest
 from pipeline_planner.task_parser import TaskParser
-from pipeline_planner.task import Task
+from pipeline_planner.task import Task, DurationDistribution
 from pipeline_planner.pipeline_planning_error import PipelinePlanningError
 
 
@@ -75,6 +77,70 @@ class TestParsing(unittest.TestCase):
         ):
             TaskParser().parse(['A ', '2', ' group ', '', 'A', '1', '', '', 'END'])
 
+    def test_trailing_newline_after_end(self):
+        parsed = TaskParser().parse(['A', '2', 'feature', '', 'END', ''])
+
+        self.assertEqual(parsed, [Task('A', 'feature', 2, set())])
+
+        with self.assertRaisesRegex(PipelinePlanningError, 'Unexpected content after "END" on line 7'):
+            TaskParser().parse(['A', '2', 'feature', '', 'END', '', 'B'])
+
+    def test_task_named_end(self):
+        parsed = TaskParser().parse(['END', '2', 'feature', '', 'B', '1', '', 'END', 'END', ''])
+
+        self.assertEqual(parsed, [Task('END', 'feature', 2, set()), Task('B', '', 1, {'END'})])
+
+        with self.assertRaisesRegex(PipelinePlanningError, 'Unexpected line count: 1 \\(no tasks\\)'):
+            TaskParser().parse(['END', '', ''])
+
+    def test_file_object(self):
+        parsed = TaskParser().parse(io.StringIO('A\n2\nfeature\n\nB\n1\n\nA\nEND\n'))
+
+        self.assertEqual(parsed, [Task('A', 'feature', 2, set()), Task('B', '', 1, {'A'})])
+
+    def test_errors_report_line_numbers(self):
+        with self.assertRaisesRegex(PipelinePlanningError, r'execution time: "x" \(line 6\)'):
+            TaskParser().parse(['A', '2', '', '', 'B', 'x', '', '', 'END'])
+
+        with self.assertRaisesRegex(PipelinePlanningError, r'duplicate task names: A \(line 5\)'):
+            TaskParser().parse(['A', '2', '', '', 'A', '1', '', '', 'END'])
+
+    def test_duration_distributions(self):
+        parsed = TaskParser().parse(['A', '10 p95=25', '', '', 'B', '4 samples=3,4,9', '', 'A', 'END'])
+
+        self.assertEqual(parsed[0], Task('A', '', 10, set(), DurationDistribution(p95=25)))
+        self.assertEqual(parsed[1], Task('B', '', 4, {'A'}, DurationDistribution(samples=(3, 4, 9))))
+
+        for execution_time in ['10 p95=5', '10 p50=12', '10 samples=', '10 samples=0,1', '10 p95=20 p95=30']:
+            with self.assertRaisesRegex(PipelinePlanningError, 'invalid execution time'):
+                TaskParser().parse(['A', execution_time, '', '', 'END'])
+
+    def test_resource_demands(self):
+        parsed = TaskParser().parse(['A', '10 cores=4 memory=32 speed.fast=2.5 p95=20', '', '', 'END'])
+
+        self.assertEqual(parsed[0], Task(
+            'A', '', 10, set(), DurationDistribution(p95=20), cores=4, memory=32, speeds={'fast': 2.5}
+        ))
+
+        for execution_time in ['10 cores=0', '10 memory=-1', '10 speed.=2', '10 speed.fast=0', '10 cores=2 cores=3']:
+            with self.assertRaisesRegex(PipelinePlanningError, 'invalid execution time'):
+                TaskParser().parse(['A', execution_time, '', '', 'END'])
+
+    def test_tasks_are_parsed_lazily(self):
+        def lines():
+            yield from ['A', '2', '', '', 'B', '0', '', '']
+            raise AssertionError('Read past the first invalid task')
+
+        tasks = TaskParser().iter_tasks(lines())
+        self.assertEqual(next(tasks), Task('A', '', 2, set()))
+        with self.assertRaisesRegex(PipelinePlanningError, 'invalid execution time'):
+            next(tasks)
+
+        endless = itertools.cycle(['T', '1', '', ''])
+        self.assertEqual(len(list(itertools.islice(TaskParser().iter_tasks(
+            f'{line}{i // 4}' if i % 4 == 0 else line for i, line in enumerate(endless)
+        ), 1000))), 1000)
+
 
 if __name__ == '__main__':
     unittest.main()
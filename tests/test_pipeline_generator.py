@@ -0,0 +1,47 @@
+import unittest
+from pipeline_planner.pipeline_generator import generate_pipeline
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+from pipeline_planner.task_graph import TaskGraph
+
+
+class TestPipelineGenerator(unittest.TestCase):
+
+    def test_same_seed_same_pipeline(self):
+        self.assertEqual(generate_pipeline(100, group_count=3, seed=7), generate_pipeline(100, group_count=3, seed=7))
+        self.assertNotEqual(generate_pipeline(100, seed=7), generate_pipeline(100, seed=8))
+
+    def test_layered_structure(self):
+        tasks = generate_pipeline(500, depth=10, max_fan_in=3, group_count=4)
+        graph = TaskGraph(tasks)
+
+        self.assertEqual(len(tasks), 500)
+        self.assertTrue(all(1 <= len(task.dependencies) <= 3 for task in tasks[50:]))
+        self.assertTrue(all(len(task.dependencies) == 0 for task in tasks[:50]))
+        # The longest chain has exactly one task per layer
+        self.assertEqual(max(self.chain_lengths(graph)), 10)
+        self.assertEqual({task.group for task in tasks}, {'', 'G0', 'G1', 'G2', 'G3'})
+
+    def test_duration_distributions(self):
+        for distribution in ['uniform', 'exponential', 'lognormal']:
+            tasks = generate_pipeline(300, duration_distribution=distribution, min_duration=2, max_duration=50)
+            self.assertTrue(all(2 <= task.execution_time <= 50 for task in tasks), distribution)
+
+    def test_invalid_arguments(self):
+        with self.assertRaisesRegex(PipelinePlanningError, 'must be positive'):
+            generate_pipeline(0)
+        with self.assertRaisesRegex(PipelinePlanningError, 'Invalid execution time range'):
+            generate_pipeline(10, min_duration=5, max_duration=4)
+        with self.assertRaisesRegex(PipelinePlanningError, 'Unsupported execution time distribution'):
+            generate_pipeline(10, duration_distribution='normal')
+
+    @staticmethod
+    def chain_lengths(graph: TaskGraph) -> list[int]:
+        lengths = [1] * len(graph.names)
+        for i in graph.order:
+            for succ in graph.successors[i]:
+                lengths[succ] = max(lengths[succ], lengths[i] + 1)
+        return lengths
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from pipeline_planner.plan_cache import PlanCache
+from pipeline_planner.pipeline_planner import PipelinePlanner
+from pipeline_planner.plan_result import PlanResult
+from pipeline_planner.task import Task, ScheduledTask
+
+
+class TestPlanCache(unittest.TestCase):
+
+    def setUp(self):
+        self.__directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.__directory.name, 'plans.db')
+
+    def tearDown(self):
+        self.__directory.cleanup()
+
+    def test_key_is_canonical(self):
+        tasks = [Task('A', 'g', 2, set()), Task('B', '', 1, {'A', 'C'}), Task('C', '', 3, set())]
+        shuffled = [Task('C', '', 3, set()), Task('B', '', 1, {'C', 'A'}), Task('A', 'g', 2, set())]
+
+        self.assertEqual(PlanCache.key(tasks, 2, {'x': 1}), PlanCache.key(shuffled, 2, {'x': 1}))
+        self.assertNotEqual(PlanCache.key(tasks, 2, {'x': 1}), PlanCache.key(tasks, 3, {'x': 1}))
+        self.assertNotEqual(PlanCache.key(tasks, 2, {'x': 1}), PlanCache.key(tasks, 2, {'x': 2}))
+        self.assertNotEqual(
+            PlanCache.key(tasks, 2, {}), PlanCache.key([Task('A', 'g', 3, set())] + tasks[1:], 2, {})
+        )
+
+    def test_round_trip_and_stats(self):
+        tasks = [Task('A', 'g', 2, set()), Task('B', '', 1, {'A'})]
+        cache = PlanCache(self.path)
+
+        self.assertIsNone(cache.get('key', tasks))
+        cache.put('key', PlanResult([ScheduledTask(tasks[1], 0, 2), ScheduledTask(tasks[0], 1, 0)], 3, 3, 'OPTIMAL', 1.5))
+
+        result = cache.get('key', tasks)
+        self.assertEqual(result.scheduled_tasks, [ScheduledTask(tasks[0], 1, 0), ScheduledTask(tasks[1], 0, 2)])
+        self.assertEqual((result.makespan, result.lower_bound, result.status), (3, 3, 'OPTIMAL'))
+
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.entries), (1, 1, 1))
+        self.assertEqual(stats.hit_rate, 0.5)
+        cache.close()
+
+        # The plans are persisted
+        self.assertIsNotNone(PlanCache(self.path).get('key', tasks))
+
+    def test_evicts_least_recently_used(self):
+        tasks = [Task(f'T{i}', '', 1, set()) for i in range(20)]
+        result = PlanResult([ScheduledTask(task, 0, i) for i, task in enumerate(tasks)], 20, 20, 'OPTIMAL', 0.0)
+
+        cache = PlanCache(self.path)
+        cache.put('first', result)
+        entry_size = cache.stats().size_bytes
+        cache.close()
+
+        cache = PlanCache(self.path, max_bytes=2 * entry_size)
+        cache.put('second', result)
+        cache.get('first', tasks)
+        cache.put('third', result)
+
+        self.assertEqual(cache.stats().entries, 2)
+        self.assertIsNotNone(cache.get('first', tasks))
+        self.assertIsNone(cache.get('second', tasks))
+        self.assertIsNotNone(cache.get('third', tasks))
+
+    def test_planner_uses_cache(self):
+        tasks = [Task('A', 'feature', 2, set()), Task('B', 'feature', 1, set()), Task('C', 'model', 2, {'B'})]
+        cache = PlanCache(self.path)
+
+        first = PipelinePlanner(tasks, cache).solve(cpu_cores=2)
+        second = PipelinePlanner(tasks, cache).solve(cpu_cores=2)
+        other_cores = PipelinePlanner(tasks, cache).solve(cpu_cores=1)
+
+        self.assertEqual(second.scheduled_tasks, first.scheduled_tasks)
+        self.assertEqual(other_cores.makespan, 5)
+        self.assertEqual((cache.stats().hits, cache.stats().misses), (1, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from pipeline_planner.plan_executor import PlanExecutor
+from pipeline_planner.pipeline_planner import PipelinePlanner
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+from pipeline_planner.task import Task, ScheduledTask
+from tests.fixtures import TASKS
+from tests.plan_assertions import PlanAssertions
+
+
+class TestPlanExecutor(PlanAssertions, unittest.TestCase):
+
+    def test_planned_durations_execute_the_plan(self):
+        plan = PipelinePlanner(TASKS).plan(cpu_cores=2)
+
+        result = PlanExecutor(TASKS, plan, 2).run()
+
+        self.assertEqual(
+            [s_task.start for s_task in result.scheduled_tasks],
+            [s_task.start for s_task in plan]
+        )
+        self.assertEqual(result.makespan, result.planned_makespan)
+        self.assertEqual(result.max_drift, 0)
+        self.assertEqual(result.replans, [])
+
+    def test_late_tasks_delay_the_execution(self):
+        plan = PipelinePlanner(TASKS).plan(cpu_cores=2)
+
+        result = PlanExecutor(TASKS, plan, 2).run({'A': 60, 'H': 35})
+
+        self.assertValidPlan(result.scheduled_tasks, 2)
+        self.assertEqual(result.scheduled_tasks[0].task.execution_time, 60)
+        self.assertGreater(result.makespan, result.planned_makespan)
+        self.assertGreater(result.throughput_loss, 0)
+        self.assertGreaterEqual(result.max_drift, 12)
+
+    def test_replanning_recovers_early_completions(self):
+        plan = PipelinePlanner(TASKS).plan(cpu_cores=2)
+        actual_durations = lambda task: task.execution_time // 2
+
+        without_replans = PlanExecutor(TASKS, plan, 2).run(actual_durations)
+        with_replans = PlanExecutor(TASKS, plan, 2).run(actual_durations, drift_threshold=5)
+
+        self.assertValidPlan(with_replans.scheduled_tasks, 2)
+        self.assertEqual(without_replans.replans, [])
+        self.assertGreater(len(with_replans.replans), 0)
+        # Without replanning the tasks still start as planned, with replanning
+        # the execution nears the optimal plan of the actual durations (81)
+        self.assertGreater(without_replans.makespan, 120)
+        self.assertLess(with_replans.makespan, 100)
+
+    def test_replanning_with_a_single_core(self):
+        plan = PipelinePlanner(TASKS).plan(cpu_cores=1)
+
+        result = PlanExecutor(TASKS, plan, 1).run({'A': 10, 'Z': 70}, drift_threshold=0)
+
+        self.assertValidPlan(result.scheduled_tasks, 1)
+        self.assertEqual(result.makespan, sum(task.execution_time for task in TASKS) - 38 + 12)
+
+    def test_invalid_execution(self):
+        with self.assertRaisesRegex(PipelinePlanningError, 'The plan does not contain the tasks: Z'):
+            PlanExecutor(TASKS, PipelinePlanner(TASKS[:-1]).plan(cpu_cores=2), 2)
+
+        plan = PipelinePlanner(TASKS).plan(cpu_cores=2)
+        with self.assertRaisesRegex(PipelinePlanningError, 'Invalid actual execution time of task A: -1'):
+            PlanExecutor(TASKS, plan, 2).run({'A': -1})
+
+        multi_core = [Task('M', '', 10, set(), cores=2)]
+        with self.assertRaisesRegex(PipelinePlanningError, 'several cores are not supported by the plan executor: M'):
+            PlanExecutor(multi_core, [ScheduledTask(multi_core[0], 0, 0, (0, 1))], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,13 @@
+import subprocess
+import sys
 import unittest
+from pipeline_planner.fast_path import plan_by_list_scheduling
 from pipeline_planner.pipeline_planner import PipelinePlanner
 from pipeline_planner.pipeline_planning_error import PipelinePlanningError
 from pipeline_planner.task import Task, ScheduledTask
+from pipeline_planner.core_assignment import assign_cores
+from pipeline_planner.plan_profile import PlanProfile
+from tests.fixtures import TASKS
 
 
 class TestPlanner(unittest.TestCase):
@@ -30,9 +36,10 @@ class TestPlanner(unittest.TestCase):
         scheduled_tasks = PipelinePlanner(tasks).plan(cpu_cores=2)
 
         self.assertEqual(len(scheduled_tasks), 3)
-        self.assertEqual(scheduled_tasks[0], ScheduledTask(tasks[0], core=1, start=0))
-        self.assertEqual(scheduled_tasks[1], ScheduledTask(tasks[1], core=0, start=0))
-        self.assertEqual(scheduled_tasks[2], ScheduledTask(tasks[2], core=1, start=2))
+        self.assertEqual([s_task.start for s_task in scheduled_tasks], [0, 0, 2])
+        # The cores are interchangeable, so only A and B sharing no core is meaningful
+        self.assertEqual({scheduled_tasks[0].core, scheduled_tasks[1].core}, {0, 1})
+        self.assertIn(scheduled_tasks[2].core, {0, 1})
 
     def test_small_plan_with_two_and_three_cores(self):
         tasks = [
@@ -163,5 +170,255 @@ class TestPlanner(unittest.TestCase):
         self.assertEqual(max([s_task.start + s_task.task.execution_time for s_task in planner.plan(cpu_cores=8)]), 32)
 
 
+    def test_cumulative_cores_match_per_core_makespan(self):
+        planner = PipelinePlanner(TASKS)
+
+        for cpu_cores, expected_time in [(1, 264), (2, 163), (3, 153)]:
+            scheduled_tasks = planner.plan(cpu_cores=cpu_cores, cumulative_cores=True)
+
+            self.assertEqual(max([s_task.start + s_task.task.execution_time for s_task in scheduled_tasks]), expected_time)
+            for s_task in scheduled_tasks:
+                self.assertIn(s_task.core, range(cpu_cores))
+                for other in scheduled_tasks:
+                    if other is not s_task and other.core == s_task.core:
+                        self.assertTrue(
+                            other.start >= s_task.start + s_task.task.execution_time or
+                            s_task.start >= other.start + other.task.execution_time
+                        )
+
+    def test_cumulative_cores_scale_linearly_when_no_dependencies(self):
+        tasks = [Task(f'T{i}', '', 4, set()) for i in range(32)]
+
+        planner = PipelinePlanner(tasks)
+
+        for cpu_cores in [2, 8, 32]:
+            scheduled_tasks = planner.plan(cpu_cores=cpu_cores, cumulative_cores=True)
+            self.assertEqual(max([s_task.start + s_task.task.execution_time for s_task in scheduled_tasks]), 128 // cpu_cores)
+
+    def test_assign_cores_reuses_released_cores(self):
+        self.assertEqual(assign_cores([(0, 2), (0, 1), (1, 3), (2, 4), (3, 4)]), [1, 0, 0, 1, 0])
+        self.assertEqual(assign_cores([]), [])
+
+
+    def test_task_domains_follow_critical_path(self):
+        tasks = [
+            Task('A', '', 3, set()),
+            Task('B', '', 2, {'A'}),
+            Task('C', '', 5, {'A'}),
+            Task('D', '', 1, {'B', 'C'})
+        ]
+
+        planning_model = PipelinePlanner(tasks).build_model(cpu_cores=1)
+        variables = planning_model.model.Proto().variables
+
+        # makespan upper bound = 11 (serial plan), critical path = A -> C -> D = 9
+        self.assertEqual(list(variables[planning_model.starts[0].Index()].domain), [0, 2])
+        self.assertEqual(list(variables[planning_model.starts[1].Index()].domain), [3, 8])
+        self.assertEqual(list(variables[planning_model.ends[2].Index()].domain), [8, 10])
+        self.assertEqual(list(variables[planning_model.starts[3].Index()].domain), [8, 10])
+        self.assertEqual(list(variables[planning_model.makespan.Index()].domain), [11, 11])
+
+        planning_model = PipelinePlanner(tasks).build_model(cpu_cores=2)
+        variables = planning_model.model.Proto().variables
+
+        # the list schedule is already optimal (upper bound = critical path = 9), so the critical-path
+        # tasks are fixed while B, off the critical path, keeps its slack
+        self.assertEqual(list(variables[planning_model.starts[1].Index()].domain), [3, 6])
+        self.assertEqual(list(variables[planning_model.starts[3].Index()].domain), [8, 8])
+        self.assertEqual(list(variables[planning_model.makespan.Index()].domain), [9, 9])
+
+    def test_warm_start_hints_the_cores(self):
+        tasks = [Task('A', '', 3, set()), Task('B', '', 2, {'A'}), Task('C', '', 5, set()), Task('D', '', 1, set())]
+
+        planning_model = PipelinePlanner(tasks).build_model(cpu_cores=2)
+        solution_hint = planning_model.model.Proto().solution_hint
+        hints = dict(zip(solution_hint.vars, solution_hint.values))
+
+        for s_task, l_presences in zip(planning_model.heuristic_plan, planning_model.presences):
+            self.assertEqual([hints[presence.Index()] for presence in l_presences], [s_task.core == 0, s_task.core == 1])
+
+    def test_profile_of_a_solve(self):
+        tasks = [
+            Task('A', 'G1', 3, set()),
+            Task('B', 'G2', 2, set()),
+            Task('C', '', 5, {'A'}),
+        ]
+        profile = PlanProfile()
+
+        result = PipelinePlanner(tasks, profile=profile).solve(cpu_cores=2, profile=profile)
+
+        self.assertEqual(list(profile.phases), ['validate', 'model build', 'solve', 'extract'])
+        self.assertEqual(profile.model['no_overlap_sizes'], [3, 3])
+        self.assertEqual(profile.model['constraint_types']['cumulative'], 1)
+        self.assertEqual(profile.solver['status'], 'OPTIMAL')
+        self.assertGreaterEqual(profile.solver['branches'], 0)
+        self.assertEqual(profile.bound_progress[-1][1], result.makespan)
+
+        profile.record_peak_memory()
+        self.assertGreater(profile.peak_memory_bytes, 0)
+        self.assertIn('"bound_progress"', profile.to_json())
+
+    def test_trivial_plans_skip_the_solver(self):
+        chain = [Task('A', 'G1', 3, set()), Task('B', 'G2', 2, {'A'}), Task('C', '', 5, {'B'})]
+        solutions = []
+
+        result = PipelinePlanner(chain).solve(cpu_cores=4, solution_callback=solutions.append)
+
+        self.assertEqual(result.makespan, 10)
+        self.assertTrue(result.is_optimal())
+        self.assertEqual(solutions, [])
+
+        independent = [Task(f'T{i}', 'G1' if i % 2 else 'G2', i + 1, set()) for i in range(5)]
+        result = PipelinePlanner(independent).solve(cpu_cores=1, solution_callback=solutions.append)
+
+        self.assertEqual(result.makespan, 15)
+        self.assertEqual(result.status, 'OPTIMAL')
+        self.assertEqual(solutions, [])
+
+    def test_known_list_schedule_is_reused(self):
+        tasks = [Task('A', 'G1', 3, set()), Task('B', 'G2', 2, set()), Task('C', '', 5, {'A'})]
+        planner = PipelinePlanner(tasks)
+
+        trivial = plan_by_list_scheduling(tasks, 4, planner.task_graph)
+        result = planner.solve(4, list_schedule=trivial)
+        self.assertEqual((result.scheduled_tasks, result.makespan), (list(trivial.scheduled_tasks), trivial.makespan))
+        self.assertEqual(result.wall_time, trivial.wall_time)  # not scheduled again
+
+        # 8 minutes of work cannot fit in 4 minutes on 2 cores, so only the solver proves the plan optimal
+        tasks = [Task('A', '', 3, set()), Task('B', '', 3, set()), Task('C', '', 2, set())]
+        planner = PipelinePlanner(tasks)
+        list_schedule = plan_by_list_scheduling(tasks, 2, planner.task_graph)
+        result = planner.solve(2, list_schedule=list_schedule)
+
+        self.assertEqual(list_schedule.status, 'FEASIBLE')
+        self.assertEqual((result.makespan, result.status), (5, 'OPTIMAL'))
+
+    def test_trivial_plans_do_not_import_the_solver(self):
+        # Every planning mode but the default one is left out, as they import the solver anyway
+        script = (
+            'import runpy, sys; '
+            'sys.argv = ["pipeline_planner", "--pipeline", "test_data/pipeline_tiny.txt", "--cpu_cores", "1"]; '
+            'runpy.run_module("pipeline_planner", run_name="__main__"); '
+            'print("ortools" in sys.modules, "numpy" in sys.modules)'
+        )
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+
+        self.assertEqual(output.splitlines()[-1], 'False False')
+
+    def test_solve_reports_bounds_of_optimal_plan(self):
+        tasks = [Task(f'T{i}', '', 4, set()) for i in range(8)]
+
+        result = PipelinePlanner(tasks).solve(cpu_cores=2)
+
+        self.assertEqual(result.status, 'OPTIMAL')
+        self.assertEqual(result.makespan, 16)
+        self.assertEqual(result.lower_bound, 16)
+        self.assertEqual(result.gap, 0)
+        self.assertTrue(result.is_optimal())
+
+    def test_status_reached_through_the_gap_limit_is_not_optimal(self):
+        tasks = [
+            Task(f'T{i}', f'G{i % 3}', 1 + (i * 7) % 11, {f'T{i - 5}'} if i >= 5 else set()) for i in range(40)
+        ]
+
+        # CP-SAT stops with its OPTIMAL status as soon as the hinted plan is within the gap
+        result = PipelinePlanner(tasks).solve(cpu_cores=4, relative_gap=0.9, num_workers=1)
+
+        self.assertGreater(result.gap, 0)
+        self.assertFalse(result.is_optimal())
+        self.assertEqual(result.status, 'FEASIBLE')
+
+    def test_time_limited_solve_returns_best_plan_so_far(self):
+        tasks = [
+            Task(f'T{i}', f'G{i % 3}', 1 + (i * 7) % 11, {f'T{i - 5}'} if i >= 5 else set()) for i in range(40)
+        ]
+        improving_makespans = []
+
+        result = PipelinePlanner(tasks).solve(
+            cpu_cores=4, time_limit=0.5, solution_callback=lambda r: improving_makespans.append(r.makespan)
+        )
+
+        self.assertEqual(result.status == 'OPTIMAL', result.is_optimal())
+        self.assertEqual(len(result.scheduled_tasks), 40)
+        self.assertLessEqual(result.lower_bound, result.makespan)
+        self.assertLessEqual(result.wall_time, 5)
+        self.assertEqual(improving_makespans, sorted(improving_makespans, reverse=True))
+
+    def test_solution_callback_streams_plans(self):
+        tasks = [
+            Task('A', 'raw', 48, set()),
+            Task('B', 'feature', 26, {'A'}),
+            Task('D', 'raw', 4, set()),
+            Task('H', 'feature', 29, set()),
+            Task('Z', 'model', 58, {'H'})
+        ]
+        plans = []
+
+        result = PipelinePlanner(tasks).solve(cpu_cores=2, solution_callback=plans.append)
+
+        self.assertGreater(len(plans), 0)
+        self.assertEqual(plans[-1].makespan, result.makespan)
+        self.assertEqual(len(plans[-1].scheduled_tasks), 5)
+
+
+    def test_sweep_matches_individual_plans(self):
+        results = PipelinePlanner(TASKS).sweep(1, 5)
+
+        self.assertEqual({cpu_cores: result.makespan for cpu_cores, result in results.items()}, {
+            1: 264, 2: 163, 3: 153, 4: 153, 5: 153
+        })
+        for cpu_cores, result in results.items():
+            self.assertTrue(result.is_optimal())
+            self.assertTrue(all(s_task.core < cpu_cores for s_task in result.scheduled_tasks))
+
+    def test_sweep_stops_solving_at_critical_path(self):
+        tasks = [Task(f'T{i}', '', 4, set()) for i in range(4)]
+
+        results = PipelinePlanner(tasks).sweep(2, 8)
+
+        self.assertEqual([result.makespan for result in results.values()], [8, 8, 4, 4, 4, 4, 4])
+        self.assertTrue(all(result.wall_time == 0 for cpu_cores, result in results.items() if cpu_cores > 4))
+
+    def test_sweep_rejects_invalid_range(self):
+        with self.assertRaisesRegex(PipelinePlanningError, 'Invalid core range'):
+            PipelinePlanner([Task('A', '', 1, set())]).sweep(3, 2)
+
+    def test_coarse_plan_in_gcd_units_is_exact(self):
+        tasks = [
+            Task('A', 'raw', 48 * 60, set()),
+            Task('B', 'feature', 26 * 60, {'A'}),
+            Task('D', 'raw', 4 * 60, set()),
+            Task('H', 'feature', 29 * 60, set()),
+            Task('Z', 'model', 58 * 60, {'H'})
+        ]
+        planner = PipelinePlanner(tasks)
+
+        result = planner.solve_coarse(cpu_cores=2)
+
+        self.assertTrue(result.is_optimal())
+        self.assertEqual(result.makespan, planner.solve(cpu_cores=2).makespan)
+        self.assertTrue(all(s_task.start % 60 == 0 for s_task in result.scheduled_tasks))
+
+    def test_coarse_plan_in_buckets_reports_its_loss(self):
+        tasks = [
+            Task(f'T{i}', f'G{i % 3}', 100 + (i * 37) % 110, {f'T{i - 4}'} if i >= 4 else set()) for i in range(16)
+        ]
+        planner = PipelinePlanner(tasks)
+        optimal = planner.solve(cpu_cores=3)
+
+        result = planner.solve_coarse(cpu_cores=3, bucket=50)
+        polished = planner.solve_coarse(cpu_cores=3, bucket=50, polish_time_limit=5)
+
+        for plan in (result, polished):
+            self.assertTrue(all(s_task.core < 3 for s_task in plan.scheduled_tasks))
+            self.assertLessEqual(plan.lower_bound, optimal.makespan)
+            self.assertGreaterEqual(plan.makespan, optimal.makespan)
+        self.assertTrue(all(s_task.start % 50 == 0 for s_task in result.scheduled_tasks))
+        self.assertLessEqual(polished.makespan, result.makespan)
+
+        with self.assertRaisesRegex(PipelinePlanningError, 'Invalid time bucket: 0'):
+            planner.solve_coarse(cpu_cores=3, bucket=0)
+
+
 if __name__ == '__main__':
     unittest.main()
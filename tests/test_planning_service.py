@@ -0,0 +1,130 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+from pipeline_planner.pipeline_generator import generate_pipeline
+from pipeline_planner.planning_service import PlanningService, PlanningCancelledError
+
+
+TINY_PIPELINE = 'A\n2\nfeature\n\nB\n1\nfeature\n\nC\n2\nmodel\nB\nEND'
+
+
+class TestPlanningService(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.service = PlanningService(concurrency=2, cache_path=os.path.join(self.directory.name, 'plans.db'))
+        self.server = await self.service.start(port=0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.service.close()
+        self.directory.cleanup()
+
+    async def request(self, method: str, path: str, body: dict | None = None) -> tuple[int, dict]:
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        payload = json.dumps(body).encode() if body is not None else b''
+        writer.write(f'{method} {path} HTTP/1.1\r\nContent-Length: {len(payload)}\r\n\r\n'.encode() + payload)
+        await writer.drain()
+
+        response = await reader.read()
+        writer.close()
+        head, _, body = response.partition(b'\r\n\r\n')
+        return int(head.split()[1]), json.loads(body)
+
+    async def test_plan_request(self):
+        status, response = await self.request('POST', '/plan', {'pipeline': TINY_PIPELINE, 'cpu_cores': 2})
+
+        self.assertEqual(status, 200)
+        self.assertEqual(response['makespan'], 4)
+        self.assertEqual(response['status'], 'OPTIMAL')
+        self.assertEqual(sorted(row['name'] for row in response['tasks']), ['A', 'B', 'C'])
+
+        # Planned again from the shared plan cache
+        started = time.perf_counter()
+        status, response = await self.request(
+            'POST', '/plan', {'pipeline': TINY_PIPELINE, 'cpu_cores': 2, 'format': 'table'}
+        )
+        self.assertEqual(status, 200)
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertTrue(response['report'].startswith('Minimum Execution Time = 4 minute(s)'))
+
+    async def test_plan_tasks(self):
+        response = await self.service.plan({
+            'tasks': [
+                {'name': 'A', 'execution_time': 3},
+                {'name': 'B', 'group': 'G1', 'execution_time': 2, 'dependencies': ['A']}
+            ],
+            'cpu_cores': 1
+        })
+
+        self.assertEqual(response['makespan'], 5)
+
+    async def test_invalid_requests(self):
+        status, response = await self.request('POST', '/plan', {'pipeline': 'A\n0\n\n\nEND', 'cpu_cores': 2})
+        self.assertEqual(status, 400)
+        self.assertRegex(response['error'], 'invalid execution time')
+
+        status, response = await self.request('POST', '/plan', {'pipeline': TINY_PIPELINE})
+        self.assertEqual(status, 400)
+        self.assertRegex(response['error'], 'cpu_cores')
+
+        for relative_gap in ['5%', -0.1]:
+            status, response = await self.request(
+                'POST', '/plan', {'pipeline': TINY_PIPELINE, 'cpu_cores': 2, 'relative_gap': relative_gap}
+            )
+            self.assertEqual(status, 400)
+            self.assertRegex(response['error'], 'relative_gap')
+
+        status, _ = await self.request('GET', '/unknown')
+        self.assertEqual(status, 404)
+
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write(b'POST /plan HTTP/1.1\r\nContent-Length: twelve\r\n\r\n{}')
+        await writer.drain()
+        head, _, body = (await reader.read()).partition(b'\r\n\r\n')
+        writer.close()
+        self.assertEqual(int(head.split()[1]), 400)
+        self.assertRegex(json.loads(body)['error'], 'Invalid Content-Length: twelve')
+
+    async def test_cancel_running_request(self):
+        tasks = generate_pipeline(300, group_count=3)
+        request = {
+            'tasks': [
+                {'name': t.name, 'group': t.group, 'execution_time': t.execution_time, 'dependencies': list(t.dependencies)}
+                for t in tasks
+            ],
+            'cpu_cores': 8,
+            'time_limit': 60,
+            'request_id': 'long'
+        }
+        started = time.perf_counter()
+        plan = asyncio.ensure_future(self.request('POST', '/plan', request))
+
+        while self.service.running == 0:
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(1)
+        status, response = await self.request('DELETE', '/plan/long')
+        self.assertEqual((status, response), (200, {'cancelled': True}))
+
+        status, response = await plan
+        self.assertEqual(status, 409)
+        self.assertLess(time.perf_counter() - started, 30)
+        self.assertEqual((await self.request('GET', '/health'))[1], {'status': 'ok', 'running': 0})
+
+    async def test_cancelled_before_solving(self):
+        plan = asyncio.ensure_future(self.service.plan({'pipeline': TINY_PIPELINE, 'cpu_cores': 2, 'request_id': 'x'}))
+        await asyncio.sleep(0)
+        self.assertTrue(self.service.cancel('x'))
+
+        with self.assertRaises(PlanningCancelledError):
+            await plan
+        self.assertFalse(self.service.cancel('x'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import dataclasses
+import unittest
+from pipeline_planner.list_scheduler import ListScheduler
+from pipeline_planner.pipeline_generator import generate_pipeline
+from pipeline_planner.pipeline_planner import PipelinePlanner
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+from pipeline_planner.task import Task
+from pipeline_planner.task_diff import TaskDiff
+from tests.fixtures import TASKS
+
+
+class TestReplanning(unittest.TestCase):
+
+    def test_apply_diff(self):
+        diff = TaskDiff(
+            added=[Task('X', '', 1, {'Z'})],
+            removed={'A1'},
+            modified=[Task('C', 'feature', 15, {'B'})]
+        )
+
+        tasks = diff.apply(TASKS)
+
+        self.assertEqual([task.name for task in tasks], ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'Z', 'X'])
+        self.assertEqual(tasks[2].execution_time, 15)
+        self.assertEqual(diff.changed_names(), {'X', 'C'})
+
+    def test_invalid_diff(self):
+        with self.assertRaisesRegex(PipelinePlanningError, 'Cannot remove or modify non-existent task: Q'):
+            TaskDiff(removed={'Q'}).apply(TASKS)
+
+        with self.assertRaisesRegex(PipelinePlanningError, 'Cannot add already existing task: A'):
+            TaskDiff(added=[Task('A', '', 1, set())]).apply(TASKS)
+
+    def test_replan_matches_cold_solve(self):
+        previous = PipelinePlanner(TASKS).plan(cpu_cores=2)
+        diff = TaskDiff(modified=[Task('C', 'feature', 55, {'B'})], added=[Task('X', '', 3, {'G'})])
+        planner = PipelinePlanner(diff.apply(TASKS))
+
+        result = planner.replan(2, previous, diff)
+
+        self.assertTrue(result.is_optimal())
+        self.assertEqual(result.makespan, planner.solve(cpu_cores=2).makespan)
+
+    def test_replan_freezes_unaffected_tasks(self):
+        previous = PipelinePlanner(TASKS).plan(cpu_cores=2)
+        diff = TaskDiff(modified=[Task('G', 'model', 45, {'B', 'F'})])
+
+        result = PipelinePlanner(diff.apply(TASKS)).replan(2, previous, diff, freeze_unaffected=True)
+
+        previous_starts = {s_task.task.name: (s_task.start, s_task.core) for s_task in previous}
+        for s_task in result.scheduled_tasks:
+            if s_task.task.name != 'G':
+                self.assertEqual((s_task.start, s_task.core), previous_starts[s_task.task.name])
+
+        self.assertEqual(result.scheduled_tasks[7].task.execution_time, 45)
+        self.assertLessEqual(result.lower_bound, result.makespan)
+
+    def test_replan_out_of_time_keeps_the_frozen_tasks(self):
+        tasks = generate_pipeline(400, depth=6, group_count=3, seed=1)
+        previous = ListScheduler(tasks).schedule(4)
+        diff = TaskDiff(modified=[dataclasses.replace(tasks[200], execution_time=tasks[200].execution_time + 5)])
+        planner = PipelinePlanner(diff.apply(tasks))
+
+        # The solver has no time to find a plan, while the list schedule would move most tasks
+        result = planner.replan(4, previous, diff, freeze_unaffected=True, time_limit=1e-9, num_workers=1)
+
+        # The affected tasks are the modified one and the tasks depending on it
+        ancestors = planner.task_graph.ancestors()
+        for i, (s_task, previous_task) in enumerate(zip(result.scheduled_tasks, previous)):
+            if i != 200 and not (ancestors[i] >> 200) & 1:
+                self.assertEqual((s_task.start, s_task.core), (previous_task.start, previous_task.core))
+
+        ends = [s_task.start + s_task.task.execution_time for s_task in result.scheduled_tasks]
+        self.assertEqual(result.makespan, max(ends))
+        self.assertLessEqual(result.lower_bound, result.makespan)
+
+    def test_replan_without_room_for_frozen_plan(self):
+        tasks = [Task('A', '', 4, set()), Task('B', '', 4, set())]
+        previous = PipelinePlanner(tasks).plan(cpu_cores=2)
+        diff = TaskDiff(added=[Task('C', '', 8, set())])
+
+        # Keeping A and B in place would need a third core for C at time 0,
+        # so C starts after them - unless all tasks are planned again
+        result = PipelinePlanner(diff.apply(tasks)).replan(2, previous, diff, freeze_unaffected=True)
+
+        self.assertEqual(result.makespan, 12)
+        self.assertEqual(result.lower_bound, 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,16 +1,20 @@
+import importlib.util
+import io
+import json
 import unittest
 from pipeline_planner.task_schedule_report import TaskScheduleReport
 from pipeline_planner.task import Task, ScheduledTask
+from pipeline_planner.plan_result import PlanResult
 
 
 class TestReport(unittest.TestCase):
 
-    def test_report_generation(self):
+    def test_per_minute_report_generation(self):
         report = TaskScheduleReport().generate([
             ScheduledTask(Task('T2', '', 1, set()), core=0, start=0),
             ScheduledTask(Task('T1', 'G1', 3, set()), core=1, start=0),
             ScheduledTask(Task('T3', '', 4, set()), core=2, start=0),
-        ])
+        ], per_minute=True)
 
         self.assertEqual(
             report,
@@ -29,7 +33,7 @@ Minimum Execution Time = 4 minute(s)
             ScheduledTask(Task('T2', 'G1', 1, set()), core=0, start=0),
             ScheduledTask(Task('T1', 'G1', 2, set()), core=0, start=1),
             ScheduledTask(Task('T3', '', 2, set()), core=0, start=3),
-        ])
+        ], per_minute=True)
 
         self.assertEqual(
             report,
@@ -49,7 +53,7 @@ Minimum Execution Time = 5 minute(s)
         report = TaskScheduleReport().generate([
             ScheduledTask(Task('T1', 'G1', 2, set()), core=0, start=0),
             ScheduledTask(Task('T2', '', 2, set()), core=0, start=0),
-        ])
+        ], per_minute=True)
 
         self.assertEqual(
             report,
@@ -59,6 +63,44 @@ Minimum Execution Time = 2 minute(s)
 |--------|------------------------|--------------
 | 1      | T1,T2                  | G1           
 | 2      | T1,T2                  | G1           
+"""[1:-1]
+        )
+
+    def test_interval_report_generation(self):
+        report = TaskScheduleReport().generate([
+            ScheduledTask(Task('T2', '', 1, set()), core=0, start=0),
+            ScheduledTask(Task('T1', 'G1', 3, set()), core=1, start=0),
+            ScheduledTask(Task('T3', '', 4, set()), core=2, start=0),
+            ScheduledTask(Task('T4', 'G2', 2, set()), core=0, start=6),
+        ])
+
+        self.assertEqual(
+            report,
+"""
+Minimum Execution Time = 8 minute(s)
+| Time   | Tasks being Executed   | Group Name   
+|--------|------------------------|--------------
+| 1      | T1,T2,T3               | G1           
+| 2-3    | T1,T3                  | G1           
+| 4      | T3                     |              
+| 7-8    | T4                     | G2           
+"""[1:-1]
+        )
+
+    def test_interval_report_of_long_tasks(self):
+        report = TaskScheduleReport().generate([
+            ScheduledTask(Task('T1', '', 10000, set()), core=0, start=0),
+            ScheduledTask(Task('T2', '', 5000, {'T1'}), core=0, start=10000),
+        ])
+
+        self.assertEqual(
+            report,
+"""
+Minimum Execution Time = 15000 minute(s)
+| Time        | Tasks being Executed   | Group Name   
+|-------------|------------------------|--------------
+| 1-10000     | T1                     |              
+| 10001-15000 | T2                     |              
 """[1:-1]
         )
 
@@ -93,5 +135,75 @@ Minimum Execution Time = 2 minute(s)
         self.assertEqual(report1, report2)
 
 
+    def test_sweep_report(self):
+        report = TaskScheduleReport().generate_sweep({
+            1: PlanResult([], 8, 8, 'OPTIMAL', 0.1),
+            2: PlanResult([], 4, 4, 'OPTIMAL', 0.1),
+            3: PlanResult([], 4, 3, 'FEASIBLE', 0.1),
+        })
+
+        self.assertEqual(
+            report,
+"""
+Minimum Execution Time = 4 minute(s), reached with 2 CPU core(s)
+| CPU Cores   | Execution Time   | Optimal         
+|-------------|------------------|-----------------
+| 1           | 8                | yes             
+| 2           | 4                | yes             
+| 3           | 4                | no (gap 25.00%) 
+"""[1:-1]
+        )
+
+    def scheduled_chain(self):
+        return [
+            ScheduledTask(Task('T3', '', 2, {'T1'}), core=0, start=4),
+            ScheduledTask(Task('T1', 'G1', 2, set()), core=0, start=0),
+            ScheduledTask(Task('T2', 'G1', 1, set()), core=1, start=0),
+        ]
+
+    def test_jsonl_output(self):
+        output = io.StringIO()
+        TaskScheduleReport().write(self.scheduled_chain(), output, 'jsonl')
+
+        self.assertEqual([json.loads(line) for line in output.getvalue().splitlines()], [
+            {'name': 'T1', 'group': 'G1', 'core': 0, 'start': 0, 'end': 2, 'slack': 2},
+            {'name': 'T2', 'group': 'G1', 'core': 1, 'start': 0, 'end': 1, 'slack': 5},
+            {'name': 'T3', 'group': '', 'core': 0, 'start': 4, 'end': 6, 'slack': 0},
+        ])
+
+    def test_json_output(self):
+        output = io.StringIO()
+        TaskScheduleReport().write(self.scheduled_chain(), output, 'json')
+
+        report = json.loads(output.getvalue())
+        self.assertEqual(report['execution_time'], 6)
+        self.assertEqual([row['name'] for row in report['tasks']], ['T1', 'T2', 'T3'])
+
+    def test_csv_output(self):
+        output = io.StringIO()
+        TaskScheduleReport().write(self.scheduled_chain(), output, 'csv')
+
+        self.assertEqual(
+            output.getvalue(),
+"""
+name,group,core,start,end,slack
+T1,G1,0,0,2,2
+T2,G1,1,0,1,5
+T3,,0,4,6,0
+"""[1:]
+        )
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_arrow_output(self):
+        import pyarrow.ipc
+
+        output = io.BytesIO()
+        TaskScheduleReport().write(self.scheduled_chain(), output, 'arrow')
+
+        table = pyarrow.ipc.open_stream(output.getvalue()).read_all()
+        self.assertEqual(table.column('name').to_pylist(), ['T1', 'T2', 'T3'])
+        self.assertEqual(table.column('slack').to_pylist(), [2, 5, 0])
+
+
 if __name__ == '__main__':
     unittest.main()
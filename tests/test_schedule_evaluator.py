@@ -0,0 +1,87 @@
+import unittest
+from pipeline_planner.schedule_evaluator import ScheduleEvaluator
+from pipeline_planner.pipeline_planner import PipelinePlanner
+from pipeline_planner.task import Task, ScheduledTask, DurationDistribution
+from tests.fixtures import TASKS
+
+
+class TestScheduleEvaluator(unittest.TestCase):
+
+    def test_fixed_execution_times(self):
+        planner = PipelinePlanner(TASKS)
+        for cpu_cores in (1, 2, 3):
+            result = planner.solve(cpu_cores)
+
+            distribution = ScheduleEvaluator(TASKS, scenarios=100).evaluate(result.scheduled_tasks)
+
+            self.assertEqual(distribution.nominal, result.makespan)
+            self.assertTrue((distribution.samples == result.makespan).all())
+
+    def test_plan_order_is_kept(self):
+        tasks = [
+            Task('A', '', 10, set(), DurationDistribution(samples=(5, 20))),
+            Task('B', '', 10, set()),
+            Task('C', 'g1', 5, {'A'}),
+            Task('D', 'g2', 5, set())
+        ]
+        # B waits for A on core 0, and D for C (the previous group) on core 1
+        plan = [ScheduledTask(tasks[0], 0, 0), ScheduledTask(tasks[1], 0, 10), ScheduledTask(tasks[2], 1, 10),
+                ScheduledTask(tasks[3], 1, 15)]
+
+        distribution = ScheduleEvaluator(tasks, scenarios=1000, batch_size=64).evaluate(plan)
+
+        self.assertEqual(distribution.nominal, 20)
+        self.assertEqual(set(distribution.samples), {15.0, 30.0})
+        self.assertAlmostEqual(distribution.mean, 22.5, delta=1)
+
+        # A memory budget of 64 scenarios of the 4 tasks gives the same batches
+        budgeted = ScheduleEvaluator(tasks, scenarios=1000, memory_budget=64 * 4 * 6 * 8).evaluate(plan)
+        self.assertTrue((budgeted.samples == distribution.samples).all())
+
+    def test_multi_core_tasks_wait_on_each_of_their_cores(self):
+        tasks = [
+            Task('A', '', 10, set()),
+            Task('B', '', 10, set(), DurationDistribution(samples=(5, 20))),
+            Task('C', '', 5, set(), cores=2)
+        ]
+        # C runs on both cores, so it also waits for B on core 1
+        plan = [ScheduledTask(tasks[0], 0, 0), ScheduledTask(tasks[1], 1, 0), ScheduledTask(tasks[2], 0, 10, (0, 1))]
+
+        distribution = ScheduleEvaluator(tasks, scenarios=100).evaluate(plan)
+
+        self.assertEqual(set(distribution.samples), {15.0, 25.0})
+
+    def test_log_normal_percentiles(self):
+        tasks = [Task('A', '', 10, set(), DurationDistribution(p95=30))]
+        evaluator = ScheduleEvaluator(tasks, scenarios=20000)
+
+        distribution = evaluator.evaluate([ScheduledTask(tasks[0], 0, 0)])
+
+        self.assertAlmostEqual(distribution.p50, 10, delta=0.5)
+        self.assertAlmostEqual(distribution.p95, 30, delta=1.5)
+        self.assertEqual(evaluator.duration_percentiles(95), [30])
+        self.assertEqual(evaluator.duration_percentiles(50), [10])
+
+    def test_robust_plan(self):
+        # A is usually short but sometimes very long: the nominal plans run the
+        # chain of C after A on one core and D on the other
+        tasks = [
+            Task('A', '', 5, set(), DurationDistribution(samples=(2, 2, 2, 2, 30))),
+            Task('B', '', 10, set()),
+            Task('C', '', 10, {'A'}),
+            Task('D', '', 10, set())
+        ]
+        planner = PipelinePlanner(tasks)
+        evaluator = ScheduleEvaluator(tasks, scenarios=2000)
+
+        result = planner.solve_robust(2, scenarios=2000)
+
+        self.assertGreaterEqual(result.candidates, 3)
+        self.assertLessEqual(
+            result.makespan_distribution.p95, evaluator.evaluate(planner.plan(2)).p95
+        )
+        self.assertEqual(result.makespan_distribution.nominal, result.makespan)
+
+
+if __name__ == '__main__':
+    unittest.main()
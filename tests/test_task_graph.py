@@ -0,0 +1,71 @@
+import unittest
+from pipeline_planner.task_graph import TaskGraph
+from pipeline_planner.pipeline_planner import PipelinePlanner
+from pipeline_planner.pipeline_planning_error import PipelinePlanningError
+from pipeline_planner.task import Task
+
+
+class TestTaskGraph(unittest.TestCase):
+
+    def test_topological_order(self):
+        graph = TaskGraph([
+            Task('C', '', 1, {'A', 'B'}),
+            Task('B', '', 1, {'A'}),
+            Task('A', '', 1, set())
+        ])
+
+        self.assertEqual([graph.names[i] for i in graph.order], ['A', 'B', 'C'])
+
+    def test_reports_cycle_path(self):
+        with self.assertRaisesRegex(
+                PipelinePlanningError, 'check for circular dependencies. Found cycle: B -> C -> D -> B'
+        ):
+            TaskGraph([
+                Task('A', '', 2, {'B'}),
+                Task('B', '', 2, {'C'}),
+                Task('C', '', 2, {'D'}),
+                Task('D', '', 2, {'B'}),
+                Task('E', '', 2, set())
+            ])
+
+    def test_reports_every_missing_dependency(self):
+        with self.assertRaisesRegex(
+                PipelinePlanningError,
+                'Task A has non-existent dependency: X; Task C has non-existent dependencies: Y, Z'
+        ):
+            TaskGraph([
+                Task('A', 'group', 2, {'X'}),
+                Task('B', '', 2, {'A'}),
+                Task('C', '', 2, {'Z', 'Y', 'B'})
+            ])
+
+    def test_critical_path_lengths(self):
+        graph = TaskGraph([
+            Task('A', '', 3, set()),
+            Task('B', '', 2, {'A'}),
+            Task('C', '', 5, {'A'}),
+            Task('D', '', 1, {'B', 'C'}),
+            Task('E', '', 4, set())
+        ])
+
+        self.assertEqual(graph.heads, [0, 3, 3, 8, 0])
+        self.assertEqual(graph.tails, [9, 3, 6, 1, 4])
+        self.assertEqual(graph.critical_path_length, 9)
+
+    def test_ancestors(self):
+        graph = TaskGraph([
+            Task('A', '', 1, set()),
+            Task('B', '', 1, {'A'}),
+            Task('C', '', 1, {'B'}),
+            Task('D', '', 1, set())
+        ])
+
+        self.assertEqual(graph.ancestors(), [0b0000, 0b0001, 0b0011, 0b0000])
+
+    def test_planner_validates_ungrouped_tasks(self):
+        with self.assertRaisesRegex(PipelinePlanningError, 'Task B has non-existent dependency: X'):
+            PipelinePlanner([Task('A', 'group', 2, set()), Task('B', '', 2, {'X'})])
+
+
+if __name__ == '__main__':
+    unittest.main()